@@ -0,0 +1,95 @@
+"""
+Benchmark: LLM call counts and fill ratios for Chef batching.
+
+Compares the old heuristic (len(str(item)) against maxChars) with token-driven
+greedy and bin-packing batching on the data/raw sample, for every model in
+model_config.json. "overflow" counts batches that exceed the model's real
+input budget or the item count its output budget can hold (i.e. calls that
+would fail or come back truncated).
+
+Usage:
+    python benchmarks/bench_batching.py [--scale 20]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from src.utils.model_config import load_model_config
+from src.ingest.chef import create_dynamic_batches, batch_budget_for, build_chef_prompt, render_ingredient
+
+
+def load_sample(scale):
+    repo_root = os.path.dirname(os.path.dirname(KITCHEN_DIR))
+    raw = []
+    for path in sorted(glob.glob(os.path.join(repo_root, "**", "data", "raw", "**", "*.json"), recursive=True)):
+        with open(path, "r", encoding="utf-8") as f:
+            raw.extend(json.load(f).get("results", []))
+    items = []
+    for copy in range(scale):
+        for r in raw:
+            items.append({
+                "title": r.get("title"),
+                "source_name": r.get("source_id", "Google News"),
+                "published_at": r.get("pubDate"),
+                "link": f"{r.get('link')}#copy{copy}",
+                "description": r.get("description") or "",
+            })
+    return items
+
+
+def legacy_batches(items, max_chars):
+    """The pre-token heuristic: len(str(item)) against maxChars."""
+    batches, current, chars = [], [], 0
+    for item in items:
+        n = len(str(item))
+        if current and chars + n > max_chars:
+            batches.append(current)
+            current, chars = [], 0
+        current.append(item)
+        chars += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+def score(batches, budget):
+    """(calls, mean token fill, mean item fill, overflow count) against the real budget."""
+    token_fill, item_fill, overflow = [], [], 0
+    for batch in batches:
+        used = sum(budget.estimate(render_ingredient(i, item)) for i, item in enumerate(batch))
+        token_fill.append(used / budget.input_tokens)
+        item_fill.append(len(batch) / budget.max_items)
+        if used > budget.input_tokens or len(batch) > budget.max_items:
+            overflow += 1
+    n = len(batches) or 1
+    return len(batches), sum(token_fill) / n, sum(item_fill) / n, overflow
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batching benchmark")
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the data/raw sample N times")
+    args = parser.parse_args()
+
+    items = load_sample(args.scale)
+    config = load_model_config()
+    print(f"{len(items)} items")
+    print(f"{'model':<10} {'strategy':<10} {'calls':>6} {'tok_fill':>9} {'item_fill':>9} {'overflow':>9}")
+    for entry in config["models"]:
+        budget = batch_budget_for(entry["id"])
+        runs = {
+            "legacy": legacy_batches(items, entry["maxChars"]),
+            "greedy": create_dynamic_batches(items, budget=budget, mode="greedy"),
+            "binpack": create_dynamic_batches(items, budget=budget, mode="binpack"),
+        }
+        for name, batches in runs.items():
+            calls, tok_fill, item_fill, overflow = score(batches, budget)
+            print(f"{entry['id']:<10} {name:<10} {calls:>6} {tok_fill:>9.1%} {item_fill:>9.1%} {overflow:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: exact O(n^2) grouping vs MinHash/LSH candidate grouping.
+
+First checks both modes produce identical groups on the data/raw fixture
+corpus, then times them on synthetic title sets.
+
+Usage:
+    python benchmarks/bench_grouping.py --sizes 1000,10000,100000 --exact-max 10000
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from src.ingest.grouping import simple_group_articles, LSH_BANDS, LSH_ROWS
+
+
+def load_fixture_corpus():
+    repo_root = os.path.dirname(os.path.dirname(KITCHEN_DIR))
+    pattern = os.path.join("**", "data", "raw", "**", "*.json")
+    articles = []
+    for path in sorted(glob.glob(os.path.join(repo_root, pattern), recursive=True)):
+        with open(path, "r", encoding="utf-8") as f:
+            for r in json.load(f).get("results", []):
+                articles.append({"id": r.get("article_id"), "title": r.get("title"), "published_at": r.get("pubDate")})
+    return articles
+
+
+def synthetic_titles(n, seed=7, days=0):
+    """
+    Stories of 8 words, each syndicated 1-6 times with a one-word edit and a
+    source suffix. With days > 0 stories are spread over that many days and
+    their copies land within a few hours of each other.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 12, 28, 12, 0)
+    vocab = [f"word{i}" for i in range(20000)]
+    sources = [f"source{i}" for i in range(50)]
+    articles = []
+    while len(articles) < n:
+        base = rng.sample(vocab, 8)
+        story_at = start - timedelta(minutes=rng.randrange(days * 1440)) if days else start
+        for _ in range(rng.randint(1, 6)):
+            words = list(base)
+            if rng.random() < 0.5:
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            words.append(rng.choice(sources))
+            published = story_at + timedelta(minutes=rng.randrange(180)) if days else story_at
+            articles.append({"id": len(articles), "title": " ".join(words), "published_at": published.isoformat()})
+            if len(articles) >= n:
+                break
+    return articles
+
+
+def group_ids(groups):
+    return [[a["id"] for a in g] for g in groups]
+
+
+def timed(articles, mode, bands=LSH_BANDS, rows=LSH_ROWS):
+    t0 = time.perf_counter()
+    groups = simple_group_articles(articles, mode=mode, lsh_bands=bands, lsh_rows=rows)
+    return groups, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grouping benchmark")
+    parser.add_argument("--sizes", type=str, default="1000,10000,100000")
+    parser.add_argument("--exact-max", type=int, default=10000, help="Skip exact mode above this size")
+    parser.add_argument("--days", type=int, default=0, help="Spread synthetic stories over N days (exercises the time window)")
+    parser.add_argument("--bands", type=int, default=LSH_BANDS, help="LSH bands (more = higher recall)")
+    parser.add_argument("--rows", type=int, default=LSH_ROWS, help="LSH rows per band (more = higher precision)")
+    args = parser.parse_args()
+
+    print(f"lsh bands={args.bands} rows={args.rows}")
+    fixture = load_fixture_corpus()
+    exact, _ = timed(fixture, "exact")
+    lsh, _ = timed(fixture, "lsh", args.bands, args.rows)
+    print(f"fixture corpus: {len(fixture)} articles, {len(exact)} groups, lsh == exact: {group_ids(exact) == group_ids(lsh)}")
+
+    print(f"{'n':>8} {'exact_s':>9} {'lsh_s':>8} {'groups':>8} {'identical':>9}")
+    for n in [int(x) for x in args.sizes.split(",") if x]:
+        articles = synthetic_titles(n, days=args.days)
+        lsh, lsh_s = timed(articles, "lsh", args.bands, args.rows)
+        if n <= args.exact_max:
+            exact, exact_s = timed(articles, "exact")
+            same = str(group_ids(exact) == group_ids(lsh))
+            exact_col = f"{exact_s:9.2f}"
+        else:
+            same, exact_col = "n/a", f"{'skipped':>9}"
+        print(f"{n:>8} {exact_col} {lsh_s:8.2f} {len(lsh):>8} {same:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: batch latency with and without hedged fallback requests.
+
+A fake primary model answers most calls in ~base seconds but a tail
+fraction takes --slow seconds (or fails outright); a fake secondary is
+steady. Cooks the same batches with no fallback, failover-only and hedging,
+and prints per-batch latency percentiles and lost batches, plus the per-model latency histograms the hedge threshold is derived from.
+
+Usage:
+    python benchmarks/bench_hedging.py [--batches 40] [--tail 0.15] [--fail 0.05]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from src.utils.llm_cache import configure_cache
+from src.ingest import chef
+from src.ai import providers as llm
+from src.ai.latency import latency_stats
+
+COURSES = json.dumps([{"title": "Course", "summary": "s", "category": "world", "ingredient_ids": [0], "sources": []}])
+
+
+class FlakyResponder:
+    """Per call: usually base latency, sometimes a slow tail or a hard failure."""
+
+    def __init__(self, base, slow, tail, fail, seed):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.base, self.slow, self.tail, self.fail = base, slow, tail, fail
+
+    def __call__(self, prompt):
+        with self.lock:
+            roll = self.rng.random()
+        if roll < self.fail:
+            raise ConnectionError("primary: 503 overloaded")
+        time.sleep(self.slow if roll < self.fail + self.tail else self.base * (0.8 + 0.4 * (roll % 0.1) * 10))
+        return COURSES
+
+
+def pct(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def run(label, args, fallback, hedge_percentile):
+    llm.use_fake_provider("primary", entry={"fallbackModels": ["secondary"]},
+                          responder=FlakyResponder(args.base, args.slow, args.tail, args.fail, seed=3))
+    llm.use_fake_provider("secondary", responder=lambda prompt: (time.sleep(args.base * 1.5), COURSES)[1])
+
+    items = [{"title": "Item", "link": "https://example.com/0", "source_name": "Bench"}]
+    latencies, lost = [], 0
+    for i in range(args.batches):
+        items[0]["title"] = f"Item {label} {i}"  # distinct prompts
+        t0 = time.perf_counter()
+        courses = chef.cook_batch(items, model="primary", max_retries=0,
+                                  fallback=fallback, hedge_percentile=hedge_percentile)
+        latencies.append(time.perf_counter() - t0)
+        if not courses:
+            lost += 1
+    return f"{label:>10} {statistics.median(latencies):7.2f} {pct(latencies, 90):7.2f} {pct(latencies, 99):7.2f} {max(latencies):7.2f} {lost:>5}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedging benchmark")
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--base", type=float, default=0.2, help="Typical primary latency (s)")
+    parser.add_argument("--slow", type=float, default=3.0, help="Tail latency (s)")
+    parser.add_argument("--tail", type=float, default=0.15, help="Fraction of slow primary calls")
+    parser.add_argument("--fail", type=float, default=0.05, help="Fraction of failed primary calls")
+    parser.add_argument("--percentile", type=float, default=80)
+    args = parser.parse_args()
+
+    configure_cache(enabled=False)
+    llm.LLM_HEDGE_MIN_SAMPLES = 5
+    llm.LLM_HEDGE_DEFAULT_DELAY = args.base * 3
+    # Silence per-call chatter from the chef/provider layers
+    real_stdout = sys.stdout
+    print(f"{'mode':>10} {'p50_s':>7} {'p90_s':>7} {'p99_s':>7} {'max_s':>7} {'lost':>5}")
+    for label, fallback, percentile in (("none", False, None), ("failover", True, None), ("hedged", True, args.percentile)):
+        sys.stdout = open(os.devnull, "w")
+        try:
+            row = run(label, args, fallback, percentile)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        print(row)
+    print()
+    print(latency_stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: import cost of the kitchen's LLM-facing modules.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+module and reports the cumulative import time of the module itself, the wall
+time of the process, and whether any provider SDK got imported. With --ref,
+the same measurements are taken on that git revision of services/kitchen
+(exported to a temp dir) for a before/after comparison.
+
+A dummy GEMINI_API_KEY is set so older trees that raise at import can load.
+
+Usage:
+    python benchmarks/bench_importtime.py [--ref HEAD~1] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(os.path.dirname(KITCHEN_DIR))
+
+MODULES = ["src.ingest.chef", "src.ingest.commentary", "src.ingest.normalizer"]
+SDK_PREFIXES = ("google.genai", "openai", "anthropic")
+
+
+def measure(kitchen_dir, module):
+    env = dict(os.environ, GEMINI_API_KEY="bench-dummy", DATABASE_URL="sqlite://", PYTHONDONTWRITEBYTECODE="1")
+    code = f"import sys, {module}; print(','.join(sorted({{m.split('.')[0] for m in sys.modules if m.startswith({SDK_PREFIXES!r})}})))"
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=kitchen_dir, env=env,
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed in {kitchen_dir}:\n{proc.stderr[-2000:]}")
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if line.startswith("import time:") and line.rstrip().endswith(f"| {module}"):
+            cumulative_us = int(line.split("|")[1].strip())
+    sdks = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else ""
+    return (cumulative_us or 0) / 1000, wall * 1000, sdks or "-"
+
+
+def report(label, kitchen_dir, repeat):
+    print(f"\n{label}")
+    print(f"{'module':>24} {'import_ms':>10} {'process_ms':>11}  sdks loaded")
+    for module in MODULES:
+        runs = [measure(kitchen_dir, module) for _ in range(repeat)]
+        imp = statistics.median(r[0] for r in runs)
+        wall = statistics.median(r[1] for r in runs)
+        print(f"{module:>24} {imp:10.1f} {wall:11.1f}  {runs[-1][2]}")
+
+
+def export_ref(ref, dest):
+    archive = os.path.join(dest, "kitchen.tar")
+    subprocess.run(["git", "archive", "--format=tar", "-o", archive, ref, "services/kitchen"], cwd=REPO_ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(dest)
+    return os.path.join(dest, "services", "kitchen")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--ref", type=str, default=None, help="Git revision to measure as the baseline")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            report(f"baseline ({args.ref})", export_ref(args.ref, tmp), args.repeat)
+    report("working tree", KITCHEN_DIR, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Benchmark: the whole kitchen, end to end, offline.
+
+Runs run_kitchen.main() as is -- fetch, prep, cook, plate, merge, localize,
+commentary, commit -- against:
+  * stub_feed_server.StubFeedServer on localhost instead of Google News
+    (GOOGLE_NEWS_RSS_URL), serving a window of the data/raw fixtures per
+    feed (--feeds fixtures) or synthetic stories (--feeds synthetic);
+  * src.ai.providers.FakeProvider for every model id in model_config.json,
+    with deterministic responses to each prompt the kitchen sends and a
+    fixed per-call latency plus input/output token rates;
+  * a fresh SQLite file (or --database-url, e.g. a throwaway local Postgres)
+    and a temp dir for the seen index, validators, LLM cache, latency
+    history, raw archive and commentary, so nothing in data/ is touched
+    and every run starts cold.
+
+Reports per-cycle phase and pipeline-stage wall time, items/s, courses/s,
+peak RSS and prompt/response characters per LLM task, and writes it all
+(plus the git revision) as JSON with --out. --baseline compares against
+an earlier --out file, e.g. one written on another commit.
+
+Arguments after `--` go to run_kitchen.py unchanged. The feed client keeps
+its per-host rate limit (--fetch-rate), which the stub shares with every
+feed; raise it there to take fetching out of the picture.
+
+Usage:
+    python benchmarks/bench_kitchen_e2e.py [--feeds fixtures] [--cycles 1] [--out e2e.json] [--baseline old.json]
+    python benchmarks/bench_kitchen_e2e.py --llm-latency 1.5 -- --precluster --locales en-US/US/US:en,fr/FR/FR:fr
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from stub_feed_server import StubFeedServer
+
+FILLER = "officials said the situation was developing and further details were expected later in the day".split()
+
+
+def sample_items():
+    items = []
+    for path in sorted(glob.glob(os.path.join(KITCHEN_DIR, "data", "raw", "*", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            items.extend(json.load(f).get("results", []))
+    return items
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=KITCHEN_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class FakeKitchenLLM:
+    """
+    Responder for FakeProvider: answers Chef, update, translation and
+    commentary prompts deterministically (a course per --items-per-course
+    ingredients, --summary-words words per summary), sleeps for the prompt
+    at --input-tokens-per-s, and counts calls and characters per task.
+    """
+
+    def __init__(self, items_per_course, summary_words, input_tokens_per_s):
+        from src.ingest.tokens import heuristic_token_count
+        self.count_tokens = heuristic_token_count
+        self.items_per_course = max(1, items_per_course)
+        self.summary_words = summary_words
+        self.input_tokens_per_s = input_tokens_per_s
+        self.tasks = {}
+        self._lock = threading.Lock()
+
+    def summary(self, title):
+        words = (title.split() + FILLER) * (self.summary_words // len(FILLER) + 2)
+        return " ".join(words[:self.summary_words])
+
+    def respond(self, task, prompt):
+        if task == "update":
+            title = re.search(r"^\s*Title: (.*)$", prompt, re.M).group(1)
+            return json.dumps({"title": title, "summary": self.summary(title), "entities": [], "topics": ["update"]})
+        if task == "translate":
+            language = re.search(r"stories into (.*?)\.", prompt).group(1)
+            stories = json.loads(re.search(r"STORIES \(JSON\):\s*(\[.*\])", prompt).group(1))
+            return json.dumps([{"id": s["id"], "title": f"[{language}] {s['title']}", "summary": f"[{language}] {s['summary']}"}
+                               for s in stories], ensure_ascii=False)
+        if task == "commentary":
+            return " ".join(FILLER * 6)
+        ids = [int(i) for i in re.findall(r"^\s*ID: (\d+)$", prompt, re.M)]
+        titles = re.findall(r"^\s*Title: (.*)$", prompt, re.M)
+        courses = []
+        for start in range(0, len(ids), self.items_per_course):
+            title = titles[start] if start < len(titles) else f"Course {start}"
+            courses.append({"title": title, "summary": self.summary(title), "category": "World", "importance": 5,
+                            "entities": [], "topics": ["bench"], "ingredient_ids": ids[start:start + self.items_per_course],
+                            "sources": []})
+        return json.dumps(courses, ensure_ascii=False, indent=2)
+
+    def __call__(self, prompt):
+        if "updating a story already on the menu" in prompt:
+            task = "update"
+        elif "Translate these news stories" in prompt:
+            task = "translate"
+        elif "news analyst" in prompt:
+            task = "commentary"
+        else:
+            task = "cook"
+        if self.input_tokens_per_s:
+            time.sleep(self.count_tokens(prompt) / self.input_tokens_per_s)
+        text = self.respond(task, prompt)
+        with self._lock:
+            row = self.tasks.setdefault(task, {"calls": 0, "prompt_chars": 0, "response_chars": 0})
+            row["calls"] += 1
+            row["prompt_chars"] += len(prompt)
+            row["response_chars"] += len(text)
+        return text
+
+
+def cycle_report(metrics):
+    counts, wall = metrics.get("counts") or {}, metrics.get("wall") or 1e-9
+    pipeline_wall = metrics["phases"].get("pipeline") or 1e-9
+    return dict(metrics, items_per_s=counts.get("raw", 0) / wall, courses_per_s=counts.get("courses", 0) / wall,
+                pipeline_items_per_s=counts.get("raw", 0) / pipeline_wall)
+
+
+def headline(result):
+    """Flat name -> number view of a result, for printing and --baseline comparison."""
+    out = {"setup_s": result["setup_s"], "peak_rss_mb": result["peak_rss_mb"]}
+    for cycle in result["cycles"]:
+        prefix = f"c{cycle['cycle']}."
+        out[prefix + "wall_s"] = cycle["wall"]
+        out[prefix + "items_per_s"] = cycle["items_per_s"]
+        out[prefix + "courses_per_s"] = cycle["courses_per_s"]
+        for name, seconds in cycle["phases"].items():
+            out[f"{prefix}{name}_s"] = seconds
+        for stage in cycle.get("stages") or []:
+            out[f"{prefix}stage.{stage['name']}.active_s"] = stage["active"]
+    for task, row in sorted(result["llm"]["tasks"].items()):
+        out[f"llm.{task}.prompt_chars"] = row["prompt_chars"]
+        out[f"llm.{task}.response_chars"] = row["response_chars"]
+    return out
+
+
+def print_report(result, baseline=None):
+    rows = headline(result)
+    old = headline(baseline) if baseline else {}
+    print(f"\nKitchen e2e @ {result['git'] or 'unknown revision'}: {result['config']['feeds']} feeds, "
+          f"{result['courses']} courses from {result['items']} items in {result['wall_s']:.2f}s")
+    header = f"{'metric':<36} {'value':>12}"
+    if baseline:
+        header += f" {'baseline':>12} {'change':>8}"
+        print(f"baseline: {baseline.get('git') or 'unknown revision'} ({baseline.get('label') or 'no label'})")
+    print(header)
+    for name, value in rows.items():
+        if value is None:
+            continue
+        line = f"{name:<36} {value:12.3f}" if isinstance(value, float) else f"{name:<36} {value:>12}"
+        if name in old and old[name] is not None:
+            # Sub-10ms timings are noise; a percentage of them means nothing
+            change = f"{(value - old[name]) / old[name] * 100:+.0f}%" if abs(old[name]) >= 0.01 else ""
+            line += f" {old[name]:12.3f} {change:>8}" if isinstance(old[name], float) else f" {old[name]:>12} {change:>8}"
+        print(line)
+
+
+def main():
+    from src.utils.model_config import load_model_config
+    model_config = load_model_config()
+
+    parser = argparse.ArgumentParser(description="End-to-end kitchen benchmark (offline)")
+    parser.add_argument("--feeds", choices=["fixtures", "synthetic"], default="fixtures",
+                        help="Feed items: windows of data/raw, or generated stories")
+    parser.add_argument("--items-per-feed", type=int, default=25)
+    parser.add_argument("--feed-latency", type=float, default=0.1, help="Seconds per stub feed request")
+    parser.add_argument("--model", default=model_config.get("defaultModel", "gemini"), help="Model id the kitchen cooks with")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fixed seconds per LLM call (time to first token)")
+    parser.add_argument("--input-tokens-per-s", type=float, default=20000, help="Prompt processing rate (0: free)")
+    parser.add_argument("--output-tokens-per-s", type=float, default=200, help="Response generation rate (0: instant)")
+    parser.add_argument("--items-per-course", type=int, default=3)
+    parser.add_argument("--summary-words", type=int, default=60)
+    parser.add_argument("--cycles", type=int, default=1, help="Cycles in one process (>1 runs --serve back to back, warm)")
+    parser.add_argument("--database-url", default=None, help="Default: a fresh SQLite file in the temp dir")
+    parser.add_argument("--label", default=None, help="Free-form name stored in the JSON")
+    parser.add_argument("--out", default=None, help="Write the results here as JSON")
+    parser.add_argument("--baseline", default=None, help="Earlier --out file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the kitchen's own output")
+    args, kitchen_argv = parser.parse_known_args()
+    if kitchen_argv[:1] == ["--"]:
+        kitchen_argv = kitchen_argv[1:]
+
+    items = sample_items() if args.feeds == "fixtures" else None
+    tmp = tempfile.TemporaryDirectory(prefix="kitchen-e2e-")
+    with tmp as work, StubFeedServer(latency=args.feed_latency, items_per_feed=args.items_per_feed, items=items) as server:
+        # Module constants read these at import, so they are set before run_kitchen is imported
+        os.environ.update({
+            "GOOGLE_NEWS_RSS_URL": server.url,
+            "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(work, 'kitchen.db')}",
+            "SEEN_LINKS_PATH": os.path.join(work, "seen_links.json"),
+            "FEED_VALIDATORS_PATH": os.path.join(work, "feed_validators.json"),
+            "LLM_CACHE_PATH": os.path.join(work, "llm_cache.sqlite"),
+            "LLM_LATENCY_PATH": os.path.join(work, "llm_latency.json"),
+            "RAW_ARCHIVE_DIR": os.path.join(work, "archive"),
+            "COMMENTARY_PATH": os.path.join(work, "latest_commentary.txt"),
+            "EMBEDDING_MODEL": "hashing",
+        })
+        from src.ai import providers as llm
+        from src.ingest.tokens import CHARS_PER_TOKEN
+
+        responder = FakeKitchenLLM(args.items_per_course, args.summary_words, args.input_tokens_per_s)
+        chunk_size = 64
+        chunk_delay = chunk_size / CHARS_PER_TOKEN / args.output_tokens_per_s if args.output_tokens_per_s else 0.0
+        # Every configured model (fallbacks included) answers locally
+        fakes = [llm.use_fake_provider(m["id"], responder=responder, latency=args.llm_latency,
+                                       chunk_size=chunk_size, chunk_delay=chunk_delay)
+                 for m in model_config["models"]]
+
+        t0 = time.perf_counter()
+        import run_kitchen
+        import_s = time.perf_counter() - t0
+        rss_before = peak_rss_mb()
+
+        argv = ["--model", args.model] + kitchen_argv
+        if args.cycles > 1:
+            argv += ["--serve", "--interval", "0", "--max-cycles", str(args.cycles)]
+        print(f"Stub feeds at {server.url} ({args.feeds}); kitchen args: {' '.join(argv)}")
+        log = io.StringIO()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+            kitchen = run_kitchen.main(argv)
+        wall = time.perf_counter() - t0
+
+        cycles = [cycle_report(m) for m in kitchen.history]
+        result = {
+            "label": args.label,
+            "git": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline", "verbose")},
+            "kitchen_argv": argv,
+            "database": "sqlite" if not args.database_url else args.database_url.split(":", 1)[0],
+            "wall_s": wall,
+            "import_s": import_s,
+            "setup_s": kitchen.setup_seconds,
+            "peak_rss_mb": peak_rss_mb(),
+            "rss_after_import_mb": rss_before,
+            "items": sum((c.get("counts") or {}).get("raw", 0) for c in cycles),
+            "courses": sum((c.get("counts") or {}).get("courses", 0) for c in cycles),
+            "feed_requests": server.requests,
+            "feed_not_modified": server.not_modified,
+            "cycles": cycles,
+            "llm": {
+                "calls": sum(f.calls for f in fakes),
+                "tasks": responder.tasks,
+                "ledger": {model: dict(row) for model, row in llm.ledger.models.items()},
+            },
+        }
+        if not cycles:
+            print(log.getvalue()[-4000:])
+            print("The kitchen finished no cycle; see its output above.")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"\nWrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
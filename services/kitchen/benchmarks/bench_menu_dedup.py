@@ -0,0 +1,100 @@
+"""
+Benchmark: embedding menu index vs. pasting recent titles into every prompt.
+
+Plates --courses synthetic courses (already embedded) into an in-memory
+SQLite database, then measures loading the menu index, embedding and
+filtering --items new raw items (a --dup-rate share of them repeat a menu
+story), and the Chef prompt overhead per batch with and without the
+100-title EXISTING MENU block the kitchen used to send.
+
+Uses the local hashing embedder, so it runs offline.
+
+Usage:
+    python benchmarks/bench_menu_dedup.py [--courses 20000] [--items 2000] [--dup-rate 0.3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from src.db.engine import engine, Base, get_db
+from src.db.plating import course_row, plate_courses
+from src.ingest.menu_index import MenuIndex
+from src.ingest.chef import build_chef_prompt
+from src.ingest.tokens import heuristic_token_count
+from src.ai.embeddings import get_embedder
+
+WORDS = ("market rally senate vote storm flood election court ruling merger tariff strike launch "
+         "vaccine trial summit ceasefire earnings outage recall verdict protest drought wildfire "
+         "satellite rocket bank crypto chip factory union budget treaty border pipeline").split()
+NAMES = ("Nvidia Boeing Tesla Pfizer Apple Airbus Samsung Toyota Shell Siemens Reuters Alibaba "
+         "Senegal Chile Norway Kenya Ohio Quebec Bavaria Kyoto Lagos Manila Texas Wales").split()
+
+
+def story(rng, i):
+    words = rng.sample(WORDS, 4) + rng.sample(NAMES, 2)
+    title = f"{words[4]} {words[0]} {words[1]} as {words[5]} {words[2]} {i}"
+    summary = f"{words[4]} and {words[5]} {words[3]} {words[0]} {words[2]} report {i}."
+    return title, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menu dedup benchmark")
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--batches", type=int, default=20, help="Chef batches per run, for the prompt overhead estimate")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    embedder = get_embedder("hashing")
+    Base.metadata.create_all(bind=engine)
+    db = next(get_db())
+
+    stories = [story(rng, i) for i in range(args.courses)]
+    courses = [{"title": t, "summary": s} for t, s in stories]
+    t0 = time.perf_counter()
+    MenuIndex(embedder).embed_courses(courses)
+    embed_courses_s = time.perf_counter() - t0
+    now = datetime.now(timezone.utc)
+    plate_courses(db, [course_row(c, "en-US", now - timedelta(seconds=5 * i)) for i, c in enumerate(courses)])
+    db.commit()
+
+    items = []
+    for i in range(args.items):
+        if rng.random() < args.dup_rate:
+            title, summary = stories[rng.randrange(len(stories))]
+        else:
+            title, summary = story(rng, args.courses + i)
+        items.append({"title": title, "description": summary, "link": f"https://example.com/{i}"})
+
+    menu = MenuIndex(embedder)
+    t0 = time.perf_counter()
+    menu.load(db)
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fresh, on_menu = menu.filter_new(items)
+    filter_s = time.perf_counter() - t0
+    expected = sum(1 for item in items if item["title"].rsplit(" ", 1)[-1].isdigit() and int(item["title"].rsplit(" ", 1)[-1]) < args.courses)
+
+    titles = [c["title"] for c in courses[:100]]
+    old_overhead = heuristic_token_count(build_chef_prompt([], titles))
+    new_overhead = heuristic_token_count(build_chef_prompt([]))
+
+    print(f"embedder: {embedder.name}, threshold {menu.threshold:g}")
+    print(f"embed {args.courses} new courses: {embed_courses_s:.2f}s")
+    print(f"load menu ({len(menu)} courses): {load_s:.2f}s")
+    print(f"embed + filter {args.items} items: {filter_s:.3f}s ({filter_s / args.items * 1000:.3f} ms/item)")
+    print(f"dropped {len(on_menu)} items as already served ({expected} were repeats); {len(fresh)} go to the Chef")
+    print(f"prompt overhead per batch: {old_overhead} tokens with 100 titles, {new_overhead} without "
+          f"(~{(old_overhead - new_overhead) * args.batches} tokens saved over {args.batches} batches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: phase-by-phase kitchen run vs. the staged pipeline.
+
+Simulates the kitchen's four stages with sleeps: fetching a category
+(--fetch-s each, --fetch-workers at a time), cooking a batch (--cook-s,
+--cook-workers at a time) and plating a batch (--plate-s, one writer).
+Items are batched with the real StreamingBatcher. The phased run waits for
+every fetch before cooking and every cook before plating; the pipeline runs
+the same work through src.ingest.pipeline with bounded queues.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--categories 8] [--items 60] [--batch-items 40]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from src.ingest.chef import StreamingBatcher, BatchBudget
+from src.ingest.pipeline import Pipeline, Stage
+
+
+def make_batcher(args):
+    return StreamingBatcher(budget=BatchBudget(input_tokens=10 ** 9, max_items=args.batch_items))
+
+
+def fetch(args, category):
+    # Later categories are slower, like real feeds of different sizes
+    time.sleep(args.fetch_s * (0.5 + category / max(1, args.categories - 1)))
+    return [{"title": f"Story {category}-{i}", "link": f"https://example.com/{category}/{i}"} for i in range(args.items)]
+
+
+def cook(args, batch):
+    time.sleep(args.cook_s)
+    return [{"title": item["title"]} for item in batch[::3]]
+
+
+def plate(args, courses):
+    time.sleep(args.plate_s)
+    return courses
+
+
+def phased(args):
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.fetch_workers) as pool:
+        fetched = list(pool.map(lambda c: fetch(args, c), range(args.categories)))
+    batcher = make_batcher(args)
+    batches = [b for items in fetched for b in batcher.add(items)] + batcher.flush()
+    with ThreadPoolExecutor(args.cook_workers) as pool:
+        cooked = list(pool.map(lambda b: cook(args, b), batches))
+    courses = [c for batch in cooked for c in plate(args, batch)]
+    return time.perf_counter() - t0, len(courses), None
+
+
+def pipelined(args):
+    batcher = make_batcher(args)
+    pipeline = Pipeline([
+        Stage("fetch", lambda c, emit: emit(fetch(args, c)), workers=args.fetch_workers, queue_size=args.queue_size),
+        Stage("prep", lambda items, emit: [emit(b) for b in batcher.add(items)],
+              flush=lambda emit: [emit(b) for b in batcher.flush()], queue_size=args.queue_size),
+        Stage("cook", lambda b, emit: emit(cook(args, b)), workers=args.cook_workers, queue_size=args.queue_size),
+        Stage("plate", lambda cooked, emit: [emit(c) for c in plate(args, cooked)], queue_size=args.queue_size),
+    ])
+    courses = pipeline.run(range(args.categories))
+    return pipeline.wall, len(courses), pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kitchen pipeline benchmark")
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--items", type=int, default=60, help="Items per category")
+    parser.add_argument("--batch-items", type=int, default=40)
+    parser.add_argument("--fetch-s", type=float, default=0.6)
+    parser.add_argument("--cook-s", type=float, default=1.5)
+    parser.add_argument("--plate-s", type=float, default=0.1)
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--cook-workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=4)
+    args = parser.parse_args()
+
+    phased_s, phased_courses, _ = phased(args)
+    pipe_s, pipe_courses, pipeline = pipelined(args)
+    print(f"{'mode':>10} {'wall_s':>7} {'courses':>8}")
+    print(f"{'phased':>10} {phased_s:7.2f} {phased_courses:>8}")
+    print(f"{'pipeline':>10} {pipe_s:7.2f} {pipe_courses:>8}")
+    print()
+    print(pipeline.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: plating courses one ORM object at a time vs bulk upsert.
+
+Plates N synthetic courses (each linked to a few articles) into a fresh
+database with the old db.add loop and with src.db.plating.plate_courses, then
+re-plates the same keys to exercise the ON CONFLICT path.
+
+SQLite always runs (a temp file). Pass --pg-url (or BENCH_PG_URL) pointing at
+a scratch Postgres / Postgres-compatible database to benchmark that too;
+its courses, articles and course_articles tables are dropped and recreated.
+
+Usage:
+    python benchmarks/bench_plating.py [--courses 10000] [--chunk-size 500] [--pg-url postgresql://...]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+# engine.py insists on a DATABASE_URL at import; the benchmark makes its own engines
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.db.engine import Base
+from src.db.models import Article, Course, CourseArticle
+from src.db.plating import course_row, plate_courses
+
+TABLES = [Article.__table__, Course.__table__, CourseArticle.__table__]
+
+
+def synthetic(n, links_per_course=3):
+    now = datetime.now(timezone.utc)
+    articles = [{"id": uuid.uuid4(), "url": f"https://example.com/a/{i}", "title": f"Article {i}"} for i in range(n * links_per_course)]
+    courses = []
+    for i in range(n):
+        courses.append({
+            "title": f"Course {i}",
+            "summary": "Lorem ipsum dolor sit amet. " * 8,
+            "entities": ["Alpha", "Beta"],
+            "topics": ["bench"],
+            "category": "World",
+            "sources": [{"url": a["url"], "title": a["title"], "source": "example.com"}
+                        for a in articles[i * links_per_course:(i + 1) * links_per_course]],
+        })
+    rows = [course_row(c, "en-US", now) for c in courses]
+    links = {row["course_key"]: [a["id"] for a in articles[i * links_per_course:(i + 1) * links_per_course]]
+             for i, row in enumerate(rows)}
+    return articles, rows, links
+
+
+def fresh_session(url):
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=list(reversed(TABLES)))
+    Base.metadata.create_all(engine, tables=TABLES)
+    return engine, sessionmaker(bind=engine)()
+
+
+def plate_orm(db, rows, links):
+    for row in rows:
+        db.add(Course(**row))
+        for article_id in links[row["course_key"]]:
+            db.add(CourseArticle(course_id=row["id"], article_id=article_id))
+    db.commit()
+
+
+def plate_bulk(db, rows, links, chunk_size):
+    plate_courses(db, rows, links=links, chunk_size=chunk_size)
+    db.commit()
+
+
+def bench(label, url, articles, rows, links, chunk_size):
+    results = []
+    for mode in ("orm", "bulk"):
+        engine, db = fresh_session(url)
+        db.execute(insert(Article), articles)
+        db.commit()
+        t0 = time.perf_counter()
+        if mode == "orm":
+            plate_orm(db, rows, links)
+        else:
+            plate_bulk(db, rows, links, chunk_size)
+        elapsed = time.perf_counter() - t0
+        counts = (db.scalar(select(func.count()).select_from(Course)), db.scalar(select(func.count()).select_from(CourseArticle)))
+        results.append((mode, elapsed, counts))
+        if mode == "bulk":
+            # Same keys again: every row conflicts and is updated in place
+            t0 = time.perf_counter()
+            plate_bulk(db, rows, links, chunk_size)
+            replate = time.perf_counter() - t0
+            counts = (db.scalar(select(func.count()).select_from(Course)), db.scalar(select(func.count()).select_from(CourseArticle)))
+            results.append(("bulk re-plate", replate, counts))
+        db.close()
+        engine.dispose()
+
+    for mode, elapsed, (n_courses, n_links) in results:
+        print(f"{label:>10} {mode:>14} {elapsed:9.2f} {len(rows) / elapsed:10.0f} {n_courses:>8} {n_links:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plating benchmark")
+    parser.add_argument("--courses", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--pg-url", type=str, default=os.getenv("BENCH_PG_URL"))
+    args = parser.parse_args()
+
+    articles, rows, links = synthetic(args.courses)
+    print(f"{'backend':>10} {'mode':>14} {'seconds':>9} {'rows/s':>10} {'courses':>8} {'links':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("sqlite", f"sqlite:///{os.path.join(tmp, 'plating.sqlite')}", articles, rows, links, args.chunk_size)
+    if args.pg_url:
+        bench("postgres", args.pg_url, articles, rows, links, args.chunk_size)
+    else:
+        print("(no --pg-url / BENCH_PG_URL given, skipping Postgres)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark: hot kitchen / web queries before and after the migrate_v5 indexes.
+
+Seeds a fresh database with synthetic courses, articles, links and user
+interactions, drops the secondary indexes, records EXPLAIN plans and median
+latencies for each query, applies migrate_v5.apply_indexes and records them
+again.
+
+SQLite always runs (a temp file). Pass --pg-url (or BENCH_PG_URL) to run
+against a scratch Postgres database as well; its tables are dropped and
+recreated. Entity containment (GIN) queries only run on Postgres.
+
+Usage:
+    python benchmarks/bench_queries.py [--courses 20000] [--repeat 20] [--out plans.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+# engine.py insists on a DATABASE_URL at import; the benchmark makes its own engines
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, text
+
+from src.db.engine import Base
+from src.db.models import Article, Course, CourseArticle, UserInteraction
+from migrate_v5 import INDEXED_TABLES, LATER_INDEXES, apply_indexes
+
+TABLES = [Article.__table__, Course.__table__, CourseArticle.__table__, UserInteraction.__table__]
+LANGUAGES = ["en-US", "ko", "ja", "fr", "de"]
+CATEGORIES = ["politics", "business", "technology", "ai", "sports", "world", "crypto", "science"]
+
+# name -> (sql, postgres only)
+QUERIES = {
+    "menu_latest_100": ("SELECT title FROM courses ORDER BY published_at DESC LIMIT 100", False),
+    "feed_language_category": (
+        "SELECT id, title FROM courses WHERE language = :language AND category = :category "
+        "ORDER BY published_at DESC LIMIT 50", False),
+    "courses_for_url": (
+        "SELECT courses.id, courses.title FROM courses "
+        "JOIN course_articles ON course_articles.course_id = courses.id "
+        "JOIN articles ON articles.id = course_articles.article_id "
+        "WHERE articles.url = :url", False),
+    "interactions_for_course": (
+        "SELECT id, interaction_type FROM user_interactions WHERE course_id = :course_id "
+        "ORDER BY created_at DESC LIMIT 50", False),
+    "courses_with_entity": (
+        "SELECT id, title FROM courses WHERE entities_json @> CAST(:entity AS JSONB) LIMIT 50", True),
+}
+
+
+def seed(engine, n_courses, rng):
+    now = datetime.now(timezone.utc)
+    articles, courses, links, interactions = [], [], [], []
+    for i in range(n_courses):
+        published = now - timedelta(minutes=rng.randrange(60 * 24 * 90))
+        course_id = uuid.uuid4()
+        courses.append({
+            "id": course_id, "course_key": f"course_{i}", "title": f"Course {i}", "summary": "Lorem ipsum " * 10,
+            "entities_json": [f"Entity{rng.randrange(2000)}" for _ in range(3)],
+            "topics_json": [rng.choice(CATEGORIES)],
+            "source_urls": [], "published_at": published,
+            "category": rng.choice(CATEGORIES), "language": rng.choice(LANGUAGES),
+        })
+        for j in range(3):
+            article_id = uuid.uuid4()
+            articles.append({"id": article_id, "url": f"https://example.com/{i}/{j}", "title": f"Article {i}.{j}", "published_at": published})
+            links.append({"course_id": course_id, "article_id": article_id})
+        for _ in range(rng.randrange(5)):
+            interactions.append({"id": uuid.uuid4(), "course_id": course_id, "interaction_type": "click_source",
+                                 "created_at": published + timedelta(minutes=rng.randrange(600))})
+    with engine.begin() as conn:
+        for model, rows in ((Article, articles), (Course, courses), (CourseArticle, links), (UserInteraction, interactions)):
+            for start in range(0, len(rows), 5000):
+                conn.execute(insert(model), rows[start:start + 5000])
+
+
+def drop_secondary_indexes(engine):
+    with engine.begin() as conn:
+        for model in INDEXED_TABLES:
+            for index in model.__table__.indexes:
+                if index.name in LATER_INDEXES:
+                    continue  # not one of the indexes apply_indexes puts back
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        if engine.dialect.name == "postgresql":
+            for model in INDEXED_TABLES:
+                conn.execute(text(f"ANALYZE {model.__tablename__}"))
+        else:
+            conn.execute(text("ANALYZE"))
+
+
+def query_params(engine, rng):
+    with engine.connect() as conn:
+        url = conn.execute(text("SELECT url FROM articles ORDER BY url LIMIT 1 OFFSET :n"), {"n": rng.randrange(1000)}).scalar()
+        course_id = conn.execute(text("SELECT course_id FROM user_interactions LIMIT 1")).scalar()
+    return {"language": "ko", "category": "ai", "url": url, "course_id": str(course_id), "entity": json.dumps(["Entity7"])}
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), params).fetchall()
+        return [r[0] for r in rows]
+    rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+    return [r[-1] for r in rows]
+
+
+def measure(engine, params, repeat):
+    results = {}
+    is_pg = engine.dialect.name == "postgresql"
+    with engine.connect() as conn:
+        for name, (sql, pg_only) in QUERIES.items():
+            if pg_only and not is_pg:
+                continue
+            bound = {k: v for k, v in params.items() if f":{k}" in sql}
+            conn.execute(text(sql), bound).fetchall()  # warm up
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.execute(text(sql), bound).fetchall()
+                timings.append((time.perf_counter() - t0) * 1000)
+            results[name] = {"median_ms": statistics.median(timings), "plan": explain(conn, sql, bound)}
+    return results
+
+
+def bench(label, url, args):
+    rng = random.Random(11)
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=list(reversed(TABLES)))
+    Base.metadata.create_all(engine, tables=TABLES)
+    seed(engine, args.courses, rng)
+    drop_secondary_indexes(engine)
+    params = query_params(engine, rng)
+
+    before = measure(engine, params, args.repeat)
+    apply_indexes(engine)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    after = measure(engine, params, args.repeat)
+    engine.dispose()
+
+    print(f"\n{label}: {args.courses} courses")
+    print(f"{'query':>26} {'before_ms':>10} {'after_ms':>10} {'speedup':>8}")
+    for name in before:
+        b, a = before[name]["median_ms"], after[name]["median_ms"]
+        print(f"{name:>26} {b:10.2f} {a:10.2f} {b / a if a else 0:7.1f}x")
+    for name in before:
+        print(f"\n[{label}] {name}\n  before: " + "\n          ".join(before[name]["plan"]))
+        print("  after:  " + "\n          ".join(after[name]["plan"]))
+    return {"before": before, "after": after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query/index benchmark")
+    parser.add_argument("--courses", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pg-url", type=str, default=os.getenv("BENCH_PG_URL"))
+    parser.add_argument("--out", type=str, default=None, help="Write plans and latencies as JSON")
+    args = parser.parse_args()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        report["sqlite"] = bench("sqlite", f"sqlite:///{os.path.join(tmp, 'queries.sqlite')}", args)
+    if args.pg_url:
+        report["postgres"] = bench("postgres", args.pg_url, args)
+    else:
+        print("\n(no --pg-url / BENCH_PG_URL given, skipping Postgres)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: per-page pretty-printed JSON dumps vs. the compressed raw archive.
+
+Writes --fetches feed pages (built from the data/raw sample) both ways into
+a temporary directory: the old NewsClient layout (one indent=2 JSON file per
+page, written on the fetch path) and src.ingest.raw_archive (gzip JSONL
+segments with an offset index, written by a background thread). Reports
+bytes on disk, time the fetch path spends per page, and time to read every
+item back (the old layout by loading every file, the archive through its
+index, as --replay does).
+
+Usage:
+    python benchmarks/bench_raw_archive.py [--fetches 2000]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from src.ingest.raw_archive import RawArchive, iter_records, read_index
+
+
+def sample_items():
+    items = []
+    for path in sorted(glob.glob(os.path.join(KITCHEN_DIR, "data", "raw", "*", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            items.extend(json.load(f).get("results", []))
+    return items
+
+
+def pages(items, fetches, per_page):
+    for n in range(fetches):
+        start = (n * per_page) % max(1, len(items) - per_page)
+        yield n, [dict(item, link=f"{item.get('link')}#{n}") for item in items[start:start + per_page]]
+
+
+def dir_bytes(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def legacy(root, args, items):
+    write_s = 0.0
+    for n, page in pages(items, args.fetches, args.per_page):
+        t0 = time.perf_counter()
+        day = os.path.join(root, "20251228")
+        os.makedirs(day, exist_ok=True)
+        with open(os.path.join(day, f"run_page{n}.json"), "w", encoding="utf-8") as f:
+            json.dump({"status": "success", "results": page}, f, ensure_ascii=False, indent=2)
+        write_s += time.perf_counter() - t0
+    t0 = time.perf_counter()
+    count = 0
+    for path in glob.glob(os.path.join(root, "*", "*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            count += len(json.load(f)["results"])
+    return write_s, time.perf_counter() - t0, count, dir_bytes(root)
+
+
+def archived(root, args, items):
+    archive = RawArchive(root=root)
+    write_s = 0.0
+    for n, page in pages(items, args.fetches, args.per_page):
+        t0 = time.perf_counter()
+        archive.append("newsdata", page, category="top", hl="en", page=n)
+        write_s += time.perf_counter() - t0
+    archive.close()
+    t0 = time.perf_counter()
+    count = sum(len(record["items"]) for record in iter_records(root))
+    scan_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    indexed = sum(entry["items"] for entry in read_index(root))
+    index_s = time.perf_counter() - t0
+    assert indexed == count
+    return write_s, scan_s, count, dir_bytes(root), index_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw archive benchmark")
+    parser.add_argument("--fetches", type=int, default=2000, help="Feed pages to store")
+    parser.add_argument("--per-page", type=int, default=25)
+    args = parser.parse_args()
+
+    items = sample_items()
+    with tempfile.TemporaryDirectory() as old_root, tempfile.TemporaryDirectory() as new_root:
+        old_write, old_scan, old_count, old_bytes = legacy(old_root, args, items)
+        new_write, new_scan, new_count, new_bytes, index_s = archived(new_root, args, items)
+
+    print(f"{args.fetches} fetches x {args.per_page} items")
+    print(f"{'layout':>10} {'MB':>7} {'fetch-path ms/page':>19} {'read all s':>11} {'items':>7}")
+    print(f"{'json dump':>10} {old_bytes / 1e6:7.2f} {old_write / args.fetches * 1000:19.3f} {old_scan:11.2f} {old_count:>7}")
+    print(f"{'archive':>10} {new_bytes / 1e6:7.2f} {new_write / args.fetches * 1000:19.3f} {new_scan:11.2f} {new_count:>7}")
+    print(f"archive index only (feed/run lookup, no decompression): {index_s:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
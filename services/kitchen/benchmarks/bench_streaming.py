@@ -0,0 +1,81 @@
+"""
+Benchmark: time-to-first-course for streamed vs buffered Chef responses.
+
+Cooks against src.ai.providers.FakeProvider, which emits a JSON course
+array in small chunks at a fixed token rate, then measures when the first course is
+available and when the batch finishes in each mode. Also cuts one response
+off mid-way to show streaming keeps every course that completed.
+
+Usage:
+    python benchmarks/bench_streaming.py [--courses 12] [--chunk-delay 0.02]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KITCHEN_DIR)
+
+from src.utils.llm_cache import configure_cache
+from src.ingest import chef
+from src.ai import providers as llm
+
+
+def fake_response(n_courses):
+    courses = []
+    for i in range(n_courses):
+        courses.append({
+            "title": f"Course {i}",
+            "summary": " ".join(["lorem ipsum dolor sit amet"] * 20),
+            "category": "World",
+            "importance": 5,
+            "tags": ["bench"],
+            "ingredient_ids": [i],
+            "sources": [],
+        })
+    return json.dumps(courses, indent=2)
+
+
+def run(mode, items, text, args, cut_at=None):
+    # The Chef talks to a local FakeProvider: same chunk pacing for both modes
+    llm.use_fake_provider("fake", responder=lambda prompt: text, chunk_size=args.chunk_chars,
+                          chunk_delay=args.chunk_delay, cut_after=cut_at)
+
+    first = []
+    t0 = time.perf_counter()
+
+    def on_course(course):
+        if not first:
+            first.append(time.perf_counter() - t0)
+
+    courses = chef.cook_batch(items, model="fake", stream=(mode == "stream"), on_course=on_course, max_retries=0)
+    total = time.perf_counter() - t0
+    return courses or [], (first[0] if first else None), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming benchmark")
+    parser.add_argument("--courses", type=int, default=12)
+    parser.add_argument("--chunk-chars", type=int, default=16, help="Characters per streamed chunk (~4 tokens)")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="Seconds between chunks")
+    args = parser.parse_args()
+
+    configure_cache(enabled=False)
+    items = [{"title": f"Item {i}", "link": f"https://example.com/{i}", "source_name": "Bench"} for i in range(args.courses)]
+    text = fake_response(args.courses)
+
+    print(f"{'mode':>10} {'courses':>8} {'first_s':>8} {'total_s':>8}")
+    for mode in ("buffered", "stream"):
+        courses, first, total = run(mode, items, text, args)
+        print(f"{mode:>10} {len(courses):>8} {first or 0:8.2f} {total:8.2f}")
+
+    print("\nResponse cut off at 60%:")
+    for mode in ("buffered", "stream"):
+        courses, first, total = run(mode, items, text, args, cut_at=0.6)
+        print(f"{mode:>10} {len(courses):>8} kept of {args.courses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Local stand-in for the Google News RSS endpoints, used by the benchmarks.
+Every path returns a deterministic RSS feed after an artificial latency:
+synthetic stories, or a window of the given fixture items (e.g. data/raw)
+picked by the path, so different feeds overlap like real sections do.
+"""
+import hashlib
+import zlib
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from xml.sax.saxutils import escape
+
+
+def _fixture_entries(feed_key: str, items: list, items_per_feed: int) -> list:
+    start = zlib.crc32(feed_key.encode()) % len(items)
+    entries = []
+    for i in range(min(items_per_feed, len(items))):
+        item = items[(start + i) % len(items)]
+        try:
+            pub = format_datetime(datetime.strptime(item.get('pubDate') or "", "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc))
+        except ValueError:
+            pub = ""
+        source = item.get('source_name') or item.get('source_id') or "Stub Wire"
+        entries.append(
+            "<item>"
+            f"<title>{escape(item.get('title') or '')}</title>"
+            f"<link>{escape(item.get('link') or '')}</link>"
+            f"<description>{escape(item.get('description') or '')}</description>"
+            f"<pubDate>{pub}</pubDate>"
+            f'<source url="{escape(item.get("source_url") or "https://stub.example")}">{escape(source)}</source>'
+            "</item>"
+        )
+    return entries
+
+
+def build_rss(feed_key: str, items_per_feed: int = 20, items: list = None) -> bytes:
+    now = datetime(2025, 12, 28, 12, 0, tzinfo=timezone.utc)
+    entries = _fixture_entries(feed_key, items, items_per_feed) if items else []
+    for i in range(0 if items else items_per_feed):
+        digest = hashlib.md5(f"{feed_key}:{i}".encode()).hexdigest()[:10]
+        pub = format_datetime(now - timedelta(minutes=7 * i))
+        entries.append(
+            "<item>"
+            f"<title>{escape(feed_key)} story {i} {digest}</title>"
+            f"<link>https://stub.example/{digest}</link>"
+            f"<description>Synthetic snippet for {escape(feed_key)} item {i}.</description>"
+            f"<pubDate>{pub}</pubDate>"
+            f'<source url="https://stub.example">Stub Wire</source>'
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{escape(feed_key)}</title>{''.join(entries)}</channel></rss>"
+    ).encode("utf-8")
+
+
+class StubFeedServer:
+    def __init__(self, latency: float = 0.2, items_per_feed: int = 20, host: str = "127.0.0.1", items: list = None):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                body = build_rss(self.path, server.items_per_feed, server.items)
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.latency = latency
+        self.items_per_feed = items_per_feed
+        self.items = items
+        self.requests = 0
+        self.not_modified = 0
+        self.httpd = ThreadingHTTPServer((host, 0), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/rss"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -52,7 +52,7 @@ GEMINI_API_KEY={creds['gemini']['api_key']}
 SUPABASE_URL={supabase.get('url')}
 SUPABASE_SERVICE_ROLE_KEY={supabase.get('service_role_key')}
 DATABASE_URL={new_conn}
-RAW_DUMP_DIR=data/raw
+RAW_ARCHIVE_DIR=data/archive
 """
     
     with open('services/kitchen/.env', 'w') as f:
@@ -0,0 +1,41 @@
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from src.db.engine import engine
+from src.db.models import Article, Course, CourseArticle, UserInteraction
+
+# Secondary indexes declared in models.py (__table_args__)
+INDEXED_TABLES = [Course, Article, CourseArticle, UserInteraction]
+# Declared in models.py too, but created by the migration that adds their column (run after this one)
+LATER_INDEXES = {"ix_courses_translation_of"}  # migrate_v8
+
+def apply_indexes(bind=engine):
+    """CREATE INDEX IF NOT EXISTS for every declared index; CONCURRENTLY on Postgres so writers aren't blocked."""
+    dialect_name = bind.dialect.name
+    # CONCURRENTLY can't run inside a transaction block
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for model in INDEXED_TABLES:
+            for index in sorted(model.__table__.indexes, key=lambda i: i.name):
+                if index.name in LATER_INDEXES:
+                    continue
+                if index.dialect_options["postgresql"].get("using") == "gin" and dialect_name != "postgresql":
+                    continue
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=bind.dialect))
+                if dialect_name == "postgresql":
+                    ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+                try:
+                    conn.execute(text(ddl))
+                    print(f"Index ready: {index.name}")
+                except Exception as e:
+                    print(f"Failed to create {index.name}: {e}")
+        if dialect_name == "postgresql":
+            for model in INDEXED_TABLES:
+                conn.execute(text(f"ANALYZE {model.__tablename__}"))
+
+def migrate():
+    print("Migrating V5 (query indexes)...")
+    apply_indexes(engine)
+    print("Done.")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+
+from src.db.engine import engine
+
+def migrate():
+    print("Migrating V6 (course embeddings)...")
+    vector_type = "REAL[]" if engine.dialect.name == "postgresql" else "JSON"
+    with engine.connect() as conn:
+        for ddl in (f"ALTER TABLE courses ADD COLUMN embedding {vector_type}",
+                    "ALTER TABLE courses ADD COLUMN embedding_model VARCHAR"):
+            try:
+                conn.execute(text(ddl))
+                conn.commit()
+                print(f"Applied: {ddl}")
+            except Exception as e:
+                conn.rollback()
+                print(f"Migration step failed (maybe column exists?): {e}")
+    print("Done.")
+
+if __name__ == "__main__":
+    migrate()
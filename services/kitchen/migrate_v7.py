@@ -0,0 +1,18 @@
+from sqlalchemy import text
+
+from src.db.engine import engine
+
+def migrate():
+    print("Migrating V7 (incremental course updates)...")
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE courses ADD COLUMN synthesized_sources INTEGER"))
+            conn.commit()
+            print("Added synthesized_sources column to courses table.")
+        except Exception as e:
+            conn.rollback()
+            print(f"Migration failed (maybe column exists?): {e}")
+    print("Done.")
+
+if __name__ == "__main__":
+    migrate()
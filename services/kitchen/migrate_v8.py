@@ -0,0 +1,22 @@
+from sqlalchemy import text
+
+from src.db.engine import engine
+
+def migrate():
+    print("Migrating V8 (course translations)...")
+    uuid_type = "UUID" if engine.dialect.name == "postgresql" else "CHAR(32)"
+    with engine.connect() as conn:
+        for ddl in (f"ALTER TABLE courses ADD COLUMN translation_of {uuid_type}",
+                    "ALTER TABLE courses ADD COLUMN translated_from VARCHAR",
+                    "CREATE INDEX IF NOT EXISTS ix_courses_translation_of ON courses (translation_of)"):
+            try:
+                conn.execute(text(ddl))
+                conn.commit()
+                print(f"Applied: {ddl}")
+            except Exception as e:
+                conn.rollback()
+                print(f"Migration step failed (maybe column exists?): {e}")
+    print("Done.")
+
+if __name__ == "__main__":
+    migrate()
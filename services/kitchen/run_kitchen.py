@@ -3,7 +3,9 @@ import sys
 import os
 import json
 import uuid
-from datetime import datetime
+import signal
+import threading
+from datetime import datetime, timedelta
 
 # Fix Windows terminal encoding for Unicode characters
 if sys.platform == 'win32':
@@ -15,12 +17,22 @@ if sys.platform == 'win32':
 sys.path.append(os.getcwd())
 
 # Import DB engine first to ensure it loads
-from src.db.engine import get_db, engine, Base
+from src.db.engine import get_db, engine, Base, pool_metrics
 from src.db.models import Article, Course, CourseArticle
+from src.db.plating import course_row, article_row, plate_courses, upsert_articles, course_links, merge_into_courses, PLATE_CHUNK_SIZE
 
 from src.ingest.google_news_client import GoogleNewsClient
-from src.ingest.grouping import simple_group_articles
+from src.ingest.fetcher import fetch_stages, FETCH_MAX_WORKERS, FETCH_RATE_PER_HOST
+from src.ingest.http_session import FeedValidatorStore
+from src.ingest.seen_links import SeenLinkIndex
+from src.utils.rate_limiter import HostRateLimiter
+from src.ingest.grouping import simple_group_articles, precluster_items
 from src.ingest.normalizer import normalize_group_to_course
+from src.ingest.menu_index import MenuIndex, MENU_LOOKBACK_HOURS, MENU_RELOAD_MINUTES
+from src.ai.embeddings import get_embedder, EMBEDDING_MODEL
+from src.ingest.course_updates import merge_plan, refresh_courses, COURSE_RESYNTH_MIN_SOURCES
+from src.ingest.localize import localize_courses
+from src.ingest.raw_archive import configure_archive, ReplayClient, new_run_id, RAW_ARCHIVE_ENABLED
 
 def parse_date(date_str):
     if not date_str: return None
@@ -41,17 +53,36 @@ def parse_date(date_str):
 
 import argparse
 
-from src.utils.status_reporter import update_kitchen_status
+from src.utils.status_reporter import StatusReporter
+from src.utils.model_config import load_model_config, get_model_entry
+from src.ai.providers import ledger as llm_ledger, resolve as llm_resolve, LLM_HEDGE_PERCENTILE
+from src.ai.latency import latency_stats
+from src.utils.llm_cache import configure_cache
+from src.ingest.scheduler import get_provider_limiter
+from src.ingest.pipeline import Pipeline, Stage, PIPELINE_QUEUE_SIZE
+from src.ingest.chef import cook_batch, create_dynamic_batches, batch_budget_for, StreamingBatcher
 
-def main():
-    # Load model config from web app
-    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'apps', 'web', 'lib', 'model_config.json')
-    with open(config_path, 'r') as f:
-        model_config = json.load(f)
-    
+# Default minutes between two cycles of the same job in --serve mode
+KITCHEN_INTERVAL_MINUTES = float(os.getenv("KITCHEN_INTERVAL_MINUTES", "30"))
+
+# Where the latest AI commentary is written (services/latest_commentary.txt by default)
+COMMENTARY_PATH = os.getenv("COMMENTARY_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'latest_commentary.txt'))
+
+DEFAULT_CATEGORIES = ["top", "business", "technology", "science", "entertainment", "health", "sports", "world"]
+
+# Language Mapping for Chef Prompt
+HL_TO_LANG = {
+    'en-US': 'English', 'en-GB': 'English', 'en-IN': 'English',
+    'ko': 'Korean', 'ja': 'Japanese', 'zh-CN': 'Simplified Chinese', 'zh-TW': 'Traditional Chinese',
+    'fr': 'French', 'de': 'German', 'es': 'Spanish', 'it': 'Italian', 'pt-BR': 'Portuguese',
+    'ru': 'Russian', 'ar': 'Arabic', 'hi': 'Hindi', 'id': 'Indonesian'
+}
+
+
+def build_parser(model_config):
     model_choices = [m['id'] for m in model_config['models']]
     default_model = model_config['defaultModel']
-    
+
     parser = argparse.ArgumentParser(description='FeedBuffet Kitchen Service')
     parser.add_argument('--category', type=str, help='Specific category to fetch')
     parser.add_argument('--categories', type=str, help='Comma-separated list of categories')
@@ -59,220 +90,660 @@ def main():
     parser.add_argument('--hl', type=str, default='en-US', help='Language (e.g. en-US)')
     parser.add_argument('--gl', type=str, default='US', help='Location (e.g. US)')
     parser.add_argument('--ceid', type=str, default='US:en', help='Country:Language (e.g. US:en)')
+    parser.add_argument('--locales', type=str, default=None, help='Comma-separated hl/gl/ceid list (e.g. en-US/US/US:en,ko/KR/KR:ko): feeds of all are cooked once in the first, then translated')
     parser.add_argument('--model', type=str, default=default_model, choices=model_choices, help='AI model to use')
-    args = parser.parse_args()
-
-    # 1. Init DB
-    Base.metadata.create_all(bind=engine)
-    db = next(get_db())
-    update_kitchen_status(db, "Warming up the kitchen...", 5)
-    
-    # 2. Fetch News (Google News RSS)
-    # client = NewsClient() 
-    client = GoogleNewsClient()
-    all_articles_data = []
-    
+    parser.add_argument('--fetch-workers', type=int, default=FETCH_MAX_WORKERS, help='Max concurrent category fetches')
+    parser.add_argument('--fetch-rate', type=float, default=FETCH_RATE_PER_HOST, help='Max requests per second per feed host')
+    parser.add_argument('--refetch', action='store_true', help='Ignore stored ETag/Last-Modified validators and download every feed')
+    parser.add_argument('--include-seen', action='store_true', help='Cook every fetched item, even links already sent in earlier runs')
+    parser.add_argument('--precluster', action='store_true', help='Collapse near-duplicate headlines locally before prompting the Chef')
+    parser.add_argument('--menu-lookback-hours', type=float, default=MENU_LOOKBACK_HOURS, help='Courses published this recently count as already on the menu')
+    parser.add_argument('--menu-threshold', type=float, default=None, help='Cosine similarity at which a new item repeats a menu course (default: per embedding model)')
+    parser.add_argument('--embedding-model', type=str, default=EMBEDDING_MODEL, help='auto, gemini or hashing (local, offline)')
+    parser.add_argument('--resynth-min-sources', type=int, default=COURSE_RESYNTH_MIN_SOURCES, help='Re-write a menu course once this many merged sources are pending')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk LLM response cache')
+    parser.add_argument('--refresh-cache', action='store_true', help='Ignore cached LLM responses but store fresh ones')
+    parser.add_argument('--batch-mode', type=str, default='greedy', choices=['greedy', 'binpack'], help='greedy keeps feed order; binpack minimises LLM calls')
+    parser.add_argument('--cook-workers', type=int, default=None, help='Max concurrent Chef batches (default: maxConcurrency from model_config.json)')
+    parser.add_argument('--queue-size', type=int, default=PIPELINE_QUEUE_SIZE, help='Items buffered between pipeline stages (backpressure)')
+    parser.add_argument('--batch-max-items', type=int, default=None, help='Cap items per Chef batch so cooking starts sooner (default: output budget)')
+    parser.add_argument('--plate-chunk-size', type=int, default=PLATE_CHUNK_SIZE, help='Courses per bulk upsert statement')
+    parser.add_argument('--fallback', action='store_true', help="Retry failed batches on the model's fallbackModels from model_config.json")
+    parser.add_argument('--hedge', action='store_true', help='Also fire the next fallback model when a call runs past its usual latency')
+    parser.add_argument('--hedge-percentile', type=float, default=LLM_HEDGE_PERCENTILE, help='Latency percentile that triggers a hedge (with --hedge)')
+    parser.add_argument('--stream', action='store_true', help='Stream Chef responses and parse courses as they arrive (keeps finished courses if a response is cut off)')
+    parser.add_argument('--serve', action='store_true', help='Keep running: cook every --interval minutes (or per --schedule) with clients and menu kept warm; SIGTERM drains')
+    parser.add_argument('--interval', type=float, default=KITCHEN_INTERVAL_MINUTES, help='Minutes between cycles with --serve')
+    parser.add_argument('--schedule', type=str, default=None, help='JSON file listing --serve jobs (categories/query, locale, interval_minutes)')
+    parser.add_argument('--max-cycles', type=int, default=0, help='With --serve, stop after this many cycles (0: until SIGTERM)')
+    parser.add_argument('--replay', type=str, default=None, help='Cook archived feeds of a day (YYYYMMDD) or run (YYYYMMDD_HHMMSS) instead of fetching; no network, seen links and validators untouched')
+    parser.add_argument('--no-archive', action='store_true', help='Do not append fetched feeds to the raw archive')
+    parser.add_argument('--menu-reload-minutes', type=float, default=MENU_RELOAD_MINUTES, help='With --serve, reload the warm menu from the database this often')
+    return parser
+
+
+def parse_locales(spec):
+    """'en-US/US/US:en,ko/KR/KR:ko' -> [{'hl', 'gl', 'ceid'}, ...]"""
+    locales = []
+    for part in spec.split(','):
+        fields = [f.strip() for f in part.strip().split('/')]
+        if len(fields) != 3 or not all(fields):
+            raise ValueError(f"Locale must be hl/gl/ceid, got '{part}'")
+        locales.append(dict(zip(('hl', 'gl', 'ceid'), fields)))
+    return locales
+
+
+def job_from_args(args):
+    """One cooking job (what to fetch, for which locales, how often) from CLI-style settings."""
     if args.category:
-        CATEGORIES = [args.category]
+        categories = [args.category]
     elif args.categories:
-        CATEGORIES = [c.strip() for c in args.categories.split(',') if c.strip()]
+        categories = [c.strip() for c in args.categories.split(',') if c.strip()]
     elif args.query:
-        CATEGORIES = [] # Use query instead
-        update_kitchen_status(db, f"Hunting for '{args.query}'...", 10)
-        data = client.fetch_latest_news(query=args.query, max_pages=1, hl=args.hl, gl=args.gl, ceid=args.ceid)
-        all_articles_data.extend(data)
+        categories = [None] # One fetch for the query instead of categories
     else:
         # Broadening
-        CATEGORIES = ["top", "business", "technology", "science", "entertainment", "health", "sports", "world"]
+        categories = DEFAULT_CATEGORIES
+    # The first locale is cooked; the others get translations of its courses
+    locales = parse_locales(args.locales) if args.locales else [{'hl': args.hl, 'gl': args.gl, 'ceid': args.ceid}]
+    label = f"'{args.query}'" if categories == [None] else ','.join(categories)
+    return dict(locales[0], **{
+        'name': f"{'+'.join(l['hl'] for l in locales)} {label}",
+        'categories': categories,
+        'query': args.query,
+        'locales': locales,
+        'interval': args.interval * 60,
+    })
+
+
+def load_schedule(path, args):
+    """
+    --serve jobs from a JSON list, e.g.
+    [{"categories": ["top", "business"], "interval_minutes": 15},
+     {"query": "AI chips", "hl": "ko", "gl": "KR", "ceid": "KR:ko", "interval_minutes": 60},
+     {"locales": ["en-US/US/US:en", "ja/JP/JP:ja"], "interval_minutes": 30}]
+    Keys a job leaves out fall back to the command line.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    jobs = []
+    for entry in entries:
+        settings = dict(vars(args))
+        if any(k in entry for k in ('category', 'categories', 'query')):
+            settings.update(category=None, categories=None, query=None)
+        if any(k in entry for k in ('hl', 'gl', 'ceid', 'locales')):
+            settings['locales'] = None
+        for key in ('category', 'query', 'hl', 'gl', 'ceid'):
+            if key in entry:
+                settings[key] = entry[key]
+        if 'locales' in entry:
+            locales = entry['locales']
+            settings['locales'] = ','.join(locales) if isinstance(locales, list) else locales
+        if 'categories' in entry:
+            cats = entry['categories']
+            settings['categories'] = ','.join(cats) if isinstance(cats, list) else cats
+        if 'interval_minutes' in entry:
+            settings['interval'] = float(entry['interval_minutes'])
+        job = job_from_args(argparse.Namespace(**settings))
+        if entry.get('name'):
+            job['name'] = entry['name']
+        jobs.append(job)
+    return jobs
+
+
+def replay_job(client, args):
+    """
+    The job --replay runs: every feed (category or query, locale) archived for
+    the target, narrowed by --category/--categories/--query and --locales.
+    """
+    feeds = client.feeds()
+    if args.locales:
+        locales = parse_locales(args.locales)
+    else:
+        locales = list({(l['hl'], l['gl'], l['ceid']): l for _, l in feeds}.values())
+    labels = list(dict.fromkeys(label for label, _ in feeds))
+    if args.category or args.categories or args.query:
+        wanted = [args.query] if args.query and not (args.category or args.categories) else job_from_args(args)['categories']
+        labels = [label for label in wanted if label in labels]
+    return dict(locales[0] if locales else {'hl': args.hl, 'gl': args.gl, 'ceid': args.ceid}, **{
+        'name': f"replay {args.replay}",
+        'categories': labels,
+        'query': None,
+        'locales': locales,
+        'interval': 0,
+    })
 
-    for i, cat in enumerate(CATEGORIES):
-        print(f"Fetching category: {cat}...")
-        update_kitchen_status(db, f"Sourcing ingredients: {cat}...", 10 + (i * 5))
+
+class Kitchen:
+    """
+    Everything a cooking cycle needs that outlives it: the provider client,
+    DB pool, feed client (validators, per-host limits), raw archive, seen-link
+    index, LLM limiter and a warm menu index per language. Built once;
+    run_cycle() can then be called repeatedly (--serve) without paying the
+    startup cost again. With --replay the feed client reads the archive.
+    """
+
+    def __init__(self, args):
+        started = time.time()
+        self.args = args
+        self.llm_cache = configure_cache(enabled=not args.no_cache, refresh=args.refresh_cache)
+        # Latency history from earlier runs tunes the hedge threshold from the first batch
+        latency_stats.load()
+        # Only the selected model's SDK is imported and its client built (shared for the whole run)
+        provider = llm_resolve(args.model)[0]
+        print(f"{provider.name} client ready: {provider.available()}")
+        # 1. Init DB
+        Base.metadata.create_all(bind=engine)
+        # Status writes go through a background flusher so fetching/cooking never waits on them
+        self.reporter = StatusReporter()
+        self.reporter.update("Warming up the kitchen...", 5)
+        # Every fetched feed is appended to the compressed raw archive (off the fetch path)
+        self.archive = configure_archive(enabled=RAW_ARCHIVE_ENABLED and not args.no_archive and not args.replay)
+        if args.replay:
+            # Archived items instead of the network; a throwaway seen index so the replay is
+            # reproducible, and nothing it does changes what the live kitchen skips
+            self.validators = FeedValidatorStore(path=None)
+            self.client = ReplayClient(args.replay)
+            self.seen_links = SeenLinkIndex(path=None)
+            print(f"Replaying {len(self.client.records)} archived fetches from {args.replay} (no network).")
+        else:
+            # Conditional GET validators; with --refetch we start empty but still record fresh ones
+            self.validators = FeedValidatorStore(load=not args.refetch)
+            self.client = GoogleNewsClient(rate_limiter=HostRateLimiter(rate=args.fetch_rate), validators=self.validators)
+            self.seen_links = SeenLinkIndex()
+        # Concurrent cooking, bounded by the provider's concurrency and RPM limits
+        self.limiter = get_provider_limiter(args.model)
+        self.cook_workers = args.cook_workers or self.limiter.max_concurrency
+        self.menus = {}
+        self.cycles = 0
+        # Metrics of every finished cycle (stage timings, counts), newest last
+        self.history = []
+        self.setup_seconds = time.time() - started
+
+    def menu_for(self, db, hl):
+        """
+        The menu index for this language. Loaded from the database on first
+        use and again every --menu-reload-minutes (to pick up courses other
+        processes plated and re-written summaries); in between, the warm
+        index only drops aged-out courses and gains this process's new ones.
+        """
+        args = self.args
+        menu = self.menus.get(hl)
         try:
-            cat_data = client.fetch_latest_news(category=cat, max_pages=1, hl=args.hl, gl=args.gl, ceid=args.ceid)
-            all_articles_data.extend(cat_data)
-            time.sleep(1) 
+            if menu is not None and time.time() - menu.loaded_at < args.menu_reload_minutes * 60:
+                dropped = menu.prune(args.menu_lookback_hours)
+                print(f"Chef: Checking against {len(menu)} courses on the warm menu ({dropped} aged out, {menu.embedder.name}).")
+                return menu
+            menu_start = time.time()
+            menu = MenuIndex(get_embedder(args.embedding_model), threshold=args.menu_threshold)
+            menu.load(db, lookback_hours=args.menu_lookback_hours, language=hl)
+            db.commit()
+            self.menus[hl] = menu
+            print(f"Chef: Checking against {len(menu)} courses on the menu (last {args.menu_lookback_hours:g}h, {menu.embedder.name}, {time.time() - menu_start:.2f}s).")
+            return menu
         except Exception as e:
-            print(f"Failed to fetch {cat}: {e}")
-
-    update_kitchen_status(db, f"Chopping {len(all_articles_data)} raw items...", 40)
-    print(f"Fetched {len(all_articles_data)} raw articles.")
-    
-    # 3. Chef's Special: Batch Cooking with Deduplication
-    
-    # Fetch "Menu" (Existing Courses from last 24h to avoid dupes)
-    # We simply fetch all recent titles
-    db = next(get_db())
-    recent_courses = db.query(Course.title).order_by(Course.published_at.desc()).limit(100).all()
-    existing_titles = [r[0] for r in recent_courses]
-    
-    print(f"Chef: Checking against {len(existing_titles)} items on the menu.")
-    update_kitchen_status(db, "Chef is designing the menu...", 50)
-
-    # Convert raw data to standardized dicts for the Chef
-    cleaned_ingredients = []
-    for ad in all_articles_data:
-        if not isinstance(ad, dict): continue
-        if not ad.get('title'): continue
-        
-        cleaned_ingredients.append({
-            'title': ad.get('title'),
-            'source_name': ad.get('source_id', 'Google News'),
-            'published_at': str(parse_date(ad.get('pubDate'))),
-            'link': ad.get('link') or ad.get('url'),
-            'description': ad.get('description', '')
-        })
-
-    # Call the Chef
-    # Dynamic Chunking
-    from src.ingest.chef import cook_batch, create_dynamic_batches
-    
-    # 25,000 chars is roughly 6-8k tokens. 
-    # Gemini 1.5/Flight is 1M+, but let's be safe for output generation limits.
-    # We want to send as much as possible to get better clustering context.
-    # Language Mapping for Chef Prompt
-    HL_TO_LANG = {
-        'en-US': 'English', 'en-GB': 'English', 'en-IN': 'English',
-        'ko': 'Korean', 'ja': 'Japanese', 'zh-CN': 'Simplified Chinese', 'zh-TW': 'Traditional Chinese',
-        'fr': 'French', 'de': 'German', 'es': 'Spanish', 'it': 'Italian', 'pt-BR': 'Portuguese',
-        'ru': 'Russian', 'ar': 'Arabic', 'hi': 'Hindi', 'id': 'Indonesian'
-    }
-    target_lang_name = HL_TO_LANG.get(args.hl, "English")
-
-    # Model-specific batch sizes from config
-    MODEL_BATCH_SIZES = {m['id']: m['maxChars'] for m in model_config['models']}
-    
-    batch_size = MODEL_BATCH_SIZES.get(args.model, 3600000)
-    batches = create_dynamic_batches(cleaned_ingredients, max_chars=batch_size)
-    
-    new_courses_data = []
-    total_chunks = len(batches)
-    
-    # Language Mapping for Chef Prompt
-    HL_TO_LANG = {
-        'en-US': 'English', 'en-GB': 'English', 'en-IN': 'English',
-        'ko': 'Korean', 'ja': 'Japanese', 'zh-CN': 'Simplified Chinese', 'zh-TW': 'Traditional Chinese',
-        'fr': 'French', 'de': 'German', 'es': 'Spanish', 'it': 'Italian', 'pt-BR': 'Portuguese',
-        'ru': 'Russian', 'ar': 'Arabic', 'hi': 'Hindi', 'id': 'Indonesian'
-    }
-    target_lang_name = HL_TO_LANG.get(args.hl, "English")
-
-    for i, chunk in enumerate(batches):
-        base_progress = 60 + int((i/total_chunks)*30)
-        
-        def batch_status_updater(msg):
-            update_kitchen_status(db, f"Batch {i+1}/{total_chunks}: {msg}", base_progress)
+            print(f"Menu index unavailable, cooking without menu dedup: {e}")
+            db.rollback()
+            self.menus.pop(hl, None)
+            return None
 
-        update_kitchen_status(db, f"Chef preparing Batch {i + 1}/{total_chunks} " + f"({len(chunk)} items)...", base_progress)
-        
-        print(f"Cooking dynamic batch {i+1} with {len(chunk)} items for {target_lang_name} using {args.model}...")
-        
-        # Pass the human-readable language name and model choice
-        cooked = cook_batch(chunk, existing_titles, target_language=target_lang_name, status_callback=batch_status_updater, model=args.model)
-        new_courses_data.extend(cooked)
-        
-        # Rate limit safety
-        if i < total_chunks - 1:
-            time.sleep(2)
+    def run_cycle(self, job, stop=None):
+        """
+        Fetch, cook and plate one job. With a stop event, no new feeds are
+        fetched once it is set; what is already in the pipeline still gets
+        cooked and served. Returns the new courses.
+        """
+        self.cycles += 1
+        started = time.time()
+        self.archive.run_id = new_run_id()
+        self.metrics = {'cycle': self.cycles, 'job': job['name'], 'phases': {}}
+        db = next(get_db())
+        try:
+            courses = self._cook(db, job, stop)
+        except Exception:
+            # Validators staged by a failed cycle would turn its feeds into 304s next time
+            self.validators.discard()
+            raise
+        finally:
+            db.close()
+        self.metrics['wall'] = time.time() - started
+        self.history.append(self.metrics)
+        print(f"Cycle {self.cycles} ({job['name']}) took {self.metrics['wall']:.2f}s (one-time setup was {self.setup_seconds:.2f}s).")
+        return courses
+
+    def _phase(self, name, started):
+        """Record the seconds since `started` as this cycle's `name` phase; returns now."""
+        now = time.time()
+        self.metrics['phases'][name] = self.metrics['phases'].get(name, 0.0) + now - started
+        return now
+
+    def _cook(self, db, job, stop):
+        args = self.args
+        client, reporter, seen_links, limiter = self.client, self.reporter, self.seen_links, self.limiter
+        cook_workers = self.cook_workers
+        hl, query = job['hl'], job['query']
+        CATEGORIES = job['categories']
+        locales = job.get('locales') or [{'hl': hl, 'gl': job['gl'], 'ceid': job['ceid']}]
+        # One fetch per category and locale; every locale's items are clustered together
+        feeds = [(category, locale) for locale in locales for category in CATEGORIES]
+        reporter.update("Warming up the kitchen...", 5)
+        mark = time.time()
+
+        # Fetch "Menu": embeddings of courses inside the lookback window. Items that
+        # repeat one of them skip the Chef instead of listing titles in every prompt.
+        menu = self.menu_for(db, hl)
+        mark = self._phase('menu', mark)
+        target_lang_name = HL_TO_LANG.get(hl, "English")
+
+        # Model-specific token budget from config (context minus output reserve and prompt overhead);
+        # --batch-max-items lowers the item cap so the first batch is ready sooner
+        budget = batch_budget_for(args.model, target_language=target_lang_name)
+        if args.batch_max_items:
+            budget.max_items = min(budget.max_items or args.batch_max_items, args.batch_max_items)
+        batcher = StreamingBatcher(budget=budget)
+        print(f"Batching {args.batch_mode}: {budget.input_tokens} input tokens / {budget.max_items} items per call.")
+
+        # 2. Kitchen pipeline: fetch -> order -> prep -> cook -> plate, connected by bounded
+        # queues so cooking starts once the first batch fills and plating once the
+        # first batch is cooked, instead of each phase waiting for the whole run.
+        seen_keys = set()
+        cleaned_ingredients = []  # every new item this run (all become Articles)
+        binpack_items = []        # --batch-mode binpack needs every item before packing
+        on_menu = []
+        article_ids = {}
+        menu_additions = []       # (id, title, vector, published_at) of plated courses, for the warm menu
+        plated_ids = []
+        merged_ids = []
+        feed_of = {}              # link -> validator key of the feed it came from
+        served_links = []         # links of items in cooked and plated batches (then merged repeats)
+        counts = {'fetched': 0, 'raw': 0, 'seen': 0, 'batches': 0, 'cooked': 0, 'plated': 0, 'links': 0}
+        counts_lock = threading.Lock()
+        unchanged_before = client.unchanged_feeds
+
+        def feed_args(feed):
+            category, locale = feed
+            kwargs = {'category': category} if category else {'query': query}
+            return dict(kwargs, hl=locale['hl'], gl=locale['gl'], ceid=locale['ceid'])
 
-    update_kitchen_status(db, f"Plating {len(new_courses_data)} new courses...", 90)
+        def fetch_feed(feed):
+            if stop is not None and stop.is_set():
+                return []  # Draining: skip feeds not fetched yet
+            category, locale = feed
+            data = client.fetch_latest_news(max_pages=1, **feed_args(feed)) or []
+            with counts_lock:
+                counts['fetched'] += 1
+                done = counts['fetched']
+            label = category or f"'{query}'"
+            if len(locales) > 1:
+                label = f"{label} [{locale['hl']}]"
+            print(f"Fetched category: {label} ({done}/{len(feeds)}, {len(data)} items)")
+            reporter.update(f"Sourcing ingredients: {label}...", 10 + int((done / len(feeds)) * 30))
+            return data
 
-    # 4. Serve (Save to DB)
-    for course_data in new_courses_data:
+        def prep_stage(fetched, emit):
+            # Convert raw data to standardized dicts for the Chef (feeds arrive in feed order)
+            feed, raw_items = fetched
+            feed_hl = feed[1]['hl']
+            feed_key = client.feed_key(**feed_args(feed))
+            cleaned = []
+            for ad in raw_items:
+                if not isinstance(ad, dict): continue
+                if not ad.get('title'): continue
+                category = ad.get('category')
+                if isinstance(category, list): # NewsData items (e.g. replayed) list their categories
+                    category = category[0] if category else None
+                cleaned.append({
+                    'title': ad.get('title'),
+                    'source_name': ad.get('source_id', 'Google News'),
+                    'published_at': str(parse_date(ad.get('pubDate'))),
+                    'link': ad.get('link') or ad.get('url'),
+                    'description': ad.get('description', ''),
+                    'category': category,
+                    'language': feed_hl
+                })
+            # Incremental ingestion: only truly new links go to the Chef (also across categories)
+            dropped = 0
+            if not args.include_seen:
+                cleaned, dropped = seen_links.filter_new(cleaned, batch_keys=seen_keys)
+            with counts_lock:
+                counts['raw'] += len(cleaned) + dropped
+                counts['seen'] += dropped
+            cleaned_ingredients.extend(cleaned)
+            feed_of.update((item['link'], feed_key) for item in cleaned if item.get('link'))
+
+            # Optional local pre-clustering: one representative per near-duplicate group (per fetch)
+            chef_items = precluster_items(cleaned) if args.precluster else cleaned
+            # Stories already served skip the Chef and are merged into their course when serving
+            if menu is not None and len(menu):
+                try:
+                    chef_items, matched = menu.filter_new(chef_items)
+                    on_menu.extend(matched)
+                except Exception as e:
+                    print(f"Menu dedup failed, cooking every item: {e}")
+            if args.batch_mode == 'binpack':
+                binpack_items.extend(chef_items)
+                return
+            for batch in batcher.add(chef_items):
+                with counts_lock:
+                    counts['batches'] += 1
+                emit(batch)
+
+        def prep_flush(emit):
+            if args.batch_mode == 'binpack':
+                batches = create_dynamic_batches(binpack_items, budget=budget, mode='binpack')
+            else:
+                batches = batcher.flush()
+            for batch in batches:
+                with counts_lock:
+                    counts['batches'] += 1
+                emit(batch)
+
+        def cook_stage(chunk, emit):
+            with counts_lock:
+                i = counts['cooked']
+                counts['cooked'] += 1
+            print(f"Cooking dynamic batch {i+1} with {len(chunk)} items for {target_lang_name} using {args.model}...")
+            on_course = None
+            if args.stream:
+                on_course = lambda course: print(f"  Batch {i+1}: course ready - {course.get('title', 'Untitled')}")
+
+            def status(msg):
+                with counts_lock:
+                    total = max(counts['batches'], i + 1)
+                reporter.update(f"Batch {i+1}: {msg}", 50 + int((i / total) * 40))
+            # Pass the human-readable language name and model choice
+            courses = cook_batch(chunk, target_language=target_lang_name, status_callback=status, model=args.model, rate_limiter=limiter, stream=args.stream, on_course=on_course,
+                                 fallback=args.fallback, hedge_percentile=args.hedge_percentile if args.hedge else None)
+            emit((chunk, courses))
+
+        def plate_stage(cooked, emit):
+            # 3. Serve (Save to DB) - bulk upsert per cooked batch, committed per batch so no
+            # connection is held across the cycle's LLM calls (transaction pooling hands it back)
+            chunk, courses = cooked
+            # None: the Chef failed (unlike [], a valid answer with nothing worth serving)
+            cooked_ok = courses is not None
+            courses = courses or []
+            # New courses carry their embedding so the next run's menu needs no backfill
+            if menu is not None and courses:
+                try:
+                    menu.embed_courses(courses)
+                except Exception as e:
+                    print(f"Failed to embed new courses: {e}")
+            # Every new raw item becomes an Article (one row per URL); courses link to
+            # the items the Chef reports in 'ingredient_ids'.
+            items = [m for item in chunk for m in (item.get('members') or [item])]
+            plated_pairs = []
+            for course_data in courses:
+                try:
+                    # Remove strict allowed_cats filtering to support dynamic categories
+                    plated_pairs.append((course_data, course_row(
+                        course_data,
+                        language=hl, # Capture the language setting
+                        published_at=parse_date(course_data.get('representative_published_at'))
+                    )))
+                except Exception as e:
+                    print(f"Failed to plate course: {e}")
+            try:
+                with db.begin_nested():
+                    stored = upsert_articles(
+                        db,
+                        [article_row(item, language=item.get('language', hl), published_at=parse_date(item.get('published_at'))) for item in items],
+                        chunk_size=args.plate_chunk_size
+                    )
+                    links = course_links(plated_pairs, stored)
+                    plated = plate_courses(db, [row for _, row in plated_pairs], links=links, chunk_size=args.plate_chunk_size)
+                db.commit()
+                article_ids.update(stored)
+                with counts_lock:
+                    counts['plated'] += len(plated)
+                    counts['links'] += sum(len(v) for v in links.values())
+                plated_ids.extend(plated.values())
+                menu_additions.extend(
+                    (plated[row['course_key']], row['title'], course_data['embedding'], row['published_at'])
+                    for course_data, row in plated_pairs
+                    if row['course_key'] in plated and course_data.get('embedding')
+                )
+            except Exception as e:
+                print(f"Failed to plate courses: {e}")
+                db.rollback()
+                return
+            # A batch the Chef failed on is cooked again next run
+            if cooked_ok:
+                served_links.extend(item['link'] for item in items if item.get('link'))
+            for course in courses:
+                emit(course)
+
+        pipeline = Pipeline(fetch_stages(fetch_feed, workers=args.fetch_workers, queue_size=args.queue_size) + [
+            Stage("prep", prep_stage, flush=prep_flush, queue_size=args.queue_size),
+            Stage("cook", cook_stage, workers=cook_workers, queue_size=args.queue_size),
+            Stage("plate", plate_stage, queue_size=args.queue_size),
+        ])
+        reporter.update(f"Sourcing ingredients from {len(feeds)} feeds...", 10)
+        print(f"Cooking with up to {cook_workers} concurrent calls ({limiter.requests_per_minute:g} RPM), {args.fetch_workers} fetch workers, queues of {args.queue_size}.")
+        # Once stop is set no more feeds are fetched; the rest of the pipeline drains
+        new_courses_data = pipeline.run(enumerate(feeds))
+        mark = self._phase('pipeline', mark)
+
+        print(f"Fetched {counts['raw']} raw articles.")
+        if client.unchanged_feeds > unchanged_before:
+            print(f"Skipped {client.unchanged_feeds - unchanged_before} unchanged feeds (HTTP 304).")
+        if not args.include_seen:
+            print(f"Dropped {counts['seen']}/{counts['raw']} already-seen items; {len(cleaned_ingredients)} new items.")
+        if menu is not None and len(menu):
+            print(f"{len(on_menu)} items are already on the menu (similarity >= {menu.threshold:g}); merging instead of cooking.")
+        print(f"Cooked {counts['batches']} batches; plated {counts['plated']} courses ({counts['links']} links) in chunks of {args.plate_chunk_size}.")
+
+        # Articles for items that weren't in a plated batch (menu repeats, failed batches)
+        reporter.update(f"Plating {len(new_courses_data)} new courses...", 90)
         try:
-            # Robust Parsing for Sources
-            # AI might return strings or objects. Standardize to objects.
-            raw_sources = course_data.get('sources') or course_data.get('source_urls') or []
-            clean_sources = []
-            
-            for s in raw_sources:
-                if isinstance(s, str):
-                    clean_sources.append({
-                        'url': s, 
-                        'title': 'Source Link', 
-                        'source': new_url_domain(s)
-                    })
-                elif isinstance(s, dict):
-                     # Ensure keys exist, check alternates
-                     url_val = s.get('url') or s.get('link') or s.get('href') or '#'
-                     clean_sources.append({
-                         'url': url_val,
-                         'title': s.get('title', 'Related Article'),
-                         'source': s.get('source', new_url_domain(url_val))
-                     })
-            
-            # Generate ID
-            c_key = f"course_{int(time.time())}_{uuid.uuid4().hex[:6]}"
-            
-            # Normalize Category
-            cat_raw = course_data.get('category', 'course').lower().strip()
-            # Remove strict allowed_cats filtering to support dynamic categories
-
-            new_course = Course(
-                course_key=c_key,
-                title=course_data.get('title'),
-                summary=course_data.get('summary'),
-                entities_json=course_data.get('entities', []),
-                topics_json=course_data.get('topics', []),
-                source_urls=clean_sources, # Save the cleaned list of objects
-                published_at=parse_date(course_data.get('representative_published_at')) or datetime.now(),
-                category=cat_raw,
-                language=args.hl # Capture the language setting
-            )
-            db.add(new_course)
-            
-            # Note: We aren't saving individual Articles anymore in this flow?
-            # The spec implies "Course" is the primary unit. 
-            # If we want to keep Articles table populated, we'd need to extract them from the 'raw_items' 
-            # based on the group attribution returned by the AI.
-            # BUT, the AI prompt didn't ask to map exact "raw indices" to the course.
-            # Simplified Spec: Just save the Course. The source_urls are stored in the JSONB.
-            # This is cleaner.
-            
+            with db.begin_nested():
+                article_ids.update(upsert_articles(
+                    db,
+                    [article_row(item, language=item.get('language', hl), published_at=parse_date(item.get('published_at')))
+                     for item in cleaned_ingredients if item.get('link') not in article_ids],
+                    chunk_size=args.plate_chunk_size
+                ))
+            db.commit()
         except Exception as e:
-            print(f"Failed to plate course: {e}")
-
-    print(f"Service Complete. Added {len(new_courses_data)} courses.")
-    print(f"DEBUG: new_courses_data length = {len(new_courses_data)}")
-    print(f"DEBUG: new_courses_data is truthy? {bool(new_courses_data)}")
-    
-    # Generate AI commentary on today's news (before closing DB)
-    if new_courses_data:
-        try:
-            print(f"DEBUG: Attempting to generate commentary with {len(new_courses_data)} courses...")
-            from src.ingest.chef import generate_commentary
-            print(f"Generating AI commentary using {args.model}...")
-            commentary = generate_commentary(new_courses_data, target_lang_name, args.model)
-            
-            # Safe print for Unicode content
+            print(f"Failed to store articles: {e}")
+            db.rollback()
+        mark = self._phase('articles', mark)
+
+        # Repeats join their menu course (sources + links, no LLM call); the summary is
+        # only re-written once enough new sources have piled up on it
+        due = []
+        if on_menu:
+            try:
+                with db.begin_nested():
+                    merge_sources, merge_links = merge_plan(on_menu, article_ids)
+                    pending = merge_into_courses(db, merge_sources, merge_links, chunk_size=args.plate_chunk_size)
+                db.commit()
+                merged_ids.extend(pending)
+                served_links.extend(member['link'] for item in on_menu for member in item.get('members') or [item] if member.get('link'))
+                due = [course_id for course_id, count in pending.items() if count >= args.resynth_min_sources]
+                print(f"Merged {len(on_menu)} items into {len(pending)} menu courses; {len(due)} have enough new sources for a re-write.")
+            except Exception as e:
+                print(f"Failed to merge into menu courses: {e}")
+                db.rollback()
+        if due:
+            # refresh_courses ends its read transaction before the model calls; only its writes remain
+            reporter.update(f"Updating {len(due)} developing stories...", 92)
+            try:
+                refreshed = refresh_courses(db, due, target_lang_name, args.model, rate_limiter=limiter,
+                                            max_workers=cook_workers, embedder=menu.embedder)
+                db.commit()
+                print(f"Re-synthesized {refreshed}/{len(due)} courses.")
+            except Exception as e:
+                print(f"Failed to re-synthesize menu courses: {e}")
+                db.rollback()
+        mark = self._phase('merge', mark)
+
+        # Other locales get translations of the new and updated courses instead of
+        # their own cook: spend grows with the translated text, not with a re-cook
+        if len(locales) > 1 and (plated_ids or merged_ids):
+            others = [(l['hl'], HL_TO_LANG.get(l['hl'], "English")) for l in locales[1:]]
+            reporter.update(f"Translating courses into {len(others)} more locales...", 94)
+            stats = None
+            try:
+                stats = localize_courses(db, plated_ids + merged_ids, others, source_language=target_lang_name, model=args.model,
+                                         rate_limiter=limiter, max_workers=cook_workers, chunk_size=args.plate_chunk_size)
+                db.commit()
+                print(f"Localized for {', '.join(h for h, _ in others)}: {stats['translated']} translated, {stats['copied']} copied (same language), "
+                      f"{stats['reused']} unchanged, {stats['failed']} failed.")
+            except Exception as e:
+                print(f"Failed to localize courses: {e}")
+                db.rollback()
+            self.metrics['localized'] = stats
+        mark = self._phase('localize', mark)
+
+        print(pipeline.summary())
+        wall = pipeline.wall or 1e-9
+        print(f"Throughput: {counts['raw'] / wall:.1f} items/s, {len(new_courses_data) / wall:.2f} courses/s.")
+        self.metrics.update(stages=pipeline.stats(), counts=dict(counts, new=len(cleaned_ingredients), on_menu=len(on_menu),
+                                                                  merged=len(merged_ids), courses=len(new_courses_data)))
+
+        print(f"Service Complete. Added {len(new_courses_data)} courses.")
+        print(f"DEBUG: new_courses_data length = {len(new_courses_data)}")
+        print(f"DEBUG: new_courses_data is truthy? {bool(new_courses_data)}")
+        
+        # Generate AI commentary on today's news (before closing DB)
+        if new_courses_data:
             try:
-                print(f"Commentary generated: {commentary[:100]}...")
-            except UnicodeEncodeError:
-                print(f"Commentary generated: [Contains non-ASCII characters, length={len(commentary)}]")
-            
-            # Save commentary to services/kitchen directory
-            commentary_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'latest_commentary.txt')
-            print(f"Saving commentary to: {commentary_path}")
-            with open(commentary_path, 'w', encoding='utf-8') as f:
-                f.write(commentary)
-            print(f"Commentary saved successfully!")
+                print(f"DEBUG: Attempting to generate commentary with {len(new_courses_data)} courses...")
+                from src.ingest.chef import generate_commentary
+                print(f"Generating AI commentary using {args.model}...")
+                commentary = generate_commentary(new_courses_data, target_lang_name, args.model)
+                
+                # Safe print for Unicode content
+                try:
+                    print(f"Commentary generated: {commentary[:100]}...")
+                except UnicodeEncodeError:
+                    print(f"Commentary generated: [Contains non-ASCII characters, length={len(commentary)}]")
+                
+                # Save commentary to services/latest_commentary.txt (or COMMENTARY_PATH)
+                print(f"Saving commentary to: {COMMENTARY_PATH}")
+                with open(COMMENTARY_PATH, 'w', encoding='utf-8') as f:
+                    f.write(commentary)
+                print(f"Commentary saved successfully!")
+            except Exception as e:
+                print(f"Failed to generate commentary: {e}")
+                import traceback
+                traceback.print_exc()
+        else:
+            print("No courses to generate commentary from.")
+        mark = self._phase('commentary', mark)
+
+        print(self.llm_cache.summary())
+        print(llm_ledger.summary())
+        print(latency_stats.summary())
+        latency_stats.save()
+        print(pool_metrics.summary())
+        if self.archive.enabled:
+            print(self.archive.summary())
+
+        db.commit()
+        # The warm menu learns this cycle's courses only once they are committed
+        if menu is not None and menu_additions:
+            ids, titles, vectors, published = zip(*menu_additions)
+            menu.add(list(ids), list(titles), vectors, list(published))
+        # Only remember seen links whose courses are safely served, and validators only for
+        # feeds that were fully served: a 304 next run would hide the items still to cook
+        served = set(served_links)
+        unserved = [link for link in feed_of if link not in served]
+        if unserved:
+            print(f"{len(unserved)} new items were not served; they are cooked again next run.")
+        self.validators.commit(skip_keys={feed_of[link] for link in unserved})
+        seen_links.mark(served_links)
+        seen_links.save()
+        reporter.update("Service Complete!", 100, is_active=False)
+        self._phase('commit', mark)
+        return new_courses_data
+
+    def close(self):
+        self.archive.close()
+        self.reporter.close()
+
+
+def install_drain_handler(stop):
+    """
+    First SIGTERM/SIGINT sets stop: the current cycle stops fetching, cooks
+    and serves what it already has, and no new cycle starts. A second one
+    exits immediately.
+    """
+    def handle(signum, frame):
+        if stop.is_set():
+            print("Second stop signal; exiting without draining.")
+            sys.stdout.flush()
+            os._exit(1)
+        print(f"Received {signal.Signals(signum).name}; draining the current cycle, then stopping.")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle)
+    signal.signal(signal.SIGINT, handle)
+
+
+def serve(kitchen, jobs, stop, max_cycles=0):
+    """
+    Run each job every job['interval'] seconds until stop is set (or after
+    max_cycles cycles). Cycles run one at a time, earliest due first; a job
+    that fell behind runs once rather than once per missed interval.
+    """
+    now = time.monotonic()
+    due = [now] * len(jobs)
+    cycles = 0
+    while not stop.is_set():
+        n = min(range(len(jobs)), key=lambda k: due[k])
+        job = jobs[n]
+        wait = due[n] - time.monotonic()
+        if wait > 0:
+            next_at = datetime.now() + timedelta(seconds=wait)
+            print(f"Next cycle ({job['name']}) at {next_at:%H:%M:%S}.")
+            kitchen.reporter.update(f"Kitchen idle; next cycle at {next_at:%H:%M}", 100, is_active=False)
+            if stop.wait(wait):
+                break
+        started = time.monotonic()
+        try:
+            kitchen.run_cycle(job, stop)
         except Exception as e:
-            print(f"Failed to generate commentary: {e}")
+            print(f"Cycle {job['name']} failed: {e}")
             import traceback
             traceback.print_exc()
-    else:
-        print("No courses to generate commentary from.")
+        due[n] = max(started + job['interval'], time.monotonic())
+        cycles += 1
+        if max_cycles and cycles >= max_cycles:
+            break
+    print(f"Kitchen stopped after {cycles} cycles.")
+
 
-    db.commit()
-    update_kitchen_status(db, "Service Complete!", 100, is_active=False)
-    db.close()
+def main(argv=None):
+    """Run the kitchen (argv defaults to sys.argv); returns the Kitchen, closed, for its history."""
+    # Load model config from web app (falls back to the repo-root copy)
+    model_config = load_model_config()
+    parser = build_parser(model_config)
+    args = parser.parse_args(argv)
+    if args.stream and args.hedge:
+        parser.error("--hedge can't be combined with --stream (a streamed batch comes from one model at a time); use --fallback")
 
-def new_url_domain(url):
+    kitchen = Kitchen(args)
     try:
-        from urllib.parse import urlparse
-        return urlparse(url).netloc.replace('www.', '')
-    except:
-        return 'News'
+        if args.replay:
+            job = replay_job(kitchen.client, args)
+            if not job['categories']:
+                print(f"Nothing archived for {args.replay}.")
+                return kitchen
+            kitchen.run_cycle(job)
+            return kitchen
+        if not args.serve:
+            kitchen.run_cycle(job_from_args(args))
+            return kitchen
+        jobs = load_schedule(args.schedule, args) if args.schedule else [job_from_args(args)]
+        stop = threading.Event()
+        install_drain_handler(stop)
+        print(f"Serving {len(jobs)} jobs: " + "; ".join(f"{job['name']} every {job['interval'] / 60:g} min" for job in jobs))
+        serve(kitchen, jobs, stop, max_cycles=args.max_cycles)
+        return kitchen
+    finally:
+        kitchen.close()
 
 if __name__ == "__main__":
     main()
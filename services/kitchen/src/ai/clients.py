@@ -0,0 +1,97 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# .env lives in the kitchen directory
+KITCHEN_ENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '.env')
+
+# provider name (model_config.json 'provider') -> env var holding its key
+PROVIDER_KEY_ENV = {
+    "google": "GEMINI_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+}
+
+_env_loaded = False
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def load_env():
+    """Load the kitchen .env once, on first use rather than at import."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+    load_dotenv(KITCHEN_ENV_PATH)
+    _env_loaded = True
+
+
+def get_api_key(provider: str) -> Optional[str]:
+    load_env()
+    env_var = PROVIDER_KEY_ENV.get(provider)
+    return os.getenv(env_var) if env_var else None
+
+
+def _make_google(api_key):
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+def _make_openai(api_key):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+def _make_anthropic(api_key):
+    from anthropic import Anthropic
+    return Anthropic(api_key=api_key)
+
+
+# provider name -> factory(api_key); SDKs are imported inside the factory
+CLIENT_FACTORIES: Dict[str, Callable[[str], Any]] = {
+    "google": _make_google,
+    "openai": _make_openai,
+    "anthropic": _make_anthropic,
+}
+
+
+def register_client_factory(provider: str, factory: Callable[[str], Any], key_env: str = None):
+    """Plug in another provider (or a fake one for benchmarks)."""
+    with _lock:
+        CLIENT_FACTORIES[provider] = factory
+        if key_env:
+            PROVIDER_KEY_ENV[provider] = key_env
+        _clients.pop(provider, None)
+
+
+def get_client(provider: str):
+    """
+    The process-wide client for a provider, built on first use. Returns None
+    when its API key is missing or its SDK isn't installed (reported once).
+    """
+    with _lock:
+        if provider in _clients:
+            return _clients[provider]
+        factory = CLIENT_FACTORIES.get(provider)
+        if factory is None:
+            raise ValueError(f"Unknown provider: {provider}")
+        client = None
+        api_key = get_api_key(provider)
+        if not api_key:
+            print(f"{PROVIDER_KEY_ENV.get(provider, provider)} not set; {provider} client unavailable.")
+        else:
+            try:
+                client = factory(api_key)
+            except ImportError as e:
+                print(f"{provider} SDK not installed: {e}")
+        _clients[provider] = client
+        return client
+
+
+def require_client(provider: str):
+    """get_client, raising the same errors the old module-level checks did."""
+    client = get_client(provider)
+    if client is None:
+        raise ValueError(f"{provider} client not configured (missing {PROVIDER_KEY_ENV.get(provider)} or SDK)")
+    return client
@@ -0,0 +1,139 @@
+import os
+import re
+import math
+import hashlib
+import threading
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.ai.clients import get_client, require_client
+
+# "auto" uses Gemini embeddings when a key is configured, else the local hashing embedder
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "auto")
+GEMINI_EMBEDDING_MODEL = os.getenv("GEMINI_EMBEDDING_MODEL", "text-embedding-004")
+HASHING_EMBEDDING_DIM = int(os.getenv("HASHING_EMBEDDING_DIM", "512"))
+
+# Texts per embed request (the Gemini API caps a batch at 100)
+EMBED_BATCH_SIZE = 100
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class Embedder:
+    """
+    Text -> unit-length float32 vectors, so a dot product is cosine similarity.
+    `name` is stored next to each vector; vectors from different embedders are
+    never compared. `default_threshold` is the cosine similarity above which
+    two texts are taken to be the same story.
+    """
+    name = None
+    default_threshold = 0.85
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        rows = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            rows.append(np.asarray(self._embed([t or "" for t in texts[start:start + EMBED_BATCH_SIZE]]), dtype=np.float32))
+        return _normalize(np.vstack(rows))
+
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedder: signed feature hashing of words and character trigrams.
+    Only lexical overlap, but deterministic, free and fast; trigrams let
+    inflections ("tariff"/"tariffs") and compound names still match.
+    """
+    default_threshold = 0.8
+
+    def __init__(self, dim: int = HASHING_EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._word_cache: Dict[str, list] = {}
+
+    def _hash(self, feature: str):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return h % self.dim, 1.0 if (h >> 63) & 1 else -1.0
+
+    def _word_features(self, word: str):
+        """(slot, signed weight) pairs for a word and its trigrams, cached per word."""
+        features = self._word_cache.get(word)
+        if features is None:
+            features = []
+            if len(word) > 2:
+                features.append(self._hash("w:" + word))
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                slot, sign = self._hash("c:" + padded[i:i + 3])
+                features.append((slot, sign * 0.25))
+            self._word_cache[word] = features
+        return features
+
+    def _embed(self, texts):
+        rows = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for r, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for word in re.findall(r"\w+", text.lower()):
+                counts[word] = counts.get(word, 0) + 1
+            row = rows[r]
+            for word, count in counts.items():
+                weight = 1.0 + math.log(count)
+                for slot, value in self._word_features(word):
+                    row[slot] += weight * value
+        return rows
+
+
+class GeminiEmbedder(Embedder):
+    """Gemini text embeddings (semantic: paraphrases and translations match)."""
+    default_threshold = 0.85
+
+    def __init__(self, api_model: str = GEMINI_EMBEDDING_MODEL):
+        self.api_model = api_model
+        self.name = f"google:{api_model}"
+
+    def _embed(self, texts):
+        from google.genai import types
+        result = require_client("google").models.embed_content(
+            model=self.api_model,
+            contents=texts,
+            config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY"),
+        )
+        return [e.values for e in result.embeddings]
+
+
+# EMBEDDING_MODEL value -> factory
+EMBEDDERS: Dict[str, Callable[[], Embedder]] = {
+    "hashing": HashingEmbedder,
+    "gemini": GeminiEmbedder,
+}
+
+_embedders: Dict[str, Embedder] = {}
+_lock = threading.Lock()
+
+
+def register_embedder(name: str, factory: Callable[[], Embedder]):
+    with _lock:
+        EMBEDDERS[name] = factory
+        _embedders.pop(name, None)
+
+
+def get_embedder(name: str = None) -> Embedder:
+    """The process-wide embedder for name (default EMBEDDING_MODEL)."""
+    name = name or EMBEDDING_MODEL
+    if name == "auto":
+        name = "gemini" if get_client("google") is not None else "hashing"
+    with _lock:
+        if name not in _embedders:
+            factory = EMBEDDERS.get(name)
+            if factory is None:
+                raise ValueError(f"Unknown embedding model: {name}")
+            _embedders[name] = factory()
+        return _embedders[name]
@@ -0,0 +1,98 @@
+import os
+import json
+import math
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List
+
+LLM_LATENCY_PATH = os.getenv("LLM_LATENCY_PATH", "data/llm_latency.json")
+
+# Histogram bucket upper bounds in seconds (the last bucket is open-ended)
+LATENCY_BUCKETS = [0.5, 1, 2, 4, 8, 15, 30, 60, 120, 300, 600]
+
+# Recent samples kept per model for percentiles (and persisted between runs)
+LATENCY_SAMPLES = 500
+
+
+class LatencyHistogram:
+    """Fixed buckets for reporting plus a window of recent samples for percentiles."""
+
+    def __init__(self, samples: List[float] = None):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+        for s in samples or []:
+            self.observe(s)
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+
+    def percentile(self, p: float):
+        """p in 0..100 over recent samples (nearest rank), or None with no data."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = min(len(ordered), max(1, math.ceil(p / 100.0 * len(ordered))))
+        return ordered[rank - 1]
+
+    def render(self) -> str:
+        labels = [f"<={b:g}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]:g}s"]
+        return " ".join(f"{label}:{n}" for label, n in zip(labels, self.counts) if n)
+
+
+class LatencyStats:
+    """Per-model latency histograms; thread-safe, optionally persisted to JSON."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.models: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, model_id: str, seconds: float):
+        with self._lock:
+            self.models.setdefault(model_id, LatencyHistogram()).observe(seconds)
+
+    def percentile(self, model_id: str, p: float, min_samples: int = 1):
+        with self._lock:
+            hist = self.models.get(model_id)
+            if hist is None or len(hist.samples) < min_samples:
+                return None
+            return hist.percentile(p)
+
+    def load(self, path: str = LLM_LATENCY_PATH):
+        """Seed from earlier runs so hedge thresholds are tuned from the first batch."""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            with self._lock:
+                for model_id, samples in data.items():
+                    self.models[model_id] = LatencyHistogram(samples)
+        except Exception as e:
+            print(f"Could not load latency stats: {e}")
+
+    def save(self, path: str = LLM_LATENCY_PATH):
+        with self._lock:
+            data = {model_id: list(h.samples) for model_id, h in self.models.items()}
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"Could not save latency stats: {e}")
+
+    def summary(self) -> str:
+        with self._lock:
+            if not self.models:
+                return "LLM latency: no samples."
+            lines = ["LLM latency:"]
+            for model_id, h in sorted(self.models.items()):
+                p50, p90, p99 = (h.percentile(p) for p in (50, 90, 99))
+                lines.append(f"  {model_id}: n={len(h.samples)} p50={p50:.2f}s p90={p90:.2f}s p99={p99:.2f}s  [{h.render()}]")
+            return "\n".join(lines)
+
+
+latency_stats = LatencyStats()
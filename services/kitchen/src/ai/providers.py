@@ -0,0 +1,510 @@
+import os
+import time
+import asyncio
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from src.ai.clients import get_client, require_client
+from src.utils.model_config import get_model_entry, register_model_entry
+from src.utils.retry import is_retryable, backoff_delay
+from src.ingest.tokens import get_token_estimator
+from src.ai.latency import latency_stats
+
+# Per-attempt limits for a completion (a stream's timeout applies between chunks).
+# The timeout is handed to the SDK so the request itself ends, not just our wait on it.
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "300"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+
+# Output cap used when a provider requires one and the model entry has none
+DEFAULT_MAX_TOKENS = 8192
+
+# Blocking SDK calls run here rather than in each event loop's default executor.
+# Callers wait for their call to finish (the SDK enforces the timeout), so a
+# thread here is always a request in flight, never an abandoned one.
+_sdk_pool = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_SDK_THREADS", "32")), thread_name_prefix="llm-sdk")
+
+
+class LLMResponse:
+    """Text of one completion plus what it cost."""
+    def __init__(self, text: str, model_id: str, api_model: str, input_tokens: int = 0,
+                 output_tokens: int = 0, latency: float = 0.0, cost: float = 0.0, attempts: int = 1):
+        self.text = text
+        self.model_id = model_id
+        self.api_model = api_model
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.latency = latency
+        self.cost = cost
+        self.attempts = attempts
+
+
+class UsageLedger:
+    """
+    Per-model call accounting: calls, failures, tokens, latency and cost.
+    Cost uses inputCostPerMTok / outputCostPerMTok (USD per million tokens)
+    from the model entry. Thread-safe; one process-wide instance is `ledger`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.models: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def cost_for(entry: dict, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * entry.get('inputCostPerMTok', 0.0) + output_tokens * entry.get('outputCostPerMTok', 0.0)) / 1_000_000
+
+    def _row(self, model_id):
+        return self.models.setdefault(model_id, {"calls": 0, "failures": 0, "retries": 0, "discarded": 0, "input_tokens": 0,
+                                                 "output_tokens": 0, "latency": 0.0, "cost": 0.0})
+
+    def record(self, response: LLMResponse):
+        with self._lock:
+            row = self._row(response.model_id)
+            row["calls"] += 1
+            row["retries"] += response.attempts - 1
+            row["input_tokens"] += response.input_tokens
+            row["output_tokens"] += response.output_tokens
+            row["latency"] += response.latency
+            row["cost"] += response.cost
+
+    def record_failure(self, model_id: str):
+        with self._lock:
+            self._row(model_id)["failures"] += 1
+
+    def record_discarded(self, model_id: str):
+        """A finished answer nobody used (a hedge that lost); its calls and tokens are already counted."""
+        with self._lock:
+            self._row(model_id)["discarded"] += 1
+
+    def summary(self) -> str:
+        with self._lock:
+            if not self.models:
+                return "LLM usage: no calls."
+            lines = ["LLM usage:"]
+            for model_id, row in sorted(self.models.items()):
+                avg = row["latency"] / row["calls"] if row["calls"] else 0.0
+                discarded = f", {row['discarded']} discarded by hedging" if row['discarded'] else ""
+                lines.append(f"  {model_id}: {row['calls']} calls ({row['failures']} failed, {row['retries']} retries{discarded}), "
+                             f"{row['input_tokens']} in / {row['output_tokens']} out tokens, "
+                             f"avg {avg:.2f}s, ${row['cost']:.4f}")
+            return "\n".join(lines)
+
+
+ledger = UsageLedger()
+
+
+class Provider:
+    """
+    One LLM backend. Subclasses implement the blocking _complete/_stream
+    primitives against their SDK client; complete() and stream() add the
+    async interface, per-attempt timeouts, retries and accounting.
+    """
+    name = None
+
+    def client(self):
+        return require_client(self.name)
+
+    def available(self) -> bool:
+        """True when the SDK and API key are there (builds the client on first use)."""
+        return get_client(self.name) is not None
+
+    def _complete(self, api_model: str, prompt: str, json_mode: bool, max_tokens: Optional[int], timeout: float):
+        """Blocking call that gives up after timeout seconds; returns (text, input_tokens or None, output_tokens or None)."""
+        raise NotImplementedError
+
+    def _stream(self, api_model: str, prompt: str, json_mode: bool, max_tokens: Optional[int], timeout: float) -> Iterator[str]:
+        """Blocking generator of text chunks; timeout bounds the wait for each one."""
+        raise NotImplementedError
+
+    def _usage(self, entry, prompt, text, input_tokens, output_tokens):
+        estimate = get_token_estimator(self.name)
+        input_tokens = input_tokens if input_tokens is not None else estimate(prompt)
+        output_tokens = output_tokens if output_tokens is not None else estimate(text or "")
+        return input_tokens, output_tokens, UsageLedger.cost_for(entry, input_tokens, output_tokens)
+
+    async def complete(self, entry: dict, prompt: str, json_mode: bool = False, max_tokens: int = None,
+                       api_model: str = None, timeout: float = LLM_TIMEOUT_SECONDS,
+                       max_retries: int = LLM_MAX_RETRIES) -> LLMResponse:
+        model_id = entry.get('id', self.name)
+        api_model = api_model or entry.get('apiModel', model_id)
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            attempt_started = time.perf_counter()
+            try:
+                # No asyncio-side timeout: giving up on the future would leave the request running
+                # after the caller released its limiter slot. The SDK raises once timeout passes.
+                text, in_tok, out_tok = await asyncio.get_running_loop().run_in_executor(
+                    _sdk_pool, self._complete, api_model, prompt, json_mode, max_tokens, timeout)
+                break
+            except Exception as e:
+                if attempt >= max_retries or not is_retryable(e):
+                    ledger.record_failure(model_id)
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"{model_id} failed ({type(e).__name__}: {e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+        latency_stats.observe(model_id, time.perf_counter() - attempt_started)
+        in_tok, out_tok, cost = self._usage(entry, prompt, text, in_tok, out_tok)
+        response = LLMResponse(text, model_id, api_model, in_tok, out_tok, time.perf_counter() - started, cost, attempt + 1)
+        ledger.record(response)
+        return response
+
+    async def stream(self, entry: dict, prompt: str, json_mode: bool = False, max_tokens: int = None,
+                     api_model: str = None, timeout: float = LLM_TIMEOUT_SECONDS) -> AsyncIterator[str]:
+        """
+        Yield text chunks as they arrive. timeout bounds the wait for each chunk.
+        No retries: once text has been handed out a retry would duplicate it,
+        so callers decide (see chef._cook_streaming). Returns only once the
+        SDK stream is closed, so the caller's limiter slot covers all of it.
+        """
+        model_id = entry.get('id', self.name)
+        api_model = api_model or entry.get('apiModel', model_id)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # consumer's loop already closed
+
+        def produce():
+            try:
+                for chunk in self._stream(api_model, prompt, json_mode, max_tokens, timeout):
+                    if stop.is_set():
+                        break
+                    put(chunk)
+                put(done)
+            except Exception as e:
+                put(e)
+
+        started = time.perf_counter()
+        parts = []
+        producer = loop.run_in_executor(_sdk_pool, produce)
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout)
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                parts.append(item)
+                yield item
+        except Exception:
+            ledger.record_failure(model_id)
+            raise
+        finally:
+            # The producer stops at its next chunk (or the SDK's own timeout); wait for it
+            stop.set()
+            await asyncio.wait({producer})
+        text = "".join(parts)
+        latency_stats.observe(model_id, time.perf_counter() - started)
+        in_tok, out_tok, cost = self._usage(entry, prompt, text, None, None)
+        ledger.record(LLMResponse(text, model_id, api_model, in_tok, out_tok, time.perf_counter() - started, cost))
+
+
+class GoogleProvider(Provider):
+    name = "google"
+
+    def _config(self, json_mode, max_tokens, timeout):
+        from google.genai import types
+        # HttpOptions.timeout is in milliseconds
+        kwargs = {"http_options": types.HttpOptions(timeout=int(timeout * 1000))}
+        if json_mode:
+            kwargs["response_mime_type"] = "application/json"
+        if max_tokens:
+            kwargs["max_output_tokens"] = max_tokens
+        return types.GenerateContentConfig(**kwargs)
+
+    def _complete(self, api_model, prompt, json_mode, max_tokens, timeout):
+        response = self.client().models.generate_content(model=api_model, contents=prompt, config=self._config(json_mode, max_tokens, timeout))
+        usage = getattr(response, "usage_metadata", None)
+        return response.text, getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None)
+
+    def _stream(self, api_model, prompt, json_mode, max_tokens, timeout):
+        for chunk in self.client().models.generate_content_stream(model=api_model, contents=prompt, config=self._config(json_mode, max_tokens, timeout)):
+            if chunk.text:
+                yield chunk.text
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+
+    def _kwargs(self, api_model, prompt, json_mode, max_tokens, timeout):
+        kwargs = {"model": api_model, "messages": [{"role": "user", "content": prompt}], "timeout": timeout}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        if max_tokens:
+            # gpt-5 (and o-series) chat models reject the older max_tokens
+            kwargs["max_completion_tokens"] = max_tokens
+        return kwargs
+
+    def _complete(self, api_model, prompt, json_mode, max_tokens, timeout):
+        response = self.client().chat.completions.create(**self._kwargs(api_model, prompt, json_mode, max_tokens, timeout))
+        usage = getattr(response, "usage", None)
+        return response.choices[0].message.content, getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
+    def _stream(self, api_model, prompt, json_mode, max_tokens, timeout):
+        for chunk in self.client().chat.completions.create(stream=True, **self._kwargs(api_model, prompt, json_mode, max_tokens, timeout)):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class AnthropicProvider(Provider):
+    name = "anthropic"
+
+    # Anthropic has no JSON mode; the prompts already ask for JSON only
+    def _complete(self, api_model, prompt, json_mode, max_tokens, timeout):
+        response = self.client().messages.create(model=api_model, max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
+                                                 messages=[{"role": "user", "content": prompt}], timeout=timeout)
+        usage = getattr(response, "usage", None)
+        return response.content[0].text, getattr(usage, "input_tokens", None), getattr(usage, "output_tokens", None)
+
+    def _stream(self, api_model, prompt, json_mode, max_tokens, timeout):
+        with self.client().messages.stream(model=api_model, max_tokens=max_tokens or DEFAULT_MAX_TOKENS,
+                                           messages=[{"role": "user", "content": prompt}], timeout=timeout) as stream:
+            for text in stream.text_stream:
+                yield text
+
+
+class FakeProvider(Provider):
+    """
+    Local stand-in for tests and benchmarks: no network, no SDK.
+    responder(prompt) returns the response text (default "[]"). latency is
+    added per call; output is generated in chunk_size pieces chunk_delay
+    apart (a completion waits for all of them, a stream yields each). The
+    first fail_times calls raise a retryable error, and cut_after (0..1)
+    drops the connection after that fraction of the text. Like the SDKs, a
+    call raises TimeoutError once it has waited timeout seconds for a chunk.
+    """
+    name = "fake"
+
+    def __init__(self, responder: Callable[[str], str] = None, latency: float = 0.0,
+                 chunk_size: int = 64, chunk_delay: float = 0.0, fail_times: int = 0, cut_after: float = None):
+        self.responder = responder or (lambda prompt: "[]")
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.fail_times = fail_times
+        self.cut_after = cut_after
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def client(self):
+        return None
+
+    def available(self) -> bool:
+        return True
+
+    def _complete(self, api_model, prompt, json_mode, max_tokens, timeout=None):
+        return "".join(self._stream(api_model, prompt, json_mode, max_tokens, timeout)), None, None
+
+    @staticmethod
+    def _wait(seconds, timeout):
+        if timeout is not None and seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"fake provider: no response within {timeout:g}s")
+        time.sleep(seconds)
+
+    def _stream(self, api_model, prompt, json_mode, max_tokens, timeout=None):
+        with self._lock:
+            self.calls += 1
+            failing = self.calls <= self.fail_times
+        if failing:
+            raise ConnectionError("fake provider: simulated failure")
+        if self.latency:
+            self._wait(self.latency, timeout)
+        text = self.responder(prompt)
+        end = len(text) if self.cut_after is None else int(len(text) * self.cut_after)
+        for start in range(0, end, self.chunk_size):
+            if self.chunk_delay:
+                self._wait(self.chunk_delay, timeout)
+            yield text[start:min(start + self.chunk_size, end)]
+        if self.cut_after is not None:
+            raise ConnectionError("fake provider: stream reset by peer")
+
+
+PROVIDERS: Dict[str, Provider] = {
+    "google": GoogleProvider(),
+    "openai": OpenAIProvider(),
+    "anthropic": AnthropicProvider(),
+}
+
+def register_provider(provider: Provider, name: str = None):
+    PROVIDERS[name or provider.name] = provider
+
+
+def register_model(entry: dict):
+    """Add a model entry at runtime (seen by get_model_entry everywhere, ahead of model_config.json)."""
+    register_model_entry(entry)
+
+
+def use_fake_provider(model_id: str = "fake", entry: dict = None, **fake_kwargs) -> FakeProvider:
+    """
+    Register a FakeProvider and a model entry pointing at it; returns the
+    provider. entry overrides fields of the model entry (e.g. fallbackModels).
+    """
+    fake = FakeProvider(**fake_kwargs)
+    provider_name = f"fake:{model_id}"
+    register_provider(fake, provider_name)
+    model_entry = {"id": model_id, "provider": provider_name, "apiModel": model_id, "contextTokens": 1000000,
+                   "maxOutputTokens": 65536, "maxConcurrency": 8, "requestsPerMinute": 6000}
+    model_entry.update(entry or {})
+    register_model(model_entry)
+    return fake
+
+
+def resolve(model_id: str):
+    """(provider, model entry) for a model id from model_config.json."""
+    entry = get_model_entry(model_id)
+    if not entry:
+        raise ValueError(f"Unknown model: {model_id}")
+    provider = PROVIDERS.get(entry.get('provider'))
+    if provider is None:
+        raise ValueError(f"No provider registered for {model_id} ({entry.get('provider')})")
+    return provider, entry
+
+
+def api_model_for(entry: dict, task: str = None) -> str:
+    """The vendor model string; entries may override it per task via 'taskModels'."""
+    return (entry.get('taskModels') or {}).get(task) or entry.get('apiModel', entry.get('id'))
+
+
+async def acomplete(model_id: str, prompt: str, task: str = None, **kwargs) -> LLMResponse:
+    provider, entry = resolve(model_id)
+    return await provider.complete(entry, prompt, api_model=api_model_for(entry, task), **kwargs)
+
+
+async def astream(model_id: str, prompt: str, task: str = None, **kwargs) -> AsyncIterator[str]:
+    provider, entry = resolve(model_id)
+    # Closing this generator early must close the provider's too, so it can wait out its SDK call
+    async with contextlib.aclosing(provider.stream(entry, prompt, api_model=api_model_for(entry, task), **kwargs)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
+def complete(model_id: str, prompt: str, **kwargs) -> LLMResponse:
+    """Blocking acomplete for thread-based callers (cook workers, normalizer)."""
+    return asyncio.run(acomplete(model_id, prompt, **kwargs))
+
+
+def stream(model_id: str, prompt: str, **kwargs) -> Iterator[str]:
+    """Blocking astream: a plain generator driven by a private event loop."""
+    loop = asyncio.new_event_loop()
+    agen = astream(model_id, prompt, **kwargs)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(agen.aclose())
+        loop.close()
+
+
+def cache_identity(model_id: str, task: str = None):
+    """(provider name, vendor model) for LLM cache keys."""
+    provider, entry = resolve(model_id)
+    return entry.get('provider', provider.name), api_model_for(entry, task)
+
+
+# Hedging: fire a fallback model when the current one is slower than its usual
+# LLM_HEDGE_PERCENTILE latency (LLM_HEDGE_DEFAULT_DELAY until enough samples exist)
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "60"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "5"))
+
+
+def fallback_chain(model_id: str):
+    """The model followed by its 'fallbackModels' from model_config.json (unknown ids skipped)."""
+    chain = [model_id]
+    for fallback in get_model_entry(model_id).get('fallbackModels') or []:
+        if fallback not in chain and get_model_entry(fallback):
+            chain.append(fallback)
+    return chain
+
+
+def hedge_delay(model_id: str, percentile: float = LLM_HEDGE_PERCENTILE) -> float:
+    observed = latency_stats.percentile(model_id, percentile, min_samples=LLM_HEDGE_MIN_SAMPLES)
+    return observed if observed is not None else LLM_HEDGE_DEFAULT_DELAY
+
+
+def _count_discarded(model_id):
+    def done(future):
+        if not future.cancelled() and future.exception() is None:
+            ledger.record_discarded(model_id)
+    return done
+
+
+async def _hedged(chain, attempt, validate, percentile):
+    # Attempts get threads of their own: each blocks on an llm.complete that runs on
+    # _sdk_pool, so running attempts there too could leave every pool thread waiting
+    # on work queued behind it
+    pool = ThreadPoolExecutor(max_workers=len(chain), thread_name_prefix="llm-hedge")
+    running = {}  # asyncio future -> (model_id, cancel event, worker future)
+    next_idx = 0
+    last_error = None
+
+    def launch():
+        nonlocal next_idx
+        model_id = chain[next_idx]
+        next_idx += 1
+        cancel = threading.Event()
+        worker = pool.submit(attempt, model_id, cancel)
+        running[asyncio.wrap_future(worker)] = (model_id, cancel, worker)
+        return model_id
+
+    try:
+        launch()
+        while running:
+            latest = chain[next_idx - 1]
+            wait_for = hedge_delay(latest, percentile) if (percentile is not None and next_idx < len(chain)) else None
+            done, _ = await asyncio.wait(running.keys(), timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                print(f"{latest} slower than its p{percentile:g} ({wait_for:.1f}s); hedging with {chain[next_idx]}")
+                launch()
+                continue
+            for future in done:
+                model_id = running.pop(future)[0]
+                try:
+                    result = future.result()
+                    if validate is None or validate(result):
+                        # Losers stop before their next request or retry; one already in flight
+                        # finishes (keeping its limiter slot) and is booked as discarded
+                        for other_id, cancel, worker in running.values():
+                            cancel.set()
+                            worker.add_done_callback(_count_discarded(other_id))
+                        return model_id, result
+                    last_error = ValueError(f"{model_id} returned an invalid response")
+                except Exception as e:
+                    last_error = e
+                print(f"{model_id} failed ({last_error}); falling back")
+            if not running and next_idx < len(chain):
+                launch()
+        raise last_error or RuntimeError("no models to try")
+    finally:
+        pool.shutdown(wait=False)
+
+
+def hedged_call(chain, attempt: Callable[[str, threading.Event], Any], validate: Callable[[Any], bool] = None,
+                percentile: Optional[float] = LLM_HEDGE_PERCENTILE):
+    """
+    Run attempt(model_id, cancel) down a fallback chain and return
+    (model_id, result) for the first result that passes validate().
+
+    Failures and invalid results move on to the next model. With a
+    percentile, a model still running after its observed p<percentile>
+    latency gets the next model fired alongside it and the first valid answer
+    wins; percentile=None only falls back on failure. Raises the last error
+    when every model fails. attempt runs on its own thread and must block;
+    cancel (a threading.Event) is set once its answer is no longer wanted,
+    and it should then stop before its next request (see call_with_retries).
+    """
+    return asyncio.run(_hedged(list(chain), attempt, validate, percentile))
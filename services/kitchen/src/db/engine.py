@@ -1,14 +1,71 @@
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, NullPool
 from dotenv import load_dotenv
 
+from .pool_metrics import PoolMetrics, metered_pool_class
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in environment.")
 
+# Pool tuning. DB_POOL_MODE: "auto" (NullPool behind a transaction pooler,
+# e.g. Supabase/pgbouncer on :6543, QueuePool otherwise), "queue" or "null".
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "auto").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+TRANSACTION_POOLER_PORT = 6543
+
+pool_metrics = PoolMetrics()
+
+def is_transaction_pooler(url_obj) -> bool:
+    """pgbouncer-style transaction pooling: Supabase's :6543 pooler, or ?pgbouncer=true in the URL."""
+    if url_obj is None:
+        return False
+    return url_obj.port == TRANSACTION_POOLER_PORT or str(url_obj.query.get("pgbouncer", "")).lower() == "true"
+
+def resolve_pool_mode(url_obj, mode: str = DB_POOL_MODE) -> str:
+    if mode in ("queue", "null"):
+        return mode
+    return "null" if is_transaction_pooler(url_obj) else "queue"
+
+def engine_options(url_obj, mode: str = DB_POOL_MODE) -> dict:
+    """
+    create_engine keyword arguments for the configured pool mode.
+
+    "null" opens a fresh server connection per checkout (the transaction
+    pooler does the real pooling) and turns off driver-side prepared
+    statements, which break when consecutive transactions land on different
+    server connections.
+    """
+    if url_obj is not None and url_obj.get_backend_name() == "sqlite":
+        # SQLite keeps its own pool defaults (SingletonThreadPool/QueuePool per file)
+        return {}
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if resolve_pool_mode(url_obj, mode) == "null":
+        options["poolclass"] = metered_pool_class(NullPool, pool_metrics)
+        driver = url_obj.get_driver_name() if url_obj is not None else ""
+        if driver == "psycopg":
+            options["connect_args"] = {"prepare_threshold": None}
+        elif driver == "asyncpg":
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+    options.update(
+        poolclass=metered_pool_class(QueuePool, pool_metrics),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
 # Robustly handle connection string
 try:
     # Try to parse securely
@@ -31,13 +88,17 @@ try:
     if url_obj.host and 'supabase.co' in url_obj.host and 'pooler' not in url_obj.host and not url_obj.host.startswith('db.'):
          url_obj = url_obj.set(host='db.' + url_obj.host)
          
-    engine = create_engine(url_obj, echo=False)
+    engine = create_engine(url_obj, echo=False, **engine_options(url_obj))
+    if url_obj.get_backend_name() != "sqlite":
+        print(f"DB pool mode: {resolve_pool_mode(url_obj)}")
 
 except Exception as e:
     print(f"Error creating engine url: {e}")
     # Fallback
     engine = create_engine(DATABASE_URL, echo=False)
 
+pool_metrics.attach(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -0,0 +1,54 @@
+from typing import List, Any, Iterable, Set
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session, aliased
+
+from .models import Article, Course, CourseArticle
+
+
+def known_urls(db: Session, urls: Iterable[str]) -> Set[str]:
+    """Which of these URLs are already stored as Articles (unique index on url)."""
+    urls = list(dict.fromkeys(u for u in urls if u))
+    found = set()
+    for start in range(0, len(urls), 500):
+        found.update(db.scalars(select(Article.url).where(Article.url.in_(urls[start:start + 500]))))
+    return found
+
+
+def courses_for_url(db: Session, url: str) -> List[Course]:
+    """Every course cooked from this article URL."""
+    stmt = (
+        select(Course)
+        .join(CourseArticle, CourseArticle.course_id == Course.id)
+        .join(Article, Article.id == CourseArticle.article_id)
+        .where(Article.url == url)
+        .order_by(Course.published_at.desc())
+    )
+    return list(db.scalars(stmt))
+
+
+def articles_for_course(db: Session, course_id: Any) -> List[Article]:
+    stmt = (
+        select(Article)
+        .join(CourseArticle, CourseArticle.article_id == Article.id)
+        .where(CourseArticle.course_id == course_id)
+        .order_by(Article.published_at.desc())
+    )
+    return list(db.scalars(stmt))
+
+
+def related_courses(db: Session, course_id: Any, limit: int = 10) -> List[Any]:
+    """Other courses sharing at least one article with this one, most shared first: [(Course, shared_count)]."""
+    mine = aliased(CourseArticle)
+    theirs = aliased(CourseArticle)
+    shared = func.count(theirs.article_id).label("shared")
+    stmt = (
+        select(Course, shared)
+        .join(theirs, theirs.course_id == Course.id)
+        .join(mine, mine.article_id == theirs.article_id)
+        .where(mine.course_id == course_id, theirs.course_id != course_id)
+        .group_by(Course.id)
+        .order_by(shared.desc(), Course.published_at.desc())
+        .limit(limit)
+    )
+    return [(course, count) for course, count in db.execute(stmt)]
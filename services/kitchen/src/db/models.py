@@ -1,10 +1,16 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import Column, String, Integer, DateTime, Text, Boolean, ForeignKey, JSON, Index, Float
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
 from .engine import Base
 
+# JSONB on Postgres, plain JSON elsewhere (SQLite for local runs and benchmarks)
+JSONB_TYPE = JSON().with_variant(JSONB(), "postgresql")
+
+# Embedding vectors: real[] on Postgres, a JSON list elsewhere
+VECTOR_TYPE = JSON().with_variant(ARRAY(Float(precision=24)), "postgresql")
+
 class Article(Base):
     __tablename__ = 'articles'
     
@@ -22,6 +28,10 @@ class Article(Base):
     # Relationship to CourseArticle
     course_associations = relationship("CourseArticle", back_populates="article")
 
+    __table_args__ = (
+        Index("ix_articles_published_at", "published_at"),
+    )
+
 class Course(Base):
     __tablename__ = 'courses'
     
@@ -29,18 +39,36 @@ class Course(Base):
     course_key = Column(Text, unique=True, nullable=False)
     title = Column(Text)
     summary = Column(Text)
-    entities_json = Column(JSONB, default=[])
-    topics_json = Column(JSONB, default=[])
-    source_urls = Column(JSONB, default=[])
+    entities_json = Column(JSONB_TYPE, default=[])
+    topics_json = Column(JSONB_TYPE, default=[])
+    source_urls = Column(JSONB_TYPE, default=[])
     published_at = Column(DateTime(timezone=True))
     published_at = Column(DateTime(timezone=True))
     category = Column(String)
     language = Column(String)
+    # Unit vector of title + summary (see src.ai.embeddings); only compared within one embedding_model
+    embedding = Column(VECTOR_TYPE, nullable=True)
+    embedding_model = Column(String, nullable=True)
+    # len(source_urls) when the summary was last written; merged sources past it are pending a re-synthesis
+    synthesized_sources = Column(Integer, nullable=True)
+    # Multi-locale runs: the course this row translates, and a hash of the source title + summary it was translated from
+    translation_of = Column(UUID(as_uuid=True), nullable=True)
+    translated_from = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     article_associations = relationship("CourseArticle", back_populates="course")
 
+    # Kitchen menu index (recent courses by published_at) and the web app's language/category feeds.
+    # GIN indexes serve entity/topic containment (@>) queries on Postgres.
+    __table_args__ = (
+        Index("ix_courses_published_at", "published_at"),
+        Index("ix_courses_language_category_published_at", "language", "category", "published_at"),
+        Index("ix_courses_translation_of", "translation_of"),
+        Index("ix_courses_entities_json_gin", "entities_json", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        Index("ix_courses_topics_json_gin", "topics_json", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
 class CourseArticle(Base):
     __tablename__ = 'course_articles'
     
@@ -50,13 +78,18 @@ class CourseArticle(Base):
     course = relationship("Course", back_populates="article_associations")
     article = relationship("Article", back_populates="course_associations")
 
+    # The primary key covers course -> articles; this covers article -> courses
+    __table_args__ = (
+        Index("ix_course_articles_article_id", "article_id"),
+    )
+
 class Plate(Base):
     __tablename__ = 'plates'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(Text, unique=True, nullable=False)
     visibility = Column(String, default="public") # public, unlisted, private
-    rules_json = Column(JSONB, default={})
+    rules_json = Column(JSONB_TYPE, default={})
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Sauce(Base):
@@ -65,7 +98,7 @@ class Sauce(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     plate_id = Column(UUID(as_uuid=True), ForeignKey('plates.id'))
     name = Column(Text)
-    definition_json = Column(JSONB, default={})
+    definition_json = Column(JSONB_TYPE, default={})
     is_default = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -90,6 +123,10 @@ class UserInteraction(Base):
     details_encrypted = Column(Text) # AES-256 encrypted JSON
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_user_interactions_course_id_created_at", "course_id", "created_at"),
+    )
+
 class KitchenStatus(Base):
     __tablename__ = 'kitchen_status'
     
@@ -0,0 +1,243 @@
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import insert, select, update, func
+from sqlalchemy.orm import Session
+
+from .models import Article, Course, CourseArticle
+
+# Rows per INSERT round trip when plating courses
+PLATE_CHUNK_SIZE = int(os.getenv("PLATE_CHUNK_SIZE", "500"))
+
+# Columns refreshed when a course_key already exists
+COURSE_UPDATE_COLUMNS = ("title", "summary", "entities_json", "topics_json", "source_urls", "published_at", "category", "language",
+                         "embedding", "embedding_model", "synthesized_sources", "translation_of", "translated_from")
+
+# Columns refreshed when an article url is fetched again
+ARTICLE_UPDATE_COLUMNS = ("source_name", "title", "description", "published_at")
+
+
+def new_url_domain(url):
+    try:
+        return urlparse(url).netloc.replace('www.', '')
+    except:
+        return 'News'
+
+
+def clean_sources(raw_sources) -> List[Dict[str, str]]:
+    """AI might return strings or objects. Standardize to objects."""
+    cleaned = []
+    for s in raw_sources or []:
+        if isinstance(s, str):
+            cleaned.append({
+                'url': s,
+                'title': 'Source Link',
+                'source': new_url_domain(s)
+            })
+        elif isinstance(s, dict):
+            # Ensure keys exist, check alternates
+            url_val = s.get('url') or s.get('link') or s.get('href') or '#'
+            cleaned.append({
+                'url': url_val,
+                'title': s.get('title', 'Related Article'),
+                'source': s.get('source', new_url_domain(url_val))
+            })
+    return cleaned
+
+
+def course_row(course_data: Dict[str, Any], language: str, published_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Turn one Chef course into a `courses` row (id is assigned here so links can reference it)."""
+    sources = clean_sources(course_data.get('sources') or course_data.get('source_urls') or [])
+    return {
+        'id': uuid.uuid4(),
+        'course_key': f"course_{int(time.time())}_{uuid.uuid4().hex[:12]}",
+        'title': course_data.get('title'),
+        'summary': course_data.get('summary'),
+        'entities_json': course_data.get('entities', []),
+        'topics_json': course_data.get('topics', []),
+        'source_urls': sources,
+        'published_at': published_at or datetime.now(),
+        'category': (course_data.get('category') or 'course').lower().strip(),
+        'language': language,
+        # Set by MenuIndex.embed_courses
+        'embedding': course_data.get('embedding'),
+        'embedding_model': course_data.get('embedding_model'),
+        'synthesized_sources': len(sources),
+    }
+
+
+def article_row(item: Dict[str, Any], language: str = None, published_at: Optional[datetime] = None) -> Dict[str, Any]:
+    """Turn one cleaned raw item into an `articles` row."""
+    return {
+        'id': uuid.uuid4(),
+        'url': item.get('link') or item.get('url'),
+        'source_name': item.get('source_name'),
+        'title': item.get('title'),
+        'description': item.get('description'),
+        'published_at': published_at,
+        'language': language,
+        'category': item.get('category'),
+    }
+
+
+def dialect_insert(db, table):
+    """
+    INSERT that supports on_conflict_* for Postgres and SQLite; None for
+    other backends (callers fall back to a plain insert()).
+    db may be a Session or a Connection.
+    """
+    bind = db.get_bind() if hasattr(db, "get_bind") else db
+    name = bind.dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    return None
+
+
+def _chunks(rows: List[Any], size: int) -> Iterable[List[Any]]:
+    size = max(1, int(size))
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def plate_courses(db: Session, rows: List[Dict[str, Any]], links: Dict[str, List[Any]] = None,
+                  chunk_size: int = PLATE_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Bulk upsert course rows (see course_row) keyed on course_key, plus their
+    CourseArticle links, chunk_size rows per statement. links maps course_key
+    to the article ids it was cooked from.
+
+    Returns {course_key: course id}; on a conflict this is the id of the row
+    already in the table. Does not commit.
+    """
+    links = links or {}
+    plated = {}
+    for chunk in _chunks(rows, chunk_size):
+        # One statement can't touch the same key twice (Postgres rejects it); last one wins
+        chunk = list({row['course_key']: row for row in chunk}.values())
+
+        stmt = dialect_insert(db, Course)
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Course.course_key],
+                set_={col: getattr(stmt.excluded, col) for col in COURSE_UPDATE_COLUMNS},
+            )
+        else:
+            stmt = insert(Course)
+        result = db.execute(stmt.returning(Course.id, Course.course_key), chunk)
+        ids = {key: course_id for course_id, key in result}
+        plated.update(ids)
+
+        _insert_links(db, [
+            {'course_id': ids[row['course_key']], 'article_id': article_id}
+            for row in chunk
+            for article_id in dict.fromkeys(links.get(row['course_key']) or [])
+            if row['course_key'] in ids
+        ])
+    return plated
+
+
+def _insert_links(db: Session, link_rows: List[Dict[str, Any]]):
+    """CourseArticle rows; links that already exist are skipped."""
+    if not link_rows:
+        return
+    link_stmt = dialect_insert(db, CourseArticle)
+    link_stmt = link_stmt.on_conflict_do_nothing() if link_stmt is not None else insert(CourseArticle)
+    db.execute(link_stmt, link_rows)
+
+
+def link_articles(db: Session, links: Dict[Any, List[Any]], chunk_size: int = PLATE_CHUNK_SIZE):
+    """Link courses to articles ({course id: [article ids]}); existing links are skipped. Does not commit."""
+    rows = [{'course_id': course_id, 'article_id': article_id}
+            for course_id, article_ids in links.items() for article_id in dict.fromkeys(article_ids)]
+    for chunk in _chunks(rows, chunk_size):
+        _insert_links(db, chunk)
+
+
+def merge_into_courses(db: Session, sources: Dict[Any, List[Dict[str, Any]]], links: Dict[Any, List[Any]] = None,
+                       chunk_size: int = PLATE_CHUNK_SIZE) -> Dict[Any, int]:
+    """
+    Append sources to courses that already exist and link their articles,
+    without touching title or summary. sources maps course id to source dicts
+    (see clean_sources); urls a course already lists are skipped. links maps
+    course id to article ids.
+
+    Returns {course id: sources pending a re-synthesis} for every course
+    found: everything past synthesized_sources (courses plated before that
+    column existed count from their current length). Does not commit.
+    """
+    links = links or {}
+    pending = {}
+    course_ids = list(dict.fromkeys(list(sources) + list(links)))
+    for chunk in _chunks(course_ids, chunk_size):
+        rows = db.execute(select(Course.id, Course.source_urls, Course.synthesized_sources).where(Course.id.in_(chunk))).all()
+        updates = []
+        for course_id, current, synthesized in rows:
+            current = list(current or [])
+            baseline = synthesized if synthesized is not None else len(current)
+            known = {s.get('url') for s in current if isinstance(s, dict)}
+            added = []
+            for source in clean_sources(sources.get(course_id)):
+                if source['url'] not in known:
+                    known.add(source['url'])
+                    added.append(source)
+            if added or synthesized is None:
+                updates.append({'id': course_id, 'source_urls': current + added, 'synthesized_sources': baseline})
+            pending[course_id] = len(current) + len(added) - baseline
+        if updates:
+            db.execute(update(Course), updates)
+        _insert_links(db, [
+            {'course_id': course_id, 'article_id': article_id}
+            for course_id, _, _ in rows
+            for article_id in dict.fromkeys(links.get(course_id) or [])
+        ])
+    return pending
+
+
+def upsert_articles(db: Session, rows: List[Dict[str, Any]], chunk_size: int = PLATE_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Bulk upsert article rows (see article_row) keyed on the unique url.
+    Returns {url: article id}, reusing the existing id for urls already stored,
+    so course links always point at the one row per URL. Does not commit.
+    """
+    stored = {}
+    rows = [row for row in rows if row.get('url')]
+    for chunk in _chunks(rows, chunk_size):
+        chunk = list({row['url']: row for row in chunk}.values())
+        stmt = dialect_insert(db, Article)
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Article.url],
+                set_={col: func.coalesce(getattr(stmt.excluded, col), getattr(Article, col)) for col in ARTICLE_UPDATE_COLUMNS},
+            )
+            result = db.execute(stmt.returning(Article.id, Article.url), chunk)
+            stored.update({url: article_id for article_id, url in result})
+        else:
+            # No upsert: only insert urls we don't have yet
+            existing = dict(db.execute(select(Article.url, Article.id).where(Article.url.in_([r['url'] for r in chunk]))).all())
+            fresh = [row for row in chunk if row['url'] not in existing]
+            if fresh:
+                db.execute(insert(Article), fresh)
+            stored.update(existing)
+            stored.update({row['url']: row['id'] for row in fresh})
+    return stored
+
+
+def course_links(plated: List[Any], article_ids: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    {course_key: [article ids]} from (course, row) pairs: the Chef course's
+    'item_links' (see chef.attach_item_links) against the row it was plated as.
+    """
+    links = {}
+    for course, row in plated:
+        ids = [article_ids[url] for url in course.get('item_links') or [] if url in article_ids]
+        if ids:
+            links[row['course_key']] = ids
+    return links
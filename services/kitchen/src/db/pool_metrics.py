@@ -0,0 +1,111 @@
+import time
+import threading
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """
+    Connection pool counters for one engine: checkouts, time spent waiting for
+    a connection, how long connections are held, peak concurrent use and pool
+    timeouts. A high wait time or peak == capacity means workers are starved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.capacity = None
+        self.requests = 0
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.held_total = 0.0
+        self.held_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def attach(self, engine):
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            self.capacity = pool.size() + max(0, pool._max_overflow)
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_conn, record):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_conn, record, proxy):
+            record.info["checked_out_at"] = time.perf_counter()
+            with self._lock:
+                self.checkouts += 1
+                self.in_use += 1
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_conn, record):
+            started = record.info.pop("checked_out_at", None)
+            with self._lock:
+                self.in_use = max(0, self.in_use - 1)
+                if started is not None:
+                    held = time.perf_counter() - started
+                    self.held_total += held
+                    self.held_max = max(self.held_max, held)
+        return self
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            n = self.checkouts or 1
+            waits = self.requests or 1
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "capacity": self.capacity,
+                "wait_avg_ms": self.wait_total / waits * 1000,
+                "wait_max_ms": self.wait_max * 1000,
+                "held_avg_ms": self.held_total / n * 1000,
+                "held_max_ms": self.held_max * 1000,
+            }
+
+    def summary(self) -> str:
+        s = self.snapshot()
+        capacity = s["capacity"] if s["capacity"] is not None else "unbounded"
+        return (f"DB pool: {s['checkouts']} checkouts, {s['connects']} new connections, peak {s['peak_in_use']}/{capacity} in use, "
+                f"wait avg {s['wait_avg_ms']:.1f}ms max {s['wait_max_ms']:.1f}ms, "
+                f"held avg {s['held_avg_ms']:.1f}ms max {s['held_max_ms']:.1f}ms, {s['timeouts']} timeouts.")
+
+
+class _MeteredPoolMixin:
+    """Times every connection request (queue wait, or connect time for NullPool)."""
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception as e:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=isinstance(e, exc.TimeoutError))
+            raise
+        if self.metrics:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return conn
+
+
+def metered_pool_class(base, metrics: PoolMetrics):
+    """Subclass of a SQLAlchemy pool class that reports connection waits to metrics."""
+    return type(f"Metered{base.__name__}", (_MeteredPoolMixin, base), {"metrics": metrics})
+
@@ -1,114 +1,66 @@
 import os
 import json
 import time
-from typing import List, Dict, Any
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv
-
-# Load .env from kitchen directory explicitly
-env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
-print(f"Loading .env from: {env_path}")
-print(f".env exists: {os.path.exists(env_path)}")
-load_dotenv(env_path)
-
-# Load API keys
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-
-print(f"GEMINI_API_KEY loaded: {bool(GEMINI_API_KEY)}")
-print(f"OPENAI_API_KEY loaded: {bool(OPENAI_API_KEY)}")
-print(f"ANTHROPIC_API_KEY loaded: {bool(ANTHROPIC_API_KEY)}")
-
-# Initialize clients AFTER loading env vars
-gemini_client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
-
-openai_client = None
-try:
-    from openai import OpenAI
-    openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-    print(f"OpenAI client initialized: {openai_client is not None}")
-except ImportError:
-    print("OpenAI package not installed")
-
-anthropic_client = None
-try:
-    from anthropic import Anthropic
-    anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
-    print(f"Anthropic client initialized: {anthropic_client is not None}")
-except ImportError:
-    print("Anthropic package not installed")
-
-def create_dynamic_batches(items: List[Dict[str, Any]], max_chars: int = 25000) -> List[List[Dict[str, Any]]]:
-    """
-    Chunks items dynamically based on the length of their string representation.
-    Safely fills the context window without overstuffing.
-    """
-    batches = []
-    current_batch = []
-    current_chars = 0
-    
-    for item in items:
-        # Estimate size: Title + Description + Metadata
-        item_str = str(item)
-        item_len = len(item_str)
-        
-        # If adding this item exceeds max, push current batch
-        if current_batch and (current_chars + item_len > max_chars):
-             batches.append(current_batch)
-             current_batch = []
-             current_chars = 0
-        
-        current_batch.append(item)
-        current_chars += item_len
-        
-    if current_batch:
-        batches.append(current_batch)
-        
-    return batches
+from typing import List, Dict, Any, Iterator, Optional
 
-def cook_batch(raw_items: List[Dict[str, Any]], existing_titles: List[str] = [], target_language: str = "English", status_callback=None, model: str = "gemini") -> List[Dict[str, Any]]:
-    """
-    Takes a large batch of raw news items and a list of existing story titles.
-    Uses AI (Gemini, GPT-4o, or Claude) to:
-    1. Cluster raw items into stories.
-    2. Filter out stories that semantically match 'existing_titles'.
-    3. Synthesize new Courses.
-    """
-    if not raw_items: return []
+from src.utils.retry import call_with_retries, Cancelled
+from src.utils.model_config import get_model_entry
+from src.ingest.tokens import get_token_estimator, heuristic_token_count, CHARS_PER_TOKEN
+from src.utils.llm_cache import get_cache
+from src.ai import providers as llm
+from src.ingest.scheduler import get_provider_limiter
+# Commentary lives in commentary.py; re-exported for existing imports
+from src.ingest.commentary import generate_commentary
+from src.ingest.json_stream import IncrementalCourseParser, WRAPPER_KEYS
 
+def render_ingredient(i: int, item: Dict[str, Any]) -> str:
+    """The exact text one raw item contributes to the Chef prompt."""
+    text = f"ID: {i}\nTitle: {item.get('title')}\nSource: {item.get('source_name', 'Unknown')}\nDate: {item.get('published_at')}\nLink: {item.get('link') or item.get('url')}\nSnippet: {item.get('description')}\n"
+    # Pre-clustered representative: mention the syndication, keep member links local
+    others = [m.get('source_name', 'Unknown') for m in item.get('members', [])[1:]]
+    if others:
+        text += f"Also reported by: {', '.join(dict.fromkeys(others))}\n"
+    return text + "\n"
+
+def build_chef_prompt(raw_items: List[Dict[str, Any]], existing_titles: List[str] = [], target_language: str = "English") -> str:
+    """Render the full cook_batch prompt. With no items it is the fixed per-call overhead."""
     # Prepare Context
-    raw_text = ""
-    for i, item in enumerate(raw_items):
-        raw_text += f"ID: {i}\nTitle: {item.get('title')}\nSource: {item.get('source_name', 'Unknown')}\nDate: {item.get('published_at')}\nLink: {item.get('link') or item.get('url')}\nSnippet: {item.get('description')}\n\n"
+    raw_text = "".join(render_ingredient(i, item) for i, item in enumerate(raw_items))
 
-    existing_text = "\n".join([f"- {t}" for t in existing_titles]) if existing_titles else "(None)"
+    # Normally empty: run_kitchen drops items already on the menu by embedding
+    # similarity (src.ingest.menu_index) before calling the Chef
+    menu_goal, menu_section = "", ""
+    menu_rule = "Every group is new: stories already on the menu were removed before this call."
+    if existing_titles:
+        existing_text = "\n".join([f"- {t}" for t in existing_titles])
+        menu_goal = 'You must also check the "Menu" (existing stories) and IGNORE any new items that cover the same story, to prevent duplicates.\n'
+        menu_section = f"""--- EXISTING MENU (Do NOT create courses for these topics) ---
+    {existing_text}
+    
+    """
+        menu_rule = "If a group matches a topic already on the Existing Menu, DISCARD it completely."
 
     prompt = f"""
     You are the Executive Chef of a news intelligence service.
     
     GOAL:
     Organize the provided "Raw Ingredients" (news items) into "Courses" (consolidated news stories).
-    You must also check the "Menu" (existing stories) and IGNORE any new items that cover the same story, to prevent duplicates.
-    
+    {menu_goal}    
     **CRITICAL**: Output the 'title' and 'summary' fields in the target language: {target_language}.
     However, keep 'category', 'entities', and 'topics' in English for internal tagging consistency.
 
     INPUTS:
     
-    --- EXISTING MENU (Do NOT create courses for these topics) ---
-    {existing_text}
-    
-    --- RAW INGREDIENTS (Cluster these) ---
+    {menu_section}--- RAW INGREDIENTS (Cluster these) ---
     {raw_text}
     
     INSTRUCTIONS:
     1. Group the Raw Ingredients by specific semantic topic. **Prefer creating MORE small groups rather than merging loosely related stories.**
-    2. If a group matches a topic already on the Existing Menu, DISCARD it completely.
+    2. {menu_rule}
     3. For each NEW group, synthesize a "Course" object.
     4. **CRITICAL**: For 'category', choose the most fitting single-word category (e.g., 'politics', 'ai', 'crypto', 'finance'). Output must be lowercase.
     5. **CRITICAL**: For 'sources', return a list of objects exactly like {{"title": "...", "url": "...", "source": "..."}}. You MUST extract the URL from the raw ingredients provided. Do not hallucinate links.
+    6. For 'ingredient_ids', list the ID of every Raw Ingredient you used for the course.
     
     OUTPUT SCHEMA (JSON List):
     [
@@ -122,149 +74,422 @@ def cook_batch(raw_items: List[Dict[str, Any]], existing_titles: List[str] = [],
                 {{"title": "Headline of article 1", "url": "https://actual.link/...", "source": "Source Name"}},
                 {{"title": "Headline of article 2", "url": "https://actual.link/...", "source": "Source Name"}}
             ],
+            "ingredient_ids": [0, 3],
             "representative_published_at": "ISO8601 timestamp"
         }}
     ]
     """
+    return prompt
 
-    try:
-        print(f"Chef is cooking batch with {model}...")
-        if status_callback: status_callback(f"Consulting AI Chef ({model})...")
-        
-        if model == "gemini":
-            if not gemini_client:
-                raise ValueError("Gemini API key not configured")
-            response = gemini_client.models.generate_content(
-                model="gemini-3-flash-preview",
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json"
-                )
-            )
-            response_text = response.text
-            
-        elif model == "gpt5nano":
-            if not openai_client:
-                raise ValueError("OpenAI API key not configured")
-            response = openai_client.chat.completions.create(
-                model="gpt-5-nano-2025-08-07",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-            response_text = response.choices[0].message.content
-            
-        elif model == "claude":
-            if not anthropic_client:
-                raise ValueError("Anthropic API key not configured")
-            response = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=8192,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            response_text = response.content[0].text
+# Output tokens a single raw item costs in the response (its share of a course
+# plus its own entry in 'sources'). Used to reserve room for the output JSON.
+DEFAULT_OUTPUT_TOKENS_PER_ITEM = 150
+
+# Fragments are sized with a worst-case ID so renumbering can't overflow a batch
+SIZING_ID = 99999
+
+class BatchBudget:
+    """
+    Per-call limits for token-driven batching:
+    input_tokens for the ingredient fragments (prompt overhead already removed)
+    and max_items so the response JSON fits in the model's output budget.
+    """
+    def __init__(self, input_tokens: int, max_items: int = None, estimate=heuristic_token_count):
+        self.input_tokens = max(1, int(input_tokens))
+        self.max_items = max(1, int(max_items)) if max_items else None
+        self.estimate = estimate
+
+def batch_budget_for(model: str, existing_titles: List[str] = [], target_language: str = "English") -> BatchBudget:
+    """
+    Budget from model_config.json: contextTokens minus maxOutputTokens minus the
+    rendered prompt overhead (instructions + existing menu), measured with the
+    provider's token estimator. Falls back to maxChars when contextTokens is missing.
+    """
+    entry = get_model_entry(model)
+    estimate = get_token_estimator(entry.get('provider', model))
+    context_tokens = entry.get('contextTokens') or int(entry.get('maxChars', 100000) / CHARS_PER_TOKEN)
+    reserved_output = entry.get('maxOutputTokens', 8192)
+    overhead = estimate(build_chef_prompt([], existing_titles, target_language))
+    per_item_output = entry.get('outputTokensPerItem', DEFAULT_OUTPUT_TOKENS_PER_ITEM)
+    return BatchBudget(
+        input_tokens=context_tokens - reserved_output - overhead,
+        max_items=reserved_output // per_item_output,
+        estimate=estimate,
+    )
+
+def create_dynamic_batches(items: List[Dict[str, Any]], max_chars: int = 25000, budget: BatchBudget = None, mode: str = "greedy") -> List[List[Dict[str, Any]]]:
+    """
+    Chunks items by the size of the prompt fragment each one actually renders to.
+
+    Without a budget, fragments are measured in characters against max_chars.
+    With a BatchBudget (see batch_budget_for), they are measured in tokens and
+    each batch also respects max_items so the output JSON fits.
+
+    mode="greedy" keeps feed order (related stories stay together);
+    mode="binpack" uses first-fit decreasing to minimise the number of calls,
+    at the cost of scattering items across batches.
+    """
+    if mode not in ("greedy", "binpack"):
+        raise ValueError(f"Unknown batching mode: {mode}")
+    if mode == "greedy":
+        batcher = StreamingBatcher(max_chars=max_chars, budget=budget)
+        return batcher.add(items) + batcher.flush()
+
+    if budget:
+        sizes = [budget.estimate(render_ingredient(SIZING_ID, item)) for item in items]
+        capacity, max_items = budget.input_tokens, budget.max_items
+    else:
+        sizes = [len(render_ingredient(SIZING_ID, item)) for item in items]
+        capacity, max_items = max_chars, None
+
+    bins = []  # [used, [indices]]
+    for idx in sorted(range(len(items)), key=lambda k: sizes[k], reverse=True):
+        for b in bins:
+            if (not max_items or len(b[1]) < max_items) and b[0] + sizes[idx] <= capacity:
+                b[0] += sizes[idx]
+                b[1].append(idx)
+                break
         else:
-            raise ValueError(f"Unknown model: {model}")
-        
-        if status_callback: status_callback("Plating AI results...")
-        
-        # Robust JSON parsing with fallback
+            bins.append([sizes[idx], [idx]])
+    # Restore feed order inside each bin, and order bins by their first item
+    ordered = sorted((sorted(b[1]) for b in bins), key=lambda b: b[0])
+    return [[items[k] for k in b] for b in ordered]
+
+class StreamingBatcher:
+    """
+    Greedy batching for items that arrive over time (the kitchen pipeline):
+    add() returns the batches that filled up, flush() the partly filled rest.
+    Same limits and order as create_dynamic_batches(mode="greedy").
+    """
+    def __init__(self, max_chars: int = 25000, budget: BatchBudget = None):
+        if budget:
+            self.size = lambda item: budget.estimate(render_ingredient(SIZING_ID, item))
+            self.capacity, self.max_items = budget.input_tokens, budget.max_items
+        else:
+            self.size = lambda item: len(render_ingredient(SIZING_ID, item))
+            self.capacity, self.max_items = max_chars, None
+        self.current = []
+        self.used = 0
+
+    def fits(self, size: int) -> bool:
+        if self.max_items and len(self.current) + 1 > self.max_items:
+            return False
+        return self.used + size <= self.capacity
+
+    def add(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        full = []
+        for item in items:
+            item_size = self.size(item)
+            # If adding this item exceeds max, push current batch
+            if self.current and not self.fits(item_size):
+                full.append(self.current)
+                self.current = []
+                self.used = 0
+            self.current.append(item)
+            self.used += item_size
+        return full
+
+    def flush(self) -> List[List[Dict[str, Any]]]:
+        batch, self.current, self.used = self.current, [], 0
+        return [batch] if batch else []
+
+def _source_url(source) -> str:
+    return source if isinstance(source, str) else (source.get('url') or source.get('link'))
+
+def _ingredients_of(course: Dict[str, Any], raw_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The batch items the course's 'ingredient_ids' (indices into raw_items) point at."""
+    picked = []
+    for raw_id in course.get('ingredient_ids') or []:
         try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError as je:
+            idx = int(raw_id)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < len(raw_items):
+            picked.append(raw_items[idx])
+    return picked
+
+def expand_course_sources(course: Dict[str, Any], raw_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pre-clustered prompts only show one representative link per cluster.
+    Put every member's link back onto the course so no source is lost: for
+    the clusters its 'ingredient_ids' point at, and for any whose
+    representative link the model echoed in its sources.
+    """
+    if not isinstance(course, dict):
+        return course
+    members_by_link = {}
+    for item in raw_items:
+        if item.get('members'):
+            members_by_link[item.get('link') or item.get('url')] = item['members']
+    if not members_by_link:
+        return course
+
+    key = 'sources' if 'sources' in course else 'source_urls'
+    sources = list(course.get(key) or [])
+    known = {_source_url(s) for s in sources}
+    clusters = [item['members'] for item in _ingredients_of(course, raw_items) if item.get('members')]
+    clusters += [members_by_link[url] for url in list(known) if url and url in members_by_link]
+    for members in clusters:
+        for member in members:
+            member_url = member.get('link') or member.get('url')
+            if member_url and member_url not in known:
+                known.add(member_url)
+                sources.append({
+                    'title': member.get('title', 'Related Article'),
+                    'url': member_url,
+                    'source': member.get('source_name', 'News')
+                })
+    course[key] = sources
+    return course
+
+def attach_item_links(course: Dict[str, Any], raw_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Resolve the course's 'ingredient_ids' (indices into this batch) to the raw
+    item links it was cooked from, stored as course['item_links'] so plating
+    can link Articles. Pre-clustered representatives contribute every member.
+    Courses without usable IDs fall back to matching their source URLs.
+    """
+    if not isinstance(course, dict):
+        return course
+    picked = _ingredients_of(course, raw_items)
+    if not picked:
+        by_link = {item.get('link') or item.get('url'): item for item in raw_items}
+        for s in course.get('sources') or course.get('source_urls') or []:
+            url = _source_url(s)
+            if url in by_link:
+                picked.append(by_link[url])
+
+    links = []
+    for item in picked:
+        for member in item.get('members') or [item]:
+            link = member.get('link') or member.get('url')
+            if link:
+                links.append(link)
+    course['item_links'] = list(dict.fromkeys(links))
+    return course
+
+def plate_ready(course: Dict[str, Any], raw_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Post-process one parsed course against the batch it came from."""
+    return attach_item_links(expand_course_sources(course, raw_items), raw_items)
+
+def parse_json_response(response_text: str, verbose: bool = True):
+    """
+    Robust JSON parsing with fallback to a ```json fenced block.
+    Returns the parsed value, or None if nothing usable was found.
+    """
+    try:
+        return json.loads(response_text)
+    except (json.JSONDecodeError, TypeError) as je:
+        if verbose:
             print(f"JSON Parse Error: {je}")
             # Safe print for Unicode content
             try:
-                preview = response_text[:500]
+                preview = (response_text or "")[:500]
                 print(f"Response preview: {preview}...")
             except UnicodeEncodeError:
                 print(f"Response preview: [Contains non-ASCII characters, length={len(response_text)}]")
-            # Try to extract JSON array from markdown code blocks
-            if "```json" in response_text:
-                try:
-                    json_start = response_text.find("```json") + 7
-                    json_end = response_text.find("```", json_start)
-                    json_str = response_text[json_start:json_end].strip()
-                    data = json.loads(json_str)
-                except:
-                    return []
-            else:
-                return []
-        
-        if isinstance(data, list):
-            return data
-        return [data] if data else []
+        # Try to extract JSON array from markdown code blocks
+        if response_text and "```json" in response_text:
+            try:
+                json_start = response_text.find("```json") + 7
+                json_end = response_text.find("```", json_start)
+                json_str = response_text[json_start:json_end].strip()
+                return json.loads(json_str)
+            except:
+                return None
+        return None
 
-    except Exception as e:
-        print(f"Chef Burned the Meal ({model}): {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+def _call_chef_model(model: str, prompt: str) -> str:
+    """One blocking completion for cook_batch; raises on failure so callers can retry."""
+    # cook_batch retries under the provider limiter itself, so no provider-level retries here
+    return llm.complete(model, prompt, json_mode=True, max_retries=0).text
+
+def _stream_chef_model(model: str, prompt: str) -> Iterator[str]:
+    """Streaming variant of _call_chef_model: yields response text chunks as they arrive."""
+    yield from llm.stream(model, prompt, json_mode=True)
 
-def generate_commentary(courses_data: List[Dict[str, Any]], target_language: str = "English", model: str = "gemini") -> str:
+def _courses_from(data) -> List[Dict[str, Any]]:
+    """Normalize a parsed response to a list of courses (unwrapping {"courses": [...]})."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in WRAPPER_KEYS:
+            if isinstance(data.get(key), list):
+                return data[key]
+        return [data]
+    return []
+
+def _cook_streaming(model: str, prompt: str, raw_items: List[Dict[str, Any]], on_course=None, rate_limiter=None):
     """
-    Generate AI commentary on today's news stories.
-    
-    Args:
-        courses_data: List of course dictionaries with titles and summaries
-        target_language: Language for the commentary
-        model: AI model to use (gemini, gpt5nano, claude)
-    
-    Returns:
-        Commentary text string
+    Stream one completion, emitting each course as soon as its JSON object closes.
+    Returns (courses, full_text, complete). A stream that dies after at least one
+    course keeps what it has (complete=False); one that dies before any course
+    raises so call_with_retries can try again.
     """
-    if not courses_data:
-        return f"No news stories available for commentary today."
-    
-    # Create a summary of today's news
-    news_summary = "\n\n".join([
-        f"• {course.get('title', 'Untitled')}: {course.get('summary', 'No summary')[:150]}..."
-        for course in courses_data[:10]  # Limit to top 10 stories
-    ])
-    
-    prompt = f"""You are an insightful news analyst. Provide a brief, engaging commentary on today's top news stories in {target_language}.
+    parser = IncrementalCourseParser()
+    courses = []
+    chunks = []
+
+    def emit(course):
+        course = plate_ready(course, raw_items)
+        courses.append(course)
+        if on_course: on_course(course)
 
-Today's Top Stories:
-{news_summary}
+    try:
+        if rate_limiter:
+            with rate_limiter.slot():
+                for chunk in _stream_chef_model(model, prompt):
+                    chunks.append(chunk)
+                    for course in parser.feed(chunk):
+                        emit(course)
+        else:
+            for chunk in _stream_chef_model(model, prompt):
+                chunks.append(chunk)
+                for course in parser.feed(chunk):
+                    emit(course)
+    except Exception as e:
+        if not courses:
+            raise
+        print(f"Chef stream cut off ({model}) after {len(courses)} courses: {e}")
+        return courses, "".join(chunks), False
 
-Provide a 2-3 paragraph analysis highlighting:
-1. Key themes and trends across these stories
-2. Notable implications or connections between events
-3. Your perspective on what matters most
+    full_text = "".join(chunks)
+    if not courses:
+        # Not a streamable array (e.g. a single bare object): parse the whole thing
+        data = parse_json_response(full_text)
+        if data is None:
+            raise ValueError(f"Chef stream ({model}) returned no valid JSON")
+        for course in _courses_from(data):
+            emit(course)
+    elif not parser.done:
+        print(f"Chef response truncated ({model}); kept {len(courses)} complete courses.")
+        return courses, full_text, False
+    return courses, full_text, True
 
-Keep it conversational and opinionated. Write in {target_language}."""
+def _prompt_fits(model: str, prompt: str) -> bool:
+    """Whether a prompt sized for another model fits this one's context (minus its output reserve)."""
+    entry = get_model_entry(model)
+    if not entry.get('contextTokens'):
+        return True
+    estimate = get_token_estimator(entry.get('provider', model))
+    return estimate(prompt) <= entry['contextTokens'] - entry.get('maxOutputTokens', 8192)
+
+def cook_batch(raw_items: List[Dict[str, Any]], existing_titles: List[str] = [], target_language: str = "English", status_callback=None, model: str = "gemini", rate_limiter=None, max_retries: int = 3, stream: bool = False, on_course=None, fallback: bool = False, hedge_percentile: float = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Takes a large batch of raw news items and a list of existing story titles.
+    Uses AI (Gemini, GPT-4o, or Claude) to:
+    1. Cluster raw items into stories.
+    2. Filter out stories that semantically match 'existing_titles'.
+    3. Synthesize new Courses.
+
+    rate_limiter (a scheduler.ProviderLimiter) gates every attempt; 429/5xx
+    failures are retried with jittered backoff up to max_retries times.
+
+    stream=True streams the completion and parses courses incrementally:
+    on_course(course) fires as each one completes, and a truncated response
+    still returns every course that finished.
+
+    fallback=True moves down the model's 'fallbackModels' (model_config.json)
+    when it fails or returns invalid JSON. hedge_percentile (implies fallback)
+    also fires the next model when the current one runs past its observed
+    latency percentile, taking the first valid answer. A stream falls back one
+    model at a time and can't hedge (ValueError), as both would emit courses.
+
+    Returns None when the Chef failed (no valid answer), so callers can tell
+    it from a valid empty menu ([]: nothing worth serving) and cook it again.
+    """
+    if not raw_items: return []
+    if stream and hedge_percentile is not None:
+        raise ValueError("cook_batch can't hedge a streamed batch; use fallback=True")
+
+    prompt = build_chef_prompt(raw_items, existing_titles, target_language)
 
     try:
-        if model == "gemini":
-            if not gemini_client:
-                return "Gemini API not configured."
-            response = gemini_client.models.generate_content(
-                model="gemini-2.0-flash-exp",
-                contents=prompt
-            )
-            return response.text
-            
-        elif model == "gpt5nano":
-            if not openai_client:
-                return "OpenAI API not configured."
-            response = openai_client.chat.completions.create(
-                model="gpt-5-nano-2025-08-07",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500
-            )
-            return response.choices[0].message.content
-            
-        elif model == "claude":
-            if not anthropic_client:
-                return "Anthropic API not configured."
-            response = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-            
+        print(f"Chef is cooking batch with {model} ({len(raw_items)} items, {len(prompt)} prompt chars)...")
+        if status_callback: status_callback(f"Consulting AI Chef ({model})...")
+        
+        def limiter_for(m):
+            return rate_limiter if m == model else (get_provider_limiter(m) if rate_limiter else None)
+
+        def attempt_model(m, cancel=None):
+            limiter = limiter_for(m)
+            def once():
+                if limiter:
+                    with limiter.slot():
+                        # A hedge that lost while queued for the slot never sends its request
+                        if cancel is not None and cancel.is_set():
+                            raise Cancelled(f"Chef ({m}) no longer needed")
+                        return _call_chef_model(m, prompt)
+                return _call_chef_model(m, prompt)
+            return call_with_retries(once, max_retries=max_retries, label=f"Chef ({m})", cancel=cancel)
+
+        is_valid = lambda text: parse_json_response(text, verbose=False) is not None
+
+        def attempt():
+            """(model that answered, response text)"""
+            if not (fallback or hedge_percentile is not None):
+                return model, attempt_model(model)
+            chain = [m for m in llm.fallback_chain(model) if m == model or _prompt_fits(m, prompt)]
+            winner, text = llm.hedged_call(chain, attempt_model, validate=is_valid, percentile=hedge_percentile)
+            if winner != model:
+                print(f"Batch served by fallback model {winner} instead of {model}.")
+            return winner, text
+
+        def attempt_stream():
+            """(model that answered, (courses, full text, complete)); a failed stream moves down the chain"""
+            chain = [model]
+            if fallback:
+                chain = [m for m in llm.fallback_chain(model) if m == model or _prompt_fits(m, prompt)]
+            for n, m in enumerate(chain):
+                try:
+                    result = call_with_retries(
+                        lambda: _cook_streaming(m, prompt, raw_items, on_course, limiter_for(m)),
+                        max_retries=max_retries, label=f"Chef stream ({m})",
+                    )
+                except Exception as e:
+                    if n == len(chain) - 1:
+                        raise
+                    print(f"Chef stream ({m}) failed: {e}; falling back to {chain[n + 1]}.")
+                    continue
+                if m != model:
+                    print(f"Batch served by fallback model {m} instead of {model}.")
+                return m, result
+
+        # Identical prompts (re-runs after a crash, same categories) are served from the cache
+        cache = get_cache()
+        provider, api_model = llm.cache_identity(model)
+        cache_key = cache.key(provider, api_model, prompt)
+
+        if stream:
+            response_text = cache.get(cache_key)
+            if response_text is None:
+                winner, (courses, full_text, complete) = attempt_stream()
+                if complete and courses:
+                    cache.put(cache.key(*llm.cache_identity(winner), prompt), full_text)
+                if status_callback: status_callback("Plating AI results...")
+                return courses
+        else:
+            response_text = cache.get(cache_key)
+            if response_text is None:
+                winner, response_text = attempt()
+                # Stored under the model that answered, so a fallback's answer is never replayed as the primary's
+                if response_text and is_valid(response_text):
+                    cache.put(cache.key(*llm.cache_identity(winner), prompt), response_text)
+        
+        if status_callback: status_callback("Plating AI results...")
+        
+        data = parse_json_response(response_text)
+        if data is None:
+            return None
+        
+        courses = [plate_ready(c, raw_items) for c in _courses_from(data)]
+        if on_course:
+            for course in courses:
+                on_course(course)
+        return courses
+
     except Exception as e:
-        print(f"Commentary generation error ({model}): {e}")
-        return f"Unable to generate commentary at this time."
-    
-    return "Model not supported for commentary."
+        print(f"Chef Burned the Meal ({model}): {e}")
+        import traceback
+        traceback.print_exc()
+        return None
@@ -2,44 +2,11 @@ import os
 import json
 import time
 from typing import List, Dict, Any
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv
 
-# Load .env from kitchen directory explicitly
-env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env')
-print(f"Loading .env from: {env_path}")
-print(f".env exists: {os.path.exists(env_path)}")
-load_dotenv(env_path)
-
-# Load API keys
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-
-print(f"GEMINI_API_KEY loaded: {bool(GEMINI_API_KEY)}")
-print(f"OPENAI_API_KEY loaded: {bool(OPENAI_API_KEY)}")
-print(f"ANTHROPIC_API_KEY loaded: {bool(ANTHROPIC_API_KEY)}")
-
-# Initialize clients AFTER loading env vars
-gemini_client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
-
-openai_client = None
-try:
-    from openai import OpenAI
-    openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-    print(f"OpenAI client initialized: {openai_client is not None}")
-except ImportError:
-    print("OpenAI package not installed")
-
-anthropic_client = None
-try:
-    from anthropic import Anthropic
-    anthropic_client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
-    print(f"Anthropic client initialized: {anthropic_client is not None}")
-except ImportError:
-    print("Anthropic package not installed")
+from src.utils.llm_cache import get_cache
+from src.ai import providers as llm
 
+COMMENTARY_MAX_TOKENS = 500
 
 def generate_commentary(courses_data: List[Dict[str, Any]], target_language: str = "English", model: str = "gemini") -> str:
     """
@@ -74,38 +41,15 @@ Provide a 2-3 paragraph analysis highlighting:
 
 Keep it conversational and opinionated. Write in {target_language}."""
 
+    # Same stories + language = same prompt, so a re-run reuses the cached commentary
     try:
-        if model == "gemini":
-            if not gemini_client:
-                return "Gemini API not configured."
-            response = gemini_client.models.generate_content(
-                model="gemini-2.0-flash-exp",
-                contents=prompt
-            )
-            return response.text
-            
-        elif model == "gpt5nano":
-            if not openai_client:
-                return "OpenAI API not configured."
-            response = openai_client.chat.completions.create(
-                model="gpt-5-nano-2025-08-07",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500
-            )
-            return response.choices[0].message.content
-            
-        elif model == "claude":
-            if not anthropic_client:
-                return "Anthropic API not configured."
-            response = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=500,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-            
+        provider, api_model = llm.cache_identity(model, task="commentary")
+        if not llm.resolve(model)[0].available():
+            return f"{provider} API not configured."
+        return get_cache().cached_completion(
+            provider, api_model, prompt,
+            lambda: llm.complete(model, prompt, task="commentary", max_tokens=COMMENTARY_MAX_TOKENS).text
+        )
     except Exception as e:
         print(f"Commentary generation error ({model}): {e}")
         return f"Unable to generate commentary at this time."
-    
-    return "Model not supported for commentary."
@@ -0,0 +1,170 @@
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.db.models import Article, Course
+from src.utils.llm_cache import get_cache
+from src.utils.retry import call_with_retries
+from src.ai import providers as llm
+from src.ingest.chef import parse_json_response
+from src.ingest.menu_index import course_text, to_stored
+from src.ingest.scheduler import run_batches
+
+# Re-write a course's summary once this many merged sources are pending
+COURSE_RESYNTH_MIN_SOURCES = int(os.getenv("COURSE_RESYNTH_MIN_SOURCES", "3"))
+COURSE_UPDATE_MAX_TOKENS = 1024
+# New articles shown to the model per update (newest first)
+UPDATE_MAX_ITEMS = 20
+
+
+def merge_plan(on_menu: List[Dict[str, Any]], article_ids: Dict[str, Any]) -> Tuple[Dict[Any, List[Dict[str, str]]], Dict[Any, List[Any]]]:
+    """
+    Group the items MenuIndex.filter_new matched to a menu course by that
+    course: ({course id: source dicts}, {course id: article ids}). Pre-clustered
+    representatives contribute every member.
+    """
+    sources, links = {}, {}
+    for item in on_menu:
+        course_id = item['menu_match']['course_id']
+        for member in item.get('members') or [item]:
+            url = member.get('link') or member.get('url')
+            if not url:
+                continue
+            sources.setdefault(course_id, []).append({'url': url, 'title': member.get('title') or 'Related Article', 'source': member.get('source_name')})
+            if url in article_ids:
+                links.setdefault(course_id, []).append(article_ids[url])
+    return sources, links
+
+
+def build_update_prompt(course: Dict[str, Any], new_items: List[Dict[str, Any]], target_language: str = "English") -> str:
+    new_text = "\n".join(
+        f"- {item.get('title')} ({item.get('source_name') or 'Unknown'}): {item.get('description') or ''}"
+        for item in new_items[:UPDATE_MAX_ITEMS]
+    )
+    return f"""
+    You are the Executive Chef of a news intelligence service, updating a story already on the menu.
+
+    **CRITICAL**: Output the 'title' and 'summary' fields in the target language: {target_language}.
+    However, keep 'entities' and 'topics' in English for internal tagging consistency.
+
+    --- CURRENT COURSE ---
+    Title: {course.get('title')}
+    Summary: {course.get('summary')}
+    Entities: {', '.join(course.get('entities') or [])}
+    Topics: {', '.join(course.get('topics') or [])}
+
+    --- NEW REPORTING (not yet reflected in the summary) ---
+    {new_text}
+
+    INSTRUCTIONS:
+    1. Rewrite the summary (max 80 words) so it covers the new developments. Keep what is still accurate.
+    2. Change the title (max 10 words) only if the story has materially moved on.
+    3. Update 'entities' and 'topics' if the new reporting adds any.
+
+    OUTPUT SCHEMA (JSON object):
+    {{"title": "...", "summary": "...", "entities": ["entity1"], "topics": ["topic1"]}}
+    """
+
+
+def _valid_update(data) -> bool:
+    return isinstance(data, dict) and bool(data.get('summary'))
+
+
+def resynthesize_course(course: Dict[str, Any], new_items: List[Dict[str, Any]], target_language: str = "English",
+                        model: str = "gemini", rate_limiter=None, max_retries: int = 3) -> Optional[Dict[str, Any]]:
+    """
+    One LLM call folding new_items into an existing course. Returns
+    {'title', 'summary', 'entities', 'topics'}, or None if it failed.
+    """
+    prompt = build_update_prompt(course, new_items, target_language)
+
+    def once():
+        if rate_limiter:
+            with rate_limiter.slot():
+                return llm.complete(model, prompt, task="update", json_mode=True, max_tokens=COURSE_UPDATE_MAX_TOKENS, max_retries=0).text
+        return llm.complete(model, prompt, task="update", json_mode=True, max_tokens=COURSE_UPDATE_MAX_TOKENS, max_retries=0).text
+
+    try:
+        provider, api_model = llm.cache_identity(model, task="update")
+        text = get_cache().cached_completion(
+            provider, api_model, prompt,
+            lambda: call_with_retries(once, max_retries=max_retries, label=f"Course update ({model})"),
+            validate=lambda t: _valid_update(parse_json_response(t, verbose=False)),
+        )
+        data = parse_json_response(text)
+        if not _valid_update(data):
+            return None
+        return {
+            'title': data.get('title') or course.get('title'),
+            'summary': data['summary'],
+            'entities': data.get('entities') or course.get('entities') or [],
+            'topics': data.get('topics') or course.get('topics') or [],
+        }
+    except Exception as e:
+        print(f"Course update failed ({model}): {e}")
+        return None
+
+
+def refresh_courses(db: Session, course_ids: List[Any], target_language: str = "English", model: str = "gemini",
+                    rate_limiter=None, max_workers: int = 4, embedder=None) -> int:
+    """
+    Re-synthesize title/summary for these courses from the sources merged
+    since their summary was written (see plating.merge_into_courses), then
+    reset synthesized_sources. With an embedder the stored embedding is
+    refreshed too. Returns how many courses were updated.
+    Commits once everything is read (with whatever the session already
+    holds), so no connection is held while the model runs; the updates
+    themselves are left for the caller to commit.
+    """
+    if not course_ids:
+        return 0
+    courses = list(db.scalars(select(Course).where(Course.id.in_(list(course_ids)))))
+    pending_urls = {}
+    for course in courses:
+        sources = course.source_urls or []
+        tail = sources[course.synthesized_sources or 0:]
+        pending_urls[course.id] = [s.get('url') for s in reversed(tail) if isinstance(s, dict) and s.get('url')]
+    all_urls = list({url for urls in pending_urls.values() for url in urls})
+    articles = {}
+    for start in range(0, len(all_urls), 500):
+        for url, title, description, source_name in db.execute(
+                select(Article.url, Article.title, Article.description, Article.source_name)
+                .where(Article.url.in_(all_urls[start:start + 500]))):
+            articles[url] = {'title': title, 'description': description, 'source_name': source_name}
+
+    jobs = []
+    for course in courses:
+        by_url = {s.get('url'): s for s in course.source_urls or [] if isinstance(s, dict)}
+        new_items = [articles.get(url) or {'title': by_url[url].get('title'), 'source_name': by_url[url].get('source')}
+                     for url in pending_urls[course.id]]
+        if new_items:
+            jobs.append({'id': course.id, 'sources': len(course.source_urls or []), 'new_items': new_items,
+                         'course': {'title': course.title, 'summary': course.summary,
+                                    'entities': course.entities_json, 'topics': course.topics_json}})
+    # Jobs are plain dicts from here on: end the read transaction before the (slow) model calls
+    db.commit()
+
+    def update_one(i, batch, status_callback):
+        job = batch[0]
+        print(f"Updating course '{job['course']['title']}' with {len(job['new_items'])} new sources...")
+        fields = resynthesize_course(job['course'], job['new_items'], target_language, model, rate_limiter)
+        return [dict(job, fields=fields)] if fields else []
+
+    done = run_batches([[job] for job in jobs], update_one, max_workers)
+    if not done:
+        return 0
+    vectors = embedder.embed([course_text(job['fields']) for job in done]) if embedder is not None else None
+    rows = []
+    for n, job in enumerate(done):
+        fields = job['fields']
+        row = {'id': job['id'], 'title': fields['title'], 'summary': fields['summary'],
+               'entities_json': fields['entities'], 'topics_json': fields['topics'],
+               'synthesized_sources': job['sources']}
+        if vectors is not None:
+            row['embedding'] = to_stored(vectors[n])
+            row['embedding_model'] = embedder.name
+        rows.append(row)
+    db.execute(update(Course), rows)
+    return len(rows)
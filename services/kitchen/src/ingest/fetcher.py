@@ -0,0 +1,49 @@
+import os
+from typing import List, Dict, Any, Callable
+
+from src.ingest.pipeline import Stage, PIPELINE_QUEUE_SIZE
+
+# Defaults for the concurrent fetch stage (overridable via CLI flags). Politeness
+# is the client's job (see GoogleNewsClient.rate_limiter); workers only bound how
+# many requests are in flight.
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "4"))
+FETCH_RATE_PER_HOST = float(os.getenv("FETCH_RATE_PER_HOST", "2.0"))
+
+
+def fetch_stages(fetch: Callable[[Any], List[Dict[str, Any]]], workers: int = FETCH_MAX_WORKERS,
+                 queue_size: int = PIPELINE_QUEUE_SIZE) -> List[Stage]:
+    """
+    The fetch step as pipeline stages. Feed the pipeline (index, feed) pairs,
+    e.g. enumerate(feeds): 'fetch' calls fetch(feed) on `workers` threads and
+    'order' passes (feed, items) on in feed order, whatever order the fetches
+    finish in -- so batches, prompts and with them the LLM cache keys don't
+    depend on network timing. A fetch that raises counts as no items.
+    """
+    held = {}       # index -> (feed, items) that finished ahead of an earlier feed
+    next_idx = [0]  # only touched by the single 'order' worker
+
+    def fetch_stage(indexed, emit):
+        idx, feed = indexed
+        try:
+            items = fetch(feed) or []
+        except Exception as e:
+            print(f"Failed to fetch {feed}: {e}")
+            items = []
+        emit((idx, feed, items))
+
+    def order_stage(fetched, emit):
+        idx, feed, items = fetched
+        held[idx] = (feed, items)
+        while next_idx[0] in held:
+            emit(held.pop(next_idx[0]))
+            next_idx[0] += 1
+
+    def order_flush(emit):
+        # Only reached with gaps left (an index never fetched); keep the rest in order
+        for idx in sorted(held):
+            emit(held.pop(idx))
+
+    return [
+        Stage("fetch", fetch_stage, workers=workers, queue_size=queue_size),
+        Stage("order", order_stage, flush=order_flush, queue_size=queue_size),
+    ]
@@ -3,39 +3,44 @@ import time
 import requests
 import json
 import os
+import threading
 from datetime import datetime
 
+from src.ingest.http_session import get_session, conditional_get, validator_key
+from src.ingest.raw_archive import get_archive
+
+GOOGLE_NEWS_RSS_URL = os.getenv("GOOGLE_NEWS_RSS_URL", "https://news.google.com/rss")
+
 class GoogleNewsClient:
-    def __init__(self):
-        self.base_url = "https://news.google.com/rss/search"
+    def __init__(self, root_url=None, rate_limiter=None, session=None, validators=None):
+        # root_url lets benchmarks point the client at a local stub server
+        self.root_url = (root_url or GOOGLE_NEWS_RSS_URL).rstrip("/")
+        self.base_url = f"{self.root_url}/search"
+        # Optional HostRateLimiter, shared across threads when fetching concurrently
+        self.rate_limiter = rate_limiter
+        # Pooled keep-alive session; FeedValidatorStore enables conditional GETs
+        self.session = session or get_session()
+        self.validators = validators
+        self.unchanged_feeds = 0
+        self._stats_lock = threading.Lock()
     
-    def fetch_latest_news(self, query=None, category=None, language="en", page=None, max_pages=1, hl="en-US", gl="US", ceid="US:en"):
+    # Topic Mapping
+    TOPIC_MAP = {
+        'business': 'BUSINESS',
+        'technology': 'TECHNOLOGY',
+        'entertainment': 'ENTERTAINMENT',
+        'sports': 'SPORTS',
+        'science': 'SCIENCE',
+        'health': 'HEALTH',
+        'world': 'WORLD',
+        'nation': 'NATION'
+    }
+
+    def feed_request(self, query=None, category=None, hl="en-US", gl="US", ceid="US:en"):
         """
-        Fetch news from Google News RSS.
-        Note: 'page' and 'max_pages' are ignored as RSS is usually single-page.
+        (url, params, description) of the RSS request for a feed.
         'category' is treated as a query if 'query' is not provided.
         """
-        # Topic Mapping
-        TOPIC_MAP = {
-            'business': 'BUSINESS',
-            'technology': 'TECHNOLOGY',
-            'entertainment': 'ENTERTAINMENT',
-            'sports': 'SPORTS',
-            'science': 'SCIENCE',
-            'health': 'HEALTH',
-            'world': 'WORLD',
-            'nation': 'NATION'
-        }
-        
-        url = self.base_url
-        params = {
-            "hl": hl,
-            "gl": gl,
-            "ceid": ceid
-        }
-        
-        
-        url = self.base_url
         params = {
             "hl": hl,
             "gl": gl,
@@ -43,34 +48,50 @@ class GoogleNewsClient:
         }
         
         # Determine Endpoint
-        if category and category.lower() in TOPIC_MAP:
+        if category and category.lower() in self.TOPIC_MAP:
              # Use Topic Endpoint
-             topic_id = TOPIC_MAP[category.lower()]
-             url = f"https://news.google.com/rss/headlines/section/topic/{topic_id}"
-             print(f"Fetching Google News Topic: {topic_id}")
+             topic_id = self.TOPIC_MAP[category.lower()]
+             return f"{self.root_url}/headlines/section/topic/{topic_id}", params, f"Google News Topic: {topic_id}"
              
         elif not category or category.lower() == 'top' or category.lower() == 'headlines':
              # Use Top Stories (Headlines) Endpoint
              # Base URL is search, we want headlines
-             url = "https://news.google.com/rss"
-             print(f"Fetching Google News Top Stories")
+             return self.root_url, params, "Google News Top Stories"
              
-        else:
-            # Use Search Endpoint for custom queries/categories
-            q = query
-            if not q and category:
-                q = category 
-            
-            if not q:
-                url = "https://news.google.com/rss" # Fallback to headlines if query is empty partial
-                print(f"Fetching Top Stories (Empty Query)")
-            else:
-                url = "https://news.google.com/rss/search"
-                params["q"] = q
-                print(f"Fetching Google News RSS Search: {q}")
+        # Use Search Endpoint for custom queries/categories
+        q = query
+        if not q and category:
+            q = category 
+        
+        if not q:
+            return self.root_url, params, "Top Stories (Empty Query)" # Fallback to headlines if query is empty partial
+        params["q"] = q
+        return self.base_url, params, f"Google News RSS Search: {q}"
+
+    def feed_key(self, query=None, category=None, hl="en-US", gl="US", ceid="US:en"):
+        """The feed's key in the FeedValidatorStore (to skip committing its validators)."""
+        url, params, _ = self.feed_request(query=query, category=category, hl=hl, gl=gl, ceid=ceid)
+        return validator_key(url, params)
+    
+    def fetch_latest_news(self, query=None, category=None, language="en", page=None, max_pages=1, hl="en-US", gl="US", ceid="US:en"):
+        """
+        Fetch news from Google News RSS.
+        Note: 'page' and 'max_pages' are ignored as RSS is usually single-page.
+        'category' is treated as a query if 'query' is not provided.
+        """
+        url, params, description = self.feed_request(query=query, category=category, hl=hl, gl=gl, ceid=ceid)
+        print(f"Fetching {description}")
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            if self.rate_limiter:
+                self.rate_limiter.acquire(url)
+            response = conditional_get(url, params=params, validators=self.validators, session=self.session, timeout=10)
+            if response.status_code == 304:
+                # Feed unchanged since the last successful run: nothing to parse or cook
+                print(f"Feed unchanged (304): {category or query or 'top'}")
+                with self._stats_lock:
+                    self.unchanged_feeds += 1
+                return []
             response.raise_for_status()
             
             feed = feedparser.parse(response.content)
@@ -97,6 +118,8 @@ class GoogleNewsClient:
                     "category": category or "general" 
                 })
             
+            # Compressed, append-only copy for --replay (queued; written off the fetch path)
+            get_archive().append("google_news", articles, category=category, query=query, hl=hl, gl=gl, ceid=ceid)
             return articles
             
         except Exception as e:
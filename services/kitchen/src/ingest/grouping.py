@@ -1,5 +1,9 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import re
+import hashlib
+import struct
+from bisect import bisect_right
 
 def tokenize(text):
     """Normalize and tokenize text."""
@@ -11,22 +15,122 @@ def tokenize(text):
     # Filter short words? Maybe. For now, keep it simple.
     return set(t for t in tokens if len(t) > 2)
 
+def to_datetime(value):
+    """
+    Parse published_at into an aware datetime (naive values are taken as UTC).
+    Accepts datetimes, ISO 8601 / 'YYYY-MM-DD HH:MM:SS' and RFC 822 strings
+    (Google News RSS). Returns None if it can't be parsed.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value).strip()
+        try:
+            dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                dt = parsedate_to_datetime(text)
+            except (TypeError, ValueError):
+                return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
 def jaccard_similarity(set1, set2):
     """Compute Jaccard similarity between two sets."""
-    intersection = len(set1.intersection(set2))
-    union = len(set1.union(set2))
+    intersection = len(set1 & set2)
+    union = len(set1) + len(set2) - intersection
     if union == 0:
         return 0.0
     return intersection / union
 
-def simple_group_articles(articles, time_window_hours=12, similarity_threshold=0.35):
+# --- MinHash / LSH candidate index ---
+# With b bands of r rows, two titles with Jaccard s become candidates with
+# probability 1 - (1 - s^r)^b. The defaults (32 x 2) catch pairs at the 0.35
+# threshold ~98.5% of the time and pairs at 0.5 essentially always.
+# More bands / fewer rows = higher recall, more candidates to verify.
+LSH_BANDS = 32
+LSH_ROWS = 2
+
+class MinHasher:
+    """
+    MinHash signatures over token sets. Each token's num_perm hash values come
+    from one SHAKE-128 digest (independent 32-bit hashes) and are cached, so a
+    signature is just an element-wise min over a handful of cached tuples.
+    """
+
+    def __init__(self, num_perm=LSH_BANDS * LSH_ROWS, seed=b"feedbuffet"):
+        self.num_perm = num_perm
+        self._seed = seed
+        self._unpack = struct.Struct(f"<{num_perm}I").unpack
+        self._token_cache = {}
+
+    def _token_vector(self, token):
+        vec = self._token_cache.get(token)
+        if vec is None:
+            digest = hashlib.shake_128(self._seed + token.encode("utf-8")).digest(4 * self.num_perm)
+            vec = self._unpack(digest)
+            self._token_cache[token] = vec
+        return vec
+
+    def signature(self, tokens):
+        if not tokens:
+            return None
+        vectors = [self._token_vector(t) for t in tokens]
+        if len(vectors) == 1:
+            return vectors[0]
+        return tuple(map(min, zip(*vectors)))
+
+class LSHIndex:
+    """
+    Band buckets over MinHash signatures. candidates(i) returns the sorted
+    indices j > i sharing at least one bucket with i; only these pairs need
+    exact scoring. Candidates are computed on demand, so items already
+    absorbed into a group never pay for a lookup.
+    """
+
+    def __init__(self, token_sets, bands=LSH_BANDS, rows=LSH_ROWS):
+        hasher = MinHasher(num_perm=bands * rows)
+        self._buckets = {}
+        self._item_keys = []
+        for idx, tokens in enumerate(token_sets):
+            sig = hasher.signature(tokens)
+            keys = []
+            if sig is not None:
+                for b in range(bands):
+                    key = (b, sig[b * rows:(b + 1) * rows])
+                    # Indices are appended in order, so every bucket stays sorted
+                    self._buckets.setdefault(key, []).append(idx)
+                    keys.append(key)
+            self._item_keys.append(keys)
+
+    def candidates(self, idx):
+        found = set()
+        for key in self._item_keys[idx]:
+            bucket = self._buckets[key]
+            if bucket[-1] > idx:
+                found.update(bucket[bisect_right(bucket, idx):])
+        return sorted(found)
+
+def simple_group_articles(articles, time_window_hours=12, similarity_threshold=0.35, mode="exact", lsh_bands=LSH_BANDS, lsh_rows=LSH_ROWS):
     """
     Group articles based on time window and content similarity.
     params:
         articles: list of dicts or Article objects (must have 'title', 'published_at', 'id')
+        time_window_hours: only articles published within this many hours of a
+              group's newest article can join it (None disables the window).
+              Articles without a parseable date only group with each other.
+        mode: "exact" scores every later article (O(n^2));
+              "lsh" only scores MinHash/LSH candidate pairs (see LSH_BANDS / LSH_ROWS).
+              Both apply the same greedy grouping, so they agree whenever LSH
+              recalls every pair above the threshold.
     returns:
         list of lists of article IDs (groups)
     """
+    if mode not in ("exact", "lsh"):
+        raise ValueError(f"Unknown grouping mode: {mode}")
     if not articles:
         return []
 
@@ -43,7 +147,7 @@ def simple_group_articles(articles, time_window_hours=12, similarity_threshold=0
     for art in articles:
         title = get_attr(art, 'title') or ""
         tokens = tokenize(title)
-        pub_at = get_attr(art, 'published_at')
+        pub_at = to_datetime(get_attr(art, 'published_at'))
         art_id = get_attr(art, 'id')
         prepared.append({
             'id': art_id,
@@ -52,16 +156,20 @@ def simple_group_articles(articles, time_window_hours=12, similarity_threshold=0
             'original': art
         })
     
-    # Sort
-    # Note: published_at might be string if from API desc, or datetime if from DB.
-    # Assuming standard sorting works or logic handles it. 
-    # For now, let's assume they are roughly comparable or we just process in order.
-    # If string ISO, it sorts chronologically.
-    prepared.sort(key=lambda x: str(x['published_at']), reverse=True) 
+    # Sort newest first on real datetimes (string order mis-sorts RFC 822 dates).
+    # Undated articles go last.
+    epoch = datetime.min.replace(tzinfo=timezone.utc)
+    prepared.sort(key=lambda x: (x['published_at'] is not None, x['published_at'] or epoch), reverse=True)
+
+    window = timedelta(hours=time_window_hours) if time_window_hours is not None else None
     
     groups = []  # List of sets of indices or IDs? Let's store list of article items.
     
     used_indices = set()
+
+    lsh_index = None
+    if mode == "lsh":
+        lsh_index = LSHIndex([p['tokens'] for p in prepared], bands=lsh_bands, rows=lsh_rows)
     
     for i, p1 in enumerate(prepared):
         if i in used_indices:
@@ -71,20 +179,18 @@ def simple_group_articles(articles, time_window_hours=12, similarity_threshold=0
         used_indices.add(i)
         
         # Look ahead for candidates
-        for j in range(i + 1, len(prepared)):
+        candidates = lsh_index.candidates(i) if lsh_index is not None else range(i + 1, len(prepared))
+        for j in candidates:
+            p2 = prepared[j]
+
+            # Check time window. Candidates are in sort order (newest first),
+            # so once one is too old every later one is too: stop scanning.
+            if window is not None and p1['published_at'] is not None:
+                if p2['published_at'] is None or p1['published_at'] - p2['published_at'] > window:
+                    break
+
             if j in used_indices:
                 continue
-                
-            p2 = prepared[j]
-            
-            # Check time window (approx)
-            # If datetime objects
-            # delta = p1['published_at'] - p2['published_at']
-            # if abs(delta.total_seconds()) > time_window_hours * 3600:
-                # Assuming sorted descending, if p2 is too old compared to p1?
-                # Actually, p2 is older than p1.
-                # stop checking? depends on how strictly sorted.
-            #     continue
             
             # Check similarity
             sim = jaccard_similarity(p1['tokens'], p2['tokens'])
@@ -99,3 +205,21 @@ def simple_group_articles(articles, time_window_hours=12, similarity_threshold=0
         groups.append([g['original'] for g in current_group])
         
     return groups
+
+def precluster_items(items, time_window_hours=12, similarity_threshold=0.35, mode="lsh"):
+    """
+    Collapse near-duplicate raw items (syndicated headlines) before they reach the Chef.
+    Returns one representative per group: a copy of the group's newest item
+    with the full group under 'members' (the representative included), so
+    every member URL can be restored onto the course afterwards.
+    """
+    groups = simple_group_articles(
+        items, time_window_hours=time_window_hours,
+        similarity_threshold=similarity_threshold, mode=mode
+    )
+    representatives = []
+    for group in groups:
+        rep = dict(group[0])
+        rep['members'] = group
+        representatives.append(rep)
+    return representatives
@@ -0,0 +1,136 @@
+import os
+import json
+import threading
+from typing import Iterable
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Where ETag / Last-Modified validators survive between kitchen runs
+FEED_VALIDATORS_PATH = os.getenv("FEED_VALIDATORS_PATH", "data/feed_validators.json")
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+
+# Query params that must never end up in the validator file
+SENSITIVE_PARAMS = ("apikey",)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES) -> requests.Session:
+    """
+    A keep-alive session with a connection pool and retry/backoff on
+    connection errors, 429 and 5xx (honouring Retry-After).
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "FeedBuffet-Kitchen/1.0"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Process-wide shared session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def validator_key(url: str, params: dict = None) -> str:
+    """Stable cache key for a feed request, with secrets stripped out."""
+    safe_params = {k: v for k, v in (params or {}).items() if k not in SENSITIVE_PARAMS}
+    return requests.Request("GET", url, params=safe_params).prepare().url
+
+
+class FeedValidatorStore:
+    """
+    Persists ETag / Last-Modified per feed URL so we can send conditional GETs.
+
+    New validators are staged, not sent: conditional GETs only use committed
+    ones. The kitchen calls commit() once a cycle's courses are safely served
+    and discard() when the cycle fails, so a failed cycle re-downloads (and
+    re-cooks) its feeds instead of getting 304s for items it never served.
+    """
+
+    def __init__(self, path: str = FEED_VALIDATORS_PATH, load: bool = True):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = {}
+        self._staged = {}
+        if load and path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._data = json.load(f)
+            except Exception as e:
+                print(f"Could not read feed validators ({path}): {e}")
+                self._data = {}
+
+    def headers_for(self, key: str) -> dict:
+        with self._lock:
+            entry = self._data.get(key) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, key: str, response: requests.Response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._staged[key] = {"etag": etag, "last_modified": last_modified}
+
+    def commit(self, skip_keys: Iterable[str] = ()):
+        """Apply the staged validators (except skip_keys, whose feeds must be re-fetched) and save."""
+        skip = set(skip_keys)
+        with self._lock:
+            self._data.update((k, v) for k, v in self._staged.items() if k not in skip)
+            self._staged = {}
+        self.save()
+
+    def discard(self):
+        """Drop the staged validators; the next cycle re-downloads those feeds."""
+        with self._lock:
+            self._staged = {}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._data)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def conditional_get(url: str, params: dict = None, validators: FeedValidatorStore = None,
+                    session: requests.Session = None, timeout: float = 10, **kwargs) -> requests.Response:
+    """
+    GET through the pooled session, sending stored validators when we have them.
+    Callers should check `response.status_code == 304` before parsing.
+    """
+    session = session or get_session()
+    key = validator_key(url, params)
+    headers = validators.headers_for(key) if validators else {}
+    response = session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+    if validators and response.status_code == 200:
+        validators.update(key, response)
+    return response
@@ -0,0 +1,92 @@
+import json
+from typing import Any, Dict, List
+
+# Keys a model may wrap the course list in when forced to return an object
+# (OpenAI json_object mode), e.g. {"courses": [...]}
+WRAPPER_KEYS = ("courses", "items", "stories", "results", "data")
+
+
+class IncrementalCourseParser:
+    """
+    Incremental parser for a streamed JSON array of objects.
+
+    feed() takes text chunks as they arrive and returns every array element
+    that has just been completed, so callers can act on each course before the
+    model has finished the rest. Handles a bare top-level array, an object
+    wrapping the array under one of WRAPPER_KEYS, and leading noise such as a
+    ```json fence. If the stream is cut off, everything already returned is
+    intact; the partial element is simply never emitted.
+
+    Anything else (e.g. a single bare object) yields nothing here; callers
+    should fall back to parsing the full text.
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._element = None  # list of chars while inside an element
+        self._key = None      # list of chars while reading a depth-1 key
+        self._last_key = None
+        self._started = False
+        self.done = False
+        self.emitted = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        completed = []
+        for ch in chunk or "":
+            if self.done:
+                break
+            if self._element is not None:
+                self._element.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key is not None:
+                        self._last_key = "".join(self._key)
+                        self._key = None
+                    continue
+                if self._key is not None:
+                    self._key.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._stack == ["{"] and self._element is None:
+                    self._key = []
+            elif ch in "[{":
+                if not self._started:
+                    self._started = True
+                if ch == "{" and self._array_depth is not None and len(self._stack) == self._array_depth and self._element is None:
+                    self._element = ["{"]
+                self._stack.append(ch)
+                if ch == "[" and self._array_depth is None:
+                    if len(self._stack) == 1:
+                        self._array_depth = 1
+                    elif len(self._stack) == 2 and self._stack[0] == "{" and self._last_key in WRAPPER_KEYS:
+                        self._array_depth = 2
+            elif ch in "]}":
+                if not self._stack:
+                    continue
+                if ch == "]" and self._array_depth is not None and len(self._stack) == self._array_depth:
+                    self.done = True
+                self._stack.pop()
+                if ch == "}" and self._element is not None and self._array_depth is not None and len(self._stack) == self._array_depth:
+                    text = "".join(self._element)
+                    self._element = None
+                    try:
+                        value = json.loads(text)
+                    except json.JSONDecodeError:
+                        value = None
+                    if isinstance(value, dict):
+                        completed.append(value)
+                        self.emitted += 1
+                if self._started and not self._stack:
+                    self.done = True
+        return completed
@@ -0,0 +1,194 @@
+import os
+import json
+import uuid
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.db.models import Course, CourseArticle
+from src.db.plating import plate_courses, link_articles, PLATE_CHUNK_SIZE
+from src.utils.llm_cache import get_cache
+from src.utils.retry import call_with_retries
+from src.ai import providers as llm
+from src.ingest.chef import parse_json_response
+from src.ingest.json_stream import WRAPPER_KEYS
+from src.ingest.scheduler import run_batches
+
+# Courses per translation call (the response is just a title + summary each)
+TRANSLATE_BATCH_COURSES = int(os.getenv("TRANSLATE_BATCH_COURSES", "20"))
+TRANSLATE_MAX_TOKENS_PER_COURSE = 400
+
+# Columns a translation copies from its source course on every sync (everything but the text)
+MIRRORED_COLUMNS = ("entities_json", "topics_json", "source_urls", "published_at", "category", "synthesized_sources")
+SOURCE_COLUMNS = ("id", "course_key", "title", "summary", "language") + MIRRORED_COLUMNS
+
+# JSON mode (OpenAI json_object) answers with an object, e.g. {"translations": [...]}
+TRANSLATION_WRAPPER_KEYS = WRAPPER_KEYS + ("translations",)
+
+
+def source_hash(title: str, summary: str) -> str:
+    """What a translation was made from; a different hash means the source text changed."""
+    return hashlib.sha1(f"{title or ''}\n{summary or ''}".encode("utf-8")).hexdigest()[:16]
+
+
+def build_translation_prompt(courses: List[Dict[str, Any]], target_language: str) -> str:
+    payload = json.dumps([{'id': i, 'title': c.get('title'), 'summary': c.get('summary')} for i, c in enumerate(courses)],
+                         ensure_ascii=False)
+    return f"""
+    Translate these news stories into {target_language}.
+    Translate 'title' and 'summary' only. Keep names, numbers and facts exactly as they are; do not add or drop information.
+
+    STORIES (JSON):
+    {payload}
+
+    OUTPUT SCHEMA (JSON List, one object per story, same ids):
+    [{{"id": 0, "title": "...", "summary": "..."}}]
+    """
+
+
+def _parse_translations(data, count: int) -> List[Optional[Dict[str, str]]]:
+    """Map a parsed response (a list, or one wrapped in an object) to {'title', 'summary'} per id."""
+    if isinstance(data, dict):
+        data = next((data[key] for key in TRANSLATION_WRAPPER_KEYS if isinstance(data.get(key), list)), [data])
+    out = [None] * count
+    for entry in data if isinstance(data, list) else []:
+        if not isinstance(entry, dict) or not entry.get('title') or not entry.get('summary'):
+            continue
+        try:
+            i = int(entry.get('id'))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= i < count:
+            out[i] = {'title': entry['title'], 'summary': entry['summary']}
+    return out
+
+
+def translate_courses(courses: List[Dict[str, Any]], target_language: str, model: str = "gemini",
+                      rate_limiter=None, max_retries: int = 3) -> List[Optional[Dict[str, str]]]:
+    """
+    One LLM call translating the title/summary of each course. Returns
+    {'title', 'summary'} per course, in order (None where it failed).
+    Responses are cached by prompt, so the same text is never paid for twice.
+    """
+    prompt = build_translation_prompt(courses, target_language)
+    max_tokens = TRANSLATE_MAX_TOKENS_PER_COURSE * len(courses)
+
+    def once():
+        if rate_limiter:
+            with rate_limiter.slot():
+                return llm.complete(model, prompt, task="translate", json_mode=True, max_tokens=max_tokens, max_retries=0).text
+        return llm.complete(model, prompt, task="translate", json_mode=True, max_tokens=max_tokens, max_retries=0).text
+
+    try:
+        provider, api_model = llm.cache_identity(model, task="translate")
+        text = get_cache().cached_completion(
+            provider, api_model, prompt,
+            lambda: call_with_retries(once, max_retries=max_retries, label=f"Translation ({model})"),
+            validate=lambda t: any(_parse_translations(parse_json_response(t, verbose=False), len(courses))),
+        )
+        return _parse_translations(parse_json_response(text), len(courses))
+    except Exception as e:
+        print(f"Translation to {target_language} failed ({model}): {e}")
+        return [None] * len(courses)
+
+
+def localize_courses(db: Session, course_ids: List[Any], locales: List[Tuple[str, str]], source_language: str = "English",
+                     model: str = "gemini", rate_limiter=None, max_workers: int = 4,
+                     chunk_size: int = PLATE_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Keep one translated course row per (course, locale) for these courses.
+    locales is [(hl, language name)]; each translation is its own `courses`
+    row with language=hl and translation_of=the source course id, linked to
+    the same articles.
+
+    The translation memory is those rows: one whose translated_from still
+    matches the source's title + summary only has its sources, tags and
+    links synced. Only new or changed text is translated, in batches of
+    TRANSLATE_BATCH_COURSES per language. A locale whose language name is
+    source_language copies the text without a call.
+    The reads are committed before the translation calls (so no connection
+    is held while the model runs) and the writes go in one savepoint after
+    them, left for the caller to commit.
+    Returns {'translated', 'copied', 'reused', 'failed'}.
+    """
+    stats = {'translated': 0, 'copied': 0, 'reused': 0, 'failed': 0}
+    course_ids = list(dict.fromkeys(course_ids))
+    if not course_ids or not locales:
+        return stats
+    sources, prior, article_ids = [], {}, {}
+    # Column rows rather than ORM objects: they stay readable after the commit below
+    for start in range(0, len(course_ids), chunk_size):
+        chunk = course_ids[start:start + chunk_size]
+        sources.extend(db.execute(select(*[getattr(Course, col) for col in SOURCE_COLUMNS]).where(Course.id.in_(chunk))))
+        for row in db.execute(select(Course.id, Course.course_key, Course.language, Course.translation_of, Course.translated_from)
+                              .where(Course.translation_of.in_(chunk))):
+            prior[(row.translation_of, row.language)] = row
+        for course_id, article_id in db.execute(select(CourseArticle.course_id, CourseArticle.article_id)
+                                                .where(CourseArticle.course_id.in_(chunk))):
+            article_ids.setdefault(course_id, []).append(article_id)
+    db.commit()
+
+    pending = {}   # hl -> [(source course, digest)] needing a translation call
+    fresh = []     # (source course, hl, digest, {'title', 'summary'})
+    reused = []    # (source course, existing translation)
+    for course in sources:
+        digest = source_hash(course.title, course.summary)
+        for hl, language_name in locales:
+            if hl == course.language:
+                continue
+            existing = prior.get((course.id, hl))
+            if existing is not None and existing.translated_from == digest:
+                reused.append((course, existing))
+            elif language_name == source_language:
+                fresh.append((course, hl, digest, {'title': course.title, 'summary': course.summary}))
+                stats['copied'] += 1
+            else:
+                pending.setdefault(hl, []).append((course, digest))
+
+    names = dict(locales)
+    jobs = [{'hl': hl, 'courses': todo[start:start + TRANSLATE_BATCH_COURSES]}
+            for hl, todo in pending.items() for start in range(0, len(todo), TRANSLATE_BATCH_COURSES)]
+
+    def translate_one(i, batch, status_callback):
+        job = batch[0]
+        print(f"Translating {len(job['courses'])} courses into {names[job['hl']]}...")
+        texts = translate_courses([{'title': c.title, 'summary': c.summary} for c, _ in job['courses']],
+                                  names[job['hl']], model, rate_limiter)
+        return [(course, job['hl'], digest, text) for (course, digest), text in zip(job['courses'], texts)]
+
+    for course, hl, digest, text in run_batches([[job] for job in jobs], translate_one, max_workers):
+        if text is None:
+            stats['failed'] += 1
+            continue
+        fresh.append((course, hl, digest, text))
+        stats['translated'] += 1
+
+    # Reads and model calls are done; the writes go in one savepoint
+    with db.begin_nested():
+        rows, links = [], {}
+        for course, hl, digest, text in fresh:
+            existing = prior.get((course.id, hl))
+            row = {col: getattr(course, col) for col in MIRRORED_COLUMNS}
+            row.update({
+                'id': existing.id if existing is not None else uuid.uuid4(),
+                'course_key': existing.course_key if existing is not None else f"{course.course_key}@{hl}",
+                'title': text['title'], 'summary': text['summary'], 'language': hl,
+                # New text: the menu embeds it again when this language's menu is loaded
+                'embedding': None, 'embedding_model': None,
+                'translation_of': course.id, 'translated_from': digest,
+            })
+            rows.append(row)
+            links[row['course_key']] = article_ids.get(course.id) or []
+        if rows:
+            plate_courses(db, rows, links=links, chunk_size=chunk_size)
+
+        if reused:
+            db.execute(update(Course), [
+                dict({col: getattr(course, col) for col in MIRRORED_COLUMNS}, id=existing.id)
+                for course, existing in reused
+            ])
+            link_articles(db, {existing.id: article_ids.get(course.id) or [] for course, existing in reused}, chunk_size=chunk_size)
+            stats['reused'] = len(reused)
+    return stats
@@ -0,0 +1,177 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.db.models import Course
+from src.ai.embeddings import Embedder, get_embedder
+
+# Cosine similarity above which a new item counts as a story already on the
+# menu. Unset: the embedder's default_threshold (semantic and lexical
+# embedders need very different cut-offs).
+MENU_DEDUP_THRESHOLD = float(os.environ["MENU_DEDUP_THRESHOLD"]) if os.getenv("MENU_DEDUP_THRESHOLD") else None
+# How far back (by published_at) courses stay on the menu
+MENU_LOOKBACK_HOURS = float(os.getenv("MENU_LOOKBACK_HOURS", "72"))
+# A long-lived index (kitchen --serve) is reloaded from the database this often
+MENU_RELOAD_MINUTES = float(os.getenv("MENU_RELOAD_MINUTES", "60"))
+# Courses without a vector for the current embedder get one on load, up to this many
+MENU_BACKFILL_LIMIT = int(os.getenv("MENU_BACKFILL_LIMIT", "2000"))
+
+# Rows of the similarity matrix computed at once (bounds memory on big menus)
+QUERY_CHUNK = 256
+
+
+def course_text(course) -> str:
+    """What a course is embedded from (a Chef course dict or a row with title/summary)."""
+    get = course.get if isinstance(course, dict) else lambda k: getattr(course, k, None)
+    return f"{get('title') or ''}. {get('summary') or ''}"
+
+
+def item_text(item: Dict[str, Any]) -> str:
+    return f"{item.get('title') or ''}. {item.get('description') or ''}"
+
+
+def to_stored(vector: np.ndarray) -> List[float]:
+    return np.round(vector.astype(np.float64), 6).tolist()
+
+
+def _epoch(value) -> float:
+    """published_at as epoch seconds (naive datetimes are UTC, as stored); None means now."""
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class MenuIndex:
+    """
+    Nearest-neighbour index over recent courses' embeddings, used to drop
+    raw items that repeat a story already served before they reach the Chef.
+    Brute force: one float32 matrix product per chunk of queries, which is
+    fast enough for the tens of thousands of courses a lookback window
+    holds (see benchmarks/bench_menu_dedup.py).
+    """
+
+    def __init__(self, embedder: Embedder = None, threshold: float = None):
+        self.embedder = embedder or get_embedder()
+        self.threshold = threshold if threshold is not None else (
+            MENU_DEDUP_THRESHOLD if MENU_DEDUP_THRESHOLD is not None else self.embedder.default_threshold)
+        self.ids: List[Any] = []
+        self.titles: List[str] = []
+        self.published: List[float] = []
+        self.loaded_at = None
+        self._blocks: List[np.ndarray] = []
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._blocks:
+            blocks = ([self._matrix] if self._matrix is not None else []) + self._blocks
+            self._matrix = np.vstack(blocks).astype(np.float32)
+            self._blocks = []
+        return self._matrix
+
+    def add(self, ids: List[Any], titles: List[str], vectors: np.ndarray, published: List[datetime] = None):
+        if len(ids) == 0:
+            return
+        self.ids.extend(ids)
+        self.titles.extend(titles)
+        self.published.extend(_epoch(p) for p in (published or [None] * len(ids)))
+        self._blocks.append(np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1))
+
+    def prune(self, lookback_hours: float = MENU_LOOKBACK_HOURS, now: datetime = None) -> int:
+        """
+        Drop courses that have aged out of the lookback window, so a long-lived
+        index (kitchen --serve) keeps matching what load() would return without
+        going back to the database. Returns how many were dropped.
+        """
+        cutoff = _epoch(now) - lookback_hours * 3600
+        keep = [i for i, ts in enumerate(self.published) if ts >= cutoff]
+        dropped = len(self.ids) - len(keep)
+        if dropped:
+            matrix = self.matrix
+            self.ids = [self.ids[i] for i in keep]
+            self.titles = [self.titles[i] for i in keep]
+            self.published = [self.published[i] for i in keep]
+            self._matrix = matrix[keep] if keep else None
+        return dropped
+
+    def load(self, db: Session, lookback_hours: float = MENU_LOOKBACK_HOURS, language: str = None, now: datetime = None) -> int:
+        """
+        Load courses published in the lookback window (only this language's,
+        when given: items are merged into matched courses, so a match must be
+        served to the same audience). Courses with no vector
+        from this embedder (older rows, or another EMBEDDING_MODEL) are
+        embedded now and written back, so the backfill is paid once.
+        Returns how many courses are on the menu. Does not commit.
+        """
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=lookback_hours)
+        stmt = select(Course.id, Course.title, Course.summary, Course.embedding, Course.embedding_model,
+                      Course.published_at).where(Course.published_at >= cutoff)
+        if language:
+            stmt = stmt.where(Course.language == language)
+        rows = db.execute(stmt.order_by(Course.published_at.desc())).all()
+        name = self.embedder.name
+        ready = [r for r in rows if r.embedding_model == name and r.embedding]
+        missing = [r for r in rows if not (r.embedding_model == name and r.embedding)][:MENU_BACKFILL_LIMIT]
+        if ready:
+            self.add([r.id for r in ready], [r.title for r in ready], np.asarray([r.embedding for r in ready], dtype=np.float32),
+                     [r.published_at for r in ready])
+        if missing:
+            vectors = self.embedder.embed([course_text(r) for r in missing])
+            db.execute(update(Course), [
+                {'id': r.id, 'embedding': to_stored(v), 'embedding_model': name}
+                for r, v in zip(missing, vectors)
+            ])
+            self.add([r.id for r in missing], [r.title for r in missing], vectors, [r.published_at for r in missing])
+            print(f"Menu: embedded {len(missing)} courses that had no {name} vector.")
+        self.loaded_at = time.time()
+        return len(self)
+
+    def nearest(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(index of the most similar course, its cosine similarity) per query row; -1 / 0.0 on an empty menu."""
+        n = len(vectors)
+        if not self.ids or n == 0:
+            return np.full(n, -1), np.zeros(n, dtype=np.float32)
+        matrix = self.matrix
+        best = np.empty(n, dtype=np.int64)
+        sims = np.empty(n, dtype=np.float32)
+        for start in range(0, n, QUERY_CHUNK):
+            scores = vectors[start:start + QUERY_CHUNK] @ matrix.T
+            best[start:start + QUERY_CHUNK] = scores.argmax(axis=1)
+            sims[start:start + QUERY_CHUNK] = scores.max(axis=1)
+        return best, sims
+
+    def filter_new(self, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Split items into (new, on_menu). Each on_menu item gets 'menu_match':
+        {'course_id', 'title', 'similarity'} of the course it repeats.
+        """
+        if not items or not self.ids:
+            return list(items), []
+        best, sims = self.nearest(self.embedder.embed([item_text(item) for item in items]))
+        fresh, matched = [], []
+        for item, idx, sim in zip(items, best, sims):
+            if idx >= 0 and sim >= self.threshold:
+                matched.append(dict(item, menu_match={
+                    'course_id': self.ids[idx], 'title': self.titles[idx], 'similarity': float(sim)}))
+            else:
+                fresh.append(item)
+        return fresh, matched
+
+    def embed_courses(self, courses: List[Dict[str, Any]]):
+        """Set 'embedding' / 'embedding_model' on freshly cooked courses (plated with the row)."""
+        if not courses:
+            return
+        vectors = self.embedder.embed([course_text(c) for c in courses])
+        for course, vector in zip(courses, vectors):
+            course['embedding'] = to_stored(vector)
+            course['embedding_model'] = self.embedder.name
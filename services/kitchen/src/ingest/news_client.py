@@ -4,21 +4,27 @@ import time
 import requests
 from datetime import datetime
 
+from src.ingest.http_session import get_session, conditional_get
+from src.ingest.raw_archive import get_archive
+
 # Load environment variables if not already loaded (e.g. by python-dotenv)
 # For local run, we might want to load .env explicitly if not running via a runner that does it.
 from dotenv import load_dotenv
 load_dotenv()
 
 NEWSDATA_API_KEY = os.getenv("NEWSDATA_API_KEY")
-RAW_DUMP_DIR = os.getenv("RAW_DUMP_DIR", "data/raw")
 
 BASE_URL = "https://newsdata.io/api/1/news"
 
 class NewsClient:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, session=None, validators=None):
         self.api_key = api_key or NEWSDATA_API_KEY
         if not self.api_key:
             raise ValueError("NEWSDATA_API_KEY not found in environment or passed to constructor.")
+        # Pooled keep-alive session; FeedValidatorStore enables conditional GETs
+        self.session = session or get_session()
+        self.validators = validators
+        self.unchanged_feeds = 0
 
     def fetch_latest_news(self, query=None, category=None, language="en", page=None, max_pages=3):
         """
@@ -57,12 +63,16 @@ class NewsClient:
                 params["page"] = current_page
                 
             try:
-                response = requests.get(BASE_URL, params=params)
+                response = conditional_get(BASE_URL, params=params, validators=self.validators, session=self.session, timeout=30)
+                if response.status_code == 304:
+                    print("Feed unchanged (304), stopping pagination.")
+                    self.unchanged_feeds += 1
+                    break
                 response.raise_for_status()
                 data = response.json()
                 
                 # Save raw dump
-                self._save_raw_dump(data, run_id, pages_fetched)
+                self._save_raw_dump(data, run_id, pages_fetched, query=query, category=category, language=language)
                 
                 results = data.get("results", [])
                 all_results.extend(results)
@@ -82,18 +92,10 @@ class NewsClient:
                 
         return all_results
 
-    def _save_raw_dump(self, data, run_id, page_num):
-        """Saves the raw JSON response to a file."""
-        date_str = datetime.now().strftime("%Y%m%d")
-        dir_path = os.path.join(RAW_DUMP_DIR, date_str)
-        os.makedirs(dir_path, exist_ok=True)
-        
-        filename = f"{run_id}_page{page_num}.json"
-        filepath = os.path.join(dir_path, filename)
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved raw dump to {filepath}")
+    def _save_raw_dump(self, data, run_id, page_num, query=None, category=None, language=None):
+        """Queues the page's results for the compressed raw archive (written in the background)."""
+        get_archive().append("newsdata", data.get("results", []), category=category, query=query, hl=language,
+                             page=page_num, client_run_id=run_id, next_page=data.get("nextPage"))
 
 if __name__ == "__main__":
     # Test run
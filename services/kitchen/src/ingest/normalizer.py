@@ -1,19 +1,23 @@
 import os
 import json
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv
 
-load_dotenv()
+from src.utils.llm_cache import get_cache
+from src.ai import providers as llm
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found.")
+# Strict user requirement: gemini-3-flash-preview (the 'gemini' entry's apiModel)
+NORMALIZER_MODEL = os.getenv("NORMALIZER_MODEL", "gemini")
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+def _is_json(text):
+    try:
+        json.loads(text)
+        return True
+    except (json.JSONDecodeError, TypeError):
+        return False
 
-# Strict user requirement: gemini-3-flash-preview
-MODEL_ID = "gemini-3-flash-preview"
+def _cached_json_completion(prompt):
+    """JSON-mode call, served from the LLM cache when the prompt was seen before."""
+    provider, api_model = llm.cache_identity(NORMALIZER_MODEL)
+    return get_cache().cached_completion(provider, api_model, prompt, lambda: llm.complete(NORMALIZER_MODEL, prompt, json_mode=True).text, validate=_is_json)
 
 def normalize_group_to_course(articles):
     """
@@ -48,15 +52,7 @@ def normalize_group_to_course(articles):
     """
     
     try:
-        response = client.models.generate_content(
-            model=MODEL_ID,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json"
-            )
-        )
-        
-        return json.loads(response.text)
+        return json.loads(_cached_json_completion(prompt))
         
     except Exception as e:
         print(f"Error normalizing course: {e}")
@@ -99,14 +95,7 @@ def normalize_article_groups(groups_of_articles):
     """
 
     try:
-        response = client.models.generate_content(
-            model=MODEL_ID,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json"
-            )
-        )
-        data = json.loads(response.text)
+        data = json.loads(_cached_json_completion(prompt))
         if isinstance(data, list):
             return data
         else:
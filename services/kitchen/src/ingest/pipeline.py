@@ -0,0 +1,167 @@
+import os
+import time
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+# Items buffered between two stages; a full queue blocks the stage feeding it
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline: `workers` threads each take an item from the
+    inbox and call fn(item, emit); emit(out) hands a result to the next stage
+    (blocking while its queue is full). Once the input is exhausted and every
+    worker has finished, flush(emit) runs once -- for stages that buffer,
+    like a batcher holding a partly filled batch.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any, Callable[[Any], None]], None], workers: int = 1,
+                 flush: Optional[Callable[[Callable[[Any], None]], None]] = None, queue_size: int = PIPELINE_QUEUE_SIZE):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, int(workers))
+        self.flush = flush
+        self.inbox = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0       # worker-seconds spent in fn/flush (including time blocked in emit)
+        self.blocked = 0.0    # worker-seconds waiting on a full downstream queue
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._live = self.workers
+
+    def utilization(self, wall: float) -> float:
+        """Share of the stage's worker capacity spent working (not waiting for input or on backpressure)."""
+        if wall <= 0:
+            return 0.0
+        return max(0.0, self.busy - self.blocked) / (self.workers * wall)
+
+
+class Pipeline:
+    """
+    Stages connected by bounded queues, each with its own worker threads, so
+    a slow stage only holds back the stages feeding it (backpressure) while
+    everything downstream keeps working on what it already has.
+    run(source) returns whatever the last stage emits, in completion order.
+    A failing item is reported and skipped; it never stops the pipeline.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.started = None
+        self.finished = None
+
+    @property
+    def wall(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _emitter(self, idx: int, results: list, results_lock):
+        stage = self.stages[idx]
+        downstream = self.stages[idx + 1] if idx + 1 < len(self.stages) else None
+
+        def emit(item):
+            with stage._lock:
+                stage.items_out += 1
+            if downstream is None:
+                with results_lock:
+                    results.append(item)
+                return
+            t0 = time.perf_counter()
+            downstream.inbox.put(item)
+            waited = time.perf_counter() - t0
+            with stage._lock:
+                stage.blocked += waited
+        return emit
+
+    def _worker(self, idx: int, emit):
+        stage = self.stages[idx]
+        while True:
+            item = stage.inbox.get()
+            if item is _DONE:
+                # Let sibling workers see the end of input too
+                stage.inbox.put(_DONE)
+                break
+            t0 = time.perf_counter()
+            with stage._lock:
+                stage.items_in += 1
+                if stage.started is None:
+                    stage.started = t0
+            try:
+                stage.fn(item, emit)
+            except Exception as e:
+                with stage._lock:
+                    stage.errors += 1
+                print(f"Pipeline stage {stage.name} failed on an item: {e}")
+            with stage._lock:
+                stage.busy += time.perf_counter() - t0
+
+        with stage._lock:
+            stage._live -= 1
+            last = stage._live == 0
+        if not last:
+            return
+        if stage.flush:
+            t0 = time.perf_counter()
+            try:
+                stage.flush(emit)
+            except Exception as e:
+                stage.errors += 1
+                print(f"Pipeline stage {stage.name} failed to flush: {e}")
+            stage.busy += time.perf_counter() - t0
+        stage.finished = time.perf_counter()
+        if idx + 1 < len(self.stages):
+            self.stages[idx + 1].inbox.put(_DONE)
+
+    def run(self, source: Iterable[Any]) -> List[Any]:
+        results, results_lock = [], threading.Lock()
+        self.started = time.perf_counter()
+        threads = []
+        for idx, stage in enumerate(self.stages):
+            emit = self._emitter(idx, results, results_lock)
+            for n in range(stage.workers):
+                t = threading.Thread(target=self._worker, args=(idx, emit), name=f"{stage.name}-{n}", daemon=True)
+                t.start()
+                threads.append(t)
+        first = self.stages[0]
+        try:
+            for item in source:
+                first.inbox.put(item)
+        finally:
+            first.inbox.put(_DONE)
+            for t in threads:
+                t.join()
+            self.finished = time.perf_counter()
+        return results
+
+    def stats(self) -> List[dict]:
+        """Per-stage counters and timings (seconds, relative to the start of run())."""
+        wall = self.wall
+        rows = []
+        for stage in self.stages:
+            rows.append({
+                'name': stage.name, 'workers': stage.workers,
+                'items_in': stage.items_in, 'items_out': stage.items_out, 'errors': stage.errors,
+                'first_item': (stage.started - self.started) if stage.started else 0.0,
+                'active': (stage.finished - stage.started) if stage.started and stage.finished else 0.0,
+                'busy': stage.busy, 'blocked': stage.blocked, 'utilization': stage.utilization(wall),
+            })
+        return rows
+
+    def summary(self) -> str:
+        lines = [f"Pipeline: {self.wall:.2f}s end to end"]
+        for row in self.stats():
+            errors = f", {row['errors']} errors" if row['errors'] else ""
+            lines.append(f"  {row['name']}: {row['workers']} workers, {row['items_in']} in / {row['items_out']} out"
+                         f"{errors}, first item at {row['first_item']:.2f}s, active {row['active']:.2f}s, "
+                         f"utilization {row['utilization'] * 100:.0f}%, blocked {row['blocked']:.2f}s")
+        return "\n".join(lines)
@@ -0,0 +1,260 @@
+import os
+import re
+import json
+import glob
+import gzip
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional
+
+RAW_ARCHIVE_DIR = os.getenv("RAW_ARCHIVE_DIR", "data/archive")
+RAW_ARCHIVE_ENABLED = os.getenv("RAW_ARCHIVE", "true").lower() in ("1", "true", "yes")
+# A segment is closed and the next one started once it grows past this
+RAW_ARCHIVE_SEGMENT_MB = float(os.getenv("RAW_ARCHIVE_SEGMENT_MB", "64"))
+
+# Fetch parameters copied into the index, so records can be picked without decompressing them
+INDEX_FIELDS = ("run_id", "ts", "source", "category", "query", "hl", "gl", "ceid", "page")
+
+_STOP = object()
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+class RawArchive:
+    """
+    Append-only, compressed store of everything the news clients fetched.
+
+    A record is one fetch: its parameters plus the items it returned. Each
+    record is one JSON line gzip-compressed as its own member and appended
+    to a segment, <root>/YYYYMMDD/<segment>.jsonl.gz (concatenated members
+    are still a valid gzip file, so zcat works). The segment's .idx file
+    gets one JSON line per record with its offset, length and INDEX_FIELDS,
+    written after the data, so a crash never indexes a partial record.
+
+    append() only queues the record; a background thread compresses and
+    writes it, so fetch workers never wait on the disk. close() -- also run
+    at interpreter exit -- writes everything still queued.
+    """
+
+    def __init__(self, root: str = RAW_ARCHIVE_DIR, enabled: bool = True,
+                 segment_bytes: int = int(RAW_ARCHIVE_SEGMENT_MB * 1024 * 1024)):
+        self.root = root
+        self.enabled = enabled
+        self.segment_bytes = segment_bytes
+        # Stamped on every record; the kitchen starts a new run per cycle (see --replay)
+        self.run_id = new_run_id()
+        self.stats = {"records": 0, "items": 0, "raw_bytes": 0, "bytes": 0}
+        self._name = f"{self.run_id}_{os.getpid()}"
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self._date = None
+        self._seq = 0
+        self._data = None
+        self._index = None
+        atexit.register(self.close)
+
+    def append(self, source: str, items: List[Dict[str, Any]], **params):
+        """Queue one fetch (e.g. category=, query=, hl=, gl=, ceid=, page=) for archiving."""
+        if not self.enabled:
+            return
+        record = {'run_id': self.run_id, 'ts': time.time(), 'source': source}
+        record.update(params)
+        record['items'] = items
+        with self._lock:
+            if self._closed:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="raw-archive", daemon=True)
+                self._thread.start()
+        self._queue.put(record)
+
+    def flush(self):
+        """Block until every record appended so far is on disk."""
+        self._queue.join()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        self._close_segment()
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Raw archive disabled."
+        s = self.stats
+        ratio = s['raw_bytes'] / s['bytes'] if s['bytes'] else 0.0
+        return (f"Raw archive: {s['records']} fetches ({s['items']} items) as run {self.run_id}, "
+                f"{s['bytes'] / 1024:.0f} KB written ({ratio:.1f}x compression) under {self.root}.")
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not _STOP]
+            try:
+                if records:
+                    self._write(records)
+            except Exception as e:
+                print(f"Raw archive write failed: {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def _write(self, records: List[Dict[str, Any]]):
+        entries = []
+        for record in records:
+            date = datetime.fromtimestamp(record['ts']).strftime("%Y%m%d")
+            if date != self._date or (self._data is not None and self._data.tell() >= self.segment_bytes):
+                self._flush_entries(entries)
+                entries = []
+                self._open_segment(date)
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            member = gzip.compress(line, compresslevel=6, mtime=0)
+            offset = self._data.tell()
+            self._data.write(member)
+            entry = {k: record.get(k) for k in INDEX_FIELDS}
+            entry.update(offset=offset, length=len(member), items=len(record.get('items') or []))
+            entries.append(entry)
+            self.stats['records'] += 1
+            self.stats['items'] += entry['items']
+            self.stats['raw_bytes'] += len(line)
+            self.stats['bytes'] += len(member)
+        self._flush_entries(entries)
+
+    def _flush_entries(self, entries):
+        if not entries:
+            return
+        # Data first: an index line only ever points at a complete record
+        self._data.flush()
+        self._index.write("".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in entries))
+        self._index.flush()
+
+    def _open_segment(self, date: str):
+        self._close_segment()
+        if date != self._date:
+            self._date, self._seq = date, 0
+        self._seq += 1
+        day_dir = os.path.join(self.root, date)
+        os.makedirs(day_dir, exist_ok=True)
+        path = os.path.join(day_dir, f"{self._name}_{self._seq:03d}.jsonl.gz")
+        self._data = open(path, "ab")
+        self._index = open(f"{path}.idx", "a", encoding="utf-8")
+
+    def _close_segment(self):
+        for f in (self._data, self._index):
+            if f is not None:
+                f.close()
+        self._data = self._index = None
+
+
+def parse_replay_target(target: str) -> Dict[str, Optional[str]]:
+    """'20251228' or '2025-12-28' (a day) or '20251228_153326' (one run) -> {'date', 'run_id'}."""
+    target = (target or "").strip()
+    if re.fullmatch(r"\d{8}_\d{6}", target):
+        return {'date': target[:8], 'run_id': target}
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", target):
+        return {'date': target.replace("-", ""), 'run_id': None}
+    if re.fullmatch(r"\d{8}", target):
+        return {'date': target, 'run_id': None}
+    raise ValueError(f"Replay target must be YYYYMMDD, YYYY-MM-DD or a run id (YYYYMMDD_HHMMSS), got '{target}'")
+
+
+def read_index(root: str = RAW_ARCHIVE_DIR, date: str = None, run_id: str = None) -> List[Dict[str, Any]]:
+    """Index entries (plus 'segment', the data file) for one day, optionally one run, in fetch order."""
+    entries = []
+    for index_path in glob.glob(os.path.join(root, date or "*", "*.jsonl.gz.idx")):
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a crashed writer
+                if run_id and entry.get('run_id') != run_id:
+                    continue
+                entry['segment'] = index_path[:-len(".idx")]
+                entries.append(entry)
+    entries.sort(key=lambda e: e.get('ts') or 0)
+    return entries
+
+
+def iter_records(root: str = RAW_ARCHIVE_DIR, date: str = None, run_id: str = None) -> Iterator[Dict[str, Any]]:
+    """Archived fetches in order; only the members the index points at are read and decompressed."""
+    handles = {}
+    try:
+        for entry in read_index(root, date, run_id):
+            f = handles.get(entry['segment'])
+            if f is None:
+                f = handles[entry['segment']] = open(entry['segment'], "rb")
+            f.seek(entry['offset'])
+            yield json.loads(gzip.decompress(f.read(entry['length'])))
+    finally:
+        for f in handles.values():
+            f.close()
+
+
+class ReplayClient:
+    """
+    Stands in for GoogleNewsClient with run_kitchen.py --replay: fetch_latest_news()
+    returns the archived items of that feed (category or query, plus hl) from
+    every archived fetch of it, and never touches the network.
+    """
+
+    def __init__(self, target: str, root: str = RAW_ARCHIVE_DIR):
+        self.target = target
+        self.records = list(iter_records(root, **parse_replay_target(target)))
+        self.unchanged_feeds = 0
+        self._items = {}
+        self._feeds = {}
+        for record in self.records:
+            key = (record.get('category') or record.get('query'), record.get('hl'))
+            self._items.setdefault(key, []).extend(record.get('items') or [])
+            self._feeds.setdefault(key, {'hl': record.get('hl'), 'gl': record.get('gl'), 'ceid': record.get('ceid')})
+
+    def feeds(self) -> List[tuple]:
+        """(category or query, locale) of every archived feed, in first-fetch order."""
+        return [(label, locale) for (label, _), locale in self._feeds.items()]
+
+    def fetch_latest_news(self, query=None, category=None, hl="en-US", **kwargs):
+        return list(self._items.get((category or query, hl), []))
+
+    def feed_key(self, query=None, category=None, **kwargs):
+        return None  # Replays send no conditional GETs, so there are no validators to skip
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def configure_archive(enabled: bool = RAW_ARCHIVE_ENABLED, root: str = RAW_ARCHIVE_DIR) -> RawArchive:
+    """Replace the process-wide archive (closing the old one)."""
+    global _archive
+    with _archive_lock:
+        if _archive is not None:
+            _archive.close()
+        _archive = RawArchive(root=root, enabled=enabled)
+        return _archive
+
+
+def get_archive() -> RawArchive:
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = RawArchive(enabled=RAW_ARCHIVE_ENABLED)
+        return _archive
@@ -0,0 +1,100 @@
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Callable, Optional
+
+from src.utils.rate_limiter import TokenBucket
+from src.utils.model_config import get_model_entry
+
+# Used when a model entry has no explicit limits
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_REQUESTS_PER_MINUTE = 30
+
+
+class ProviderLimiter:
+    """
+    Concurrency cap plus requests-per-minute token bucket for one provider.
+    Every LLM attempt (retries included) should run inside slot().
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.requests_per_minute = float(requests_per_minute)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        # Allow a burst of one request per concurrent slot, then hold the steady rate
+        self._bucket = TokenBucket(rate=self.requests_per_minute / 60.0, capacity=self.max_concurrency)
+
+    @contextmanager
+    def slot(self):
+        with self._semaphore:
+            self._bucket.acquire()
+            yield
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_limiter(model_id: str) -> ProviderLimiter:
+    """
+    One shared limiter per provider, sized from model_config.json
+    (maxConcurrency / requestsPerMinute on the model entry).
+    """
+    entry = get_model_entry(model_id)
+    provider = entry.get('provider', model_id)
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(
+                max_concurrency=entry.get('maxConcurrency', DEFAULT_MAX_CONCURRENCY),
+                requests_per_minute=entry.get('requestsPerMinute', DEFAULT_REQUESTS_PER_MINUTE),
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def run_batches(batches: List[List[Dict[str, Any]]],
+                cook_fn: Callable[[int, List[Dict[str, Any]], Callable[[str], None]], List[Dict[str, Any]]],
+                max_concurrency: int,
+                on_status: Optional[Callable[[str, int], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Cook batches concurrently and return all courses in batch order.
+
+    cook_fn(index, batch, status_callback) does the work for one batch.
+    on_status(message, completed_count) may touch the DB session, so calls to it
+    are serialized with a lock no matter which worker thread triggers them.
+    """
+    total = len(batches)
+    if not total:
+        return []
+
+    status_lock = threading.Lock()
+    completed = [0]
+
+    def report(msg):
+        if on_status:
+            with status_lock:
+                on_status(msg, completed[0])
+
+    def run_one(i, batch):
+        report(f"Chef preparing Batch {i + 1}/{total} ({len(batch)} items)...")
+        return cook_fn(i, batch, lambda msg: report(f"Batch {i + 1}/{total}: {msg}"))
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, total)), thread_name_prefix="cook") as pool:
+        futures = {pool.submit(run_one, i, batch): i for i, batch in enumerate(batches)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result() or []
+            except Exception as e:
+                print(f"Batch {i + 1}/{total} failed: {e}")
+                results[i] = []
+            with status_lock:
+                completed[0] += 1
+            report(f"Finished Batch {i + 1}/{total} ({completed[0]}/{total} done)")
+
+    merged = []
+    for i in range(total):
+        merged.extend(results[i])
+    return merged
@@ -0,0 +1,103 @@
+import os
+import json
+import time
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import List, Dict, Any, Iterable, Set, Tuple
+
+SEEN_LINKS_PATH = os.getenv("SEEN_LINKS_PATH", "data/seen_links.json")
+SEEN_LINKS_TTL_DAYS = float(os.getenv("SEEN_LINKS_TTL_DAYS", "7"))
+
+# Query params that vary per fetch but not per article
+TRACKING_PARAMS = ("oc",)
+
+
+def normalize_link(url: str) -> str:
+    """Drop fragments and tracking params so the same article hashes the same."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+def link_key(url: str) -> str:
+    # 16 hex chars is plenty for a few hundred thousand links and keeps the file small
+    return hashlib.sha1(normalize_link(url).encode("utf-8")).hexdigest()[:16]
+
+
+class SeenLinkIndex:
+    """
+    Persistent set of article links that have already been sent to the Chef.
+
+    Stored as {link_hash: first_seen_epoch}; entries older than the TTL are
+    pruned on save. Like the feed validators, links are only persisted after a
+    successful run so a crashed run gets its items re-cooked.
+    """
+
+    def __init__(self, path: str = SEEN_LINKS_PATH, ttl_days: float = SEEN_LINKS_TTL_DAYS):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self._seen = {}
+        self._pending = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._seen = json.load(f)
+            except Exception as e:
+                print(f"Could not read seen-link index ({path}): {e}")
+                self._seen = {}
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __contains__(self, url: str) -> bool:
+        return link_key(url) in self._seen
+
+    def filter_new(self, items: List[Dict[str, Any]], batch_keys: Set[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Returns (new_items, dropped_count). Drops items seen in earlier runs and
+        repeats within this batch (the same story often appears in several categories).
+        Items without a link are kept; we can't prove we've seen them.
+        Pass the same batch_keys set to calls for consecutive chunks of one run
+        to drop repeats across chunks too.
+        """
+        fresh = []
+        batch_keys = set() if batch_keys is None else batch_keys
+        dropped = 0
+        for item in items:
+            link = item.get('link') or item.get('url')
+            if not link:
+                fresh.append(item)
+                continue
+            key = link_key(link)
+            if key in self._seen or key in batch_keys:
+                dropped += 1
+                continue
+            batch_keys.add(key)
+            fresh.append(item)
+        return fresh, dropped
+
+    def mark(self, links: Iterable[str]):
+        now = int(time.time())
+        for link in links:
+            if link:
+                self._pending.setdefault(link_key(link), now)
+
+    def save(self):
+        if not self.path:
+            return
+        cutoff = time.time() - self.ttl_seconds
+        merged = {k: ts for k, ts in self._seen.items() if ts >= cutoff}
+        for k, ts in self._pending.items():
+            merged.setdefault(k, ts)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        self._seen = merged
+        self._pending = {}
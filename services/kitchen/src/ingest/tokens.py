@@ -0,0 +1,49 @@
+from typing import Callable, Dict
+
+# Rough chars-per-token for Latin text across the major tokenizers.
+CHARS_PER_TOKEN = 4.0
+
+
+def heuristic_token_count(text: str) -> int:
+    """
+    Provider-agnostic estimate: ~4 chars per token for ASCII, ~1 token per
+    non-ASCII char (CJK, Hangul and friends tokenize far more densely).
+    Errs on the high side so batches don't overflow.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return int(ascii_chars / CHARS_PER_TOKEN + non_ascii) + 1
+
+
+def _tiktoken_counter():
+    """Exact counts for OpenAI models when tiktoken is installed (optional dependency)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+    return lambda text: len(encoding.encode(text or "", disallowed_special=()))
+
+
+# provider name (model_config.json 'provider') -> token counter
+TOKEN_ESTIMATORS: Dict[str, Callable[[str], int]] = {}
+
+
+def register_token_estimator(provider: str, estimator: Callable[[str], int]):
+    """Plug in a better counter for a provider (e.g. a vendor tokenizer)."""
+    TOKEN_ESTIMATORS[provider] = estimator
+
+
+def get_token_estimator(provider: str) -> Callable[[str], int]:
+    estimator = TOKEN_ESTIMATORS.get(provider)
+    if estimator is None:
+        if provider == "openai":
+            estimator = _tiktoken_counter()
+        estimator = estimator or heuristic_token_count
+        TOKEN_ESTIMATORS[provider] = estimator
+    return estimator
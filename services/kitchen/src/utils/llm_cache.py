@@ -0,0 +1,143 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Optional
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite")
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "24"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "256"))
+
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache of LLM responses.
+
+    Keyed by sha256(provider, model id, rendered prompt), so any change to the
+    prompt (items, menu, language, instructions) is a different entry. Entries
+    expire after ttl_seconds; when the cache grows past max_bytes the least
+    recently used entries are evicted. Backed by a single SQLite file so it is
+    safe to share between the kitchen's worker threads.
+
+    refresh=True skips reads but still writes, to re-warm a stale cache.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_HOURS * 3600,
+                 max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024), enabled: bool = True, refresh: bool = False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+        if enabled:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def key(provider: str, model_id: str, prompt: str) -> str:
+        h = hashlib.sha256()
+        for part in (provider, model_id, prompt):
+            h.update((part or "").encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        if self.refresh:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        if not self.enabled or value is None:
+            return
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self.stats["writes"] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used until under max_bytes. Caller holds the lock."""
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def cached_completion(self, provider: str, model_id: str, prompt: str, call: Callable[[], str],
+                          validate: Callable[[str], bool] = None) -> str:
+        """
+        Return the cached response for this prompt, or run call() and store its
+        result. Only responses that pass validate() are stored, so a malformed
+        completion is retried on the next run instead of replayed.
+        """
+        if not self.enabled:
+            return call()
+        key = self.key(provider, model_id, prompt)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        text = call()
+        if text and (validate is None or validate(text)):
+            self.put(key, text)
+        return text
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "LLM cache disabled."
+        s = self.stats
+        return f"LLM cache: {s['hits']} hits, {s['misses']} misses, {s['writes']} writes, {s['evictions']} evictions."
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configure_cache(enabled: bool = True, refresh: bool = False, path: str = LLM_CACHE_PATH) -> LLMCache:
+    """Replace the process-wide cache (run_kitchen calls this from --no-cache / --refresh-cache)."""
+    global _cache
+    with _cache_lock:
+        _cache = LLMCache(path=path, enabled=enabled, refresh=refresh)
+        return _cache
+
+
+def get_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
@@ -0,0 +1,46 @@
+import os
+import json
+
+KITCHEN_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPO_ROOT = os.path.dirname(os.path.dirname(KITCHEN_DIR))
+
+# The web app owns the canonical copy; the repo-root copy is the fallback for
+# checkouts without apps/web. MODEL_CONFIG_PATH overrides both.
+MODEL_CONFIG_CANDIDATES = [
+    os.path.join(REPO_ROOT, 'apps', 'web', 'lib', 'model_config.json'),
+    os.path.join(REPO_ROOT, 'model_config.json'),
+]
+
+_cached = None
+
+def load_model_config(path: str = None) -> dict:
+    """Load model_config.json (cached after the first read)."""
+    global _cached
+    if path is None and _cached is not None:
+        return _cached
+
+    candidates = [path] if path else [os.getenv("MODEL_CONFIG_PATH")] + MODEL_CONFIG_CANDIDATES
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            with open(candidate, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            if path is None:
+                _cached = config
+            return config
+    raise FileNotFoundError(f"model_config.json not found (tried: {[c for c in candidates if c]})")
+
+# Entries registered at runtime (fake models for benchmarks); they shadow the file
+_extra_entries = {}
+
+def register_model_entry(entry: dict):
+    _extra_entries[entry['id']] = entry
+
+def get_model_entry(model_id: str, config: dict = None) -> dict:
+    """The config entry for a model id, or {} if unknown."""
+    if config is None and model_id in _extra_entries:
+        return _extra_entries[model_id]
+    config = config or load_model_config()
+    for m in config.get('models', []):
+        if m.get('id') == model_id:
+            return m
+    return {}
@@ -0,0 +1,58 @@
+import random
+import time
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504, 529}
+
+
+class Cancelled(Exception):
+    """Raised instead of another attempt once the caller no longer wants the result (e.g. a lost hedge)."""
+
+
+def error_status(exc):
+    """Best-effort HTTP status from an SDK exception (OpenAI/Anthropic: status_code, google-genai: code)."""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_retryable(exc) -> bool:
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # No status: network-level failures are worth another try, bad input is not
+    name = type(exc).__name__.lower()
+    return any(word in name for word in ("timeout", "connection", "ratelimit", "unavailable"))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_retries(fn, max_retries: int = 3, base_delay: float = 1.0, label: str = "call", cancel=None):
+    """
+    Run fn(), retrying retryable failures (429/5xx/timeouts) with jittered
+    exponential backoff. Non-retryable errors and the final failure propagate.
+    Once the optional cancel event is set, no further attempt starts and
+    a pending backoff ends early; both raise Cancelled.
+    """
+    attempt = 0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise Cancelled(f"{label} cancelled")
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay)
+            print(f"{label} failed ({type(e).__name__}: {e}); retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+            if cancel is None:
+                time.sleep(delay)
+            elif cancel.wait(delay):
+                raise Cancelled(f"{label} cancelled")
+            attempt += 1
@@ -1,21 +1,112 @@
-import time
+import os
+import uuid
+import atexit
+import threading
+from sqlalchemy import delete, update, func
 from sqlalchemy.orm import Session
+from src.db.engine import engine
 from src.db.models import KitchenStatus
+from src.db.plating import dialect_insert
+
+# The one kitchen_status row; readers can rely on this id. (Not the all-zero
+# UUID: SQLite's numeric affinity would store its hex form as the integer 0.)
+STATUS_ROW_ID = uuid.uuid5(uuid.NAMESPACE_URL, "feedbuffet:kitchen_status")
+
+# Minimum seconds between status writes from the background flusher
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", "1.0"))
+
+def write_status(conn, status: str, progress: int, is_active: bool = True):
+    """Single-statement upsert of the singleton status row (conn: Session or Connection)."""
+    values = {'id': STATUS_ROW_ID, 'status_text': status, 'progress_percent': progress, 'is_active': is_active}
+    stmt = dialect_insert(conn, KitchenStatus)
+    if stmt is None:
+        # No upsert on this backend: update, and insert only if nothing was there
+        result = conn.execute(update(KitchenStatus).where(KitchenStatus.id == STATUS_ROW_ID).values(**values, updated_at=func.now()))
+        if result.rowcount == 0:
+            conn.execute(KitchenStatus.__table__.insert().values(**values))
+        return
+    conn.execute(stmt.values(**values).on_conflict_do_update(
+        index_elements=[KitchenStatus.id],
+        set_={'status_text': status, 'progress_percent': progress, 'is_active': is_active, 'updated_at': func.now()},
+    ))
 
 def update_kitchen_status(db: Session, status: str, progress: int, is_active: bool = True):
-    """Upsert the singleton status row"""
+    """Upsert the singleton status row (synchronous; commits db)"""
     try:
-        # Check for existing row
-        row = db.query(KitchenStatus).first()
-        if not row:
-            row = KitchenStatus(status_text=status, progress_percent=progress, is_active=is_active)
-            db.add(row)
-        else:
-            row.status_text = status
-            row.progress_percent = progress
-            row.is_active = is_active
-        
+        write_status(db, status, progress, is_active)
         db.commit()
     except Exception as e:
         print(f"Status Update Failed: {e}")
         db.rollback()
+
+class StatusReporter:
+    """
+    Non-blocking kitchen status updates.
+
+    update() only records the latest state; a background thread writes it on
+    its own connection at most once per interval, so rapid updates (e.g. one
+    per finished batch) coalesce into a single write and callers never wait
+    on the database. close() -- also run at interpreter exit -- always writes
+    the last state before returning.
+    """
+
+    def __init__(self, bind=engine, interval: float = STATUS_FLUSH_INTERVAL):
+        self.bind = bind
+        self.interval = interval
+        self.writes = 0
+        self.coalesced = 0
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._cleaned = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="status-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def update(self, status: str, progress: int, is_active: bool = True):
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (status, progress, is_active)
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every update so far has been written."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                state, self._pending = self._pending, None
+                self._writing = True
+            self._write(*state)
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+                # Throttle: let further updates coalesce unless we're shutting down
+                self._cond.wait_for(lambda: self._closed, self.interval)
+
+    def _write(self, status, progress, is_active):
+        try:
+            with self.bind.begin() as conn:
+                if not self._cleaned:
+                    # Rows left by the old random-id reporter would shadow the singleton
+                    conn.execute(delete(KitchenStatus).where(KitchenStatus.id != STATUS_ROW_ID))
+                    self._cleaned = True
+                write_status(conn, status, progress, is_active)
+            self.writes += 1
+        except Exception as e:
+            print(f"Status Update Failed: {e}")
@@ -7,24 +7,25 @@ import sys
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from src.ingest.chef import GEMINI_API_KEY, OPENAI_API_KEY, ANTHROPIC_API_KEY
-from src.ingest.chef import gemini_client, openai_client, anthropic_client
+from src.ai.clients import get_api_key, get_client, PROVIDER_KEY_ENV
 
 print("=" * 60)
 print("API KEY LOADING TEST")
 print("=" * 60)
 
-print(f"\n✓ GEMINI_API_KEY: {'✓ Loaded' if GEMINI_API_KEY else '✗ Missing'}")
-print(f"✓ OPENAI_API_KEY: {'✓ Loaded' if OPENAI_API_KEY else '✗ Missing'}")
-print(f"✓ ANTHROPIC_API_KEY: {'✓ Loaded' if ANTHROPIC_API_KEY else '✗ Missing'}")
+print()
+for provider, env_var in PROVIDER_KEY_ENV.items():
+    print(f"✓ {env_var}: {'✓ Loaded' if get_api_key(provider) else '✗ Missing'}")
 
-print(f"\n✓ Gemini Client: {'✓ Initialized' if gemini_client else '✗ Failed'}")
-print(f"✓ OpenAI Client: {'✓ Initialized' if openai_client else '✗ Failed'}")
-print(f"✓ Anthropic Client: {'✓ Initialized' if anthropic_client else '✗ Failed'}")
+print()
+clients = {provider: get_client(provider) for provider in PROVIDER_KEY_ENV}
+for provider, client in clients.items():
+    print(f"✓ {provider} Client: {'✓ Initialized' if client else '✗ Failed'}")
 
 print("\n" + "=" * 60)
 
 # Test a simple API call with each client
+openai_client = clients.get("openai")
 if openai_client:
     print("\nTesting OpenAI API call...")
     try:
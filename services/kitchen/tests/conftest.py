@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Run from anywhere: src.* resolves against the kitchen directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# src.db.engine refuses to import without a DATABASE_URL; tests never touch a real database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
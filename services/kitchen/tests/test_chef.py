@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from src.ai import providers as llm
+from src.ingest.chef import cook_batch, plate_ready
+from src.utils.llm_cache import configure_cache
+
+
+def cluster(n, base="https://news.example/a"):
+    """A pre-clustered representative with n members (the representative first)."""
+    members = [{"title": f"Story {i}", "link": f"{base}{i}", "source_name": f"Outlet {i}"} for i in range(n)]
+    return dict(members[0], members=members)
+
+
+def urls(course):
+    return [s["url"] for s in course["sources"]]
+
+
+def test_members_restored_from_ingredient_ids_when_model_drops_the_url():
+    items = [cluster(3), cluster(2, base="https://news.example/b")]
+    course = plate_ready({"title": "T", "ingredient_ids": [1], "sources": [{"url": "https://news.example/b0?utm=x"}]}, items)
+    assert urls(course) == ["https://news.example/b0?utm=x", "https://news.example/b0", "https://news.example/b1"]
+    assert course["item_links"] == ["https://news.example/b0", "https://news.example/b1"]
+
+
+def test_members_restored_from_echoed_representative_link():
+    items = [cluster(3)]
+    course = plate_ready({"title": "T", "sources": [{"url": "https://news.example/a0"}]}, items)
+    assert urls(course) == ["https://news.example/a0", "https://news.example/a1", "https://news.example/a2"]
+
+
+def test_unclustered_batch_is_left_alone():
+    items = [{"title": "Story", "link": "https://news.example/x"}]
+    course = plate_ready({"title": "T", "ingredient_ids": [0], "sources": []}, items)
+    assert course["sources"] == [] and course["item_links"] == ["https://news.example/x"]
+
+
+def test_stream_falls_back_to_the_next_model():
+    configure_cache(enabled=False)
+    answer = json.dumps([{"title": "T", "summary": "S", "ingredient_ids": [0]}])
+    llm.use_fake_provider("stream-primary", entry={"fallbackModels": ["stream-secondary"]}, fail_times=100)
+    llm.use_fake_provider("stream-secondary", responder=lambda prompt: answer)
+    items = [{"title": "Story", "link": "https://news.example/x"}]
+
+    seen = []
+    courses = cook_batch(items, model="stream-primary", stream=True, fallback=True, max_retries=0, on_course=seen.append)
+    assert [c["title"] for c in courses] == ["T"] and seen == courses
+    assert cook_batch(items, model="stream-primary", stream=True, max_retries=0) is None
+    with pytest.raises(ValueError):
+        cook_batch(items, model="stream-primary", stream=True, hedge_percentile=90)
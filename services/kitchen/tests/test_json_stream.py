@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from src.ingest.json_stream import IncrementalCourseParser
+
+COURSES = [
+    {"title": "Rates {held}", "summary": "The bank said \"no change }\" today.", "ingredient_ids": [0, 1]},
+    {"title": "Back\\slash [x]", "summary": "Braces { and } and an escaped quote \\\"", "ingredient_ids": [2]},
+    {"title": "Third", "summary": "Plain", "ingredient_ids": []},
+]
+
+
+def feed_all(text, size):
+    parser = IncrementalCourseParser()
+    out = []
+    for start in range(0, len(text), size):
+        out.extend(parser.feed(text[start:start + size]))
+    return parser, out
+
+
+@pytest.mark.parametrize("size", [1, 3, 17, 10000])
+def test_bare_array_any_chunking(size):
+    parser, out = feed_all(json.dumps(COURSES), size)
+    assert out == COURSES
+    assert parser.done and parser.emitted == 3
+
+
+@pytest.mark.parametrize("key", ["courses", "stories", "data"])
+def test_wrapper_object(key):
+    parser, out = feed_all(json.dumps({"note": "x", key: COURSES}), 5)
+    assert out == COURSES and parser.done
+
+
+def test_unknown_wrapper_and_bare_object_yield_nothing():
+    assert feed_all(json.dumps({"translations": COURSES}), 7)[1] == []
+    assert feed_all(json.dumps(COURSES[0]), 7)[1] == []
+
+
+def test_fenced_response():
+    assert feed_all("```json\n" + json.dumps(COURSES, indent=2) + "\n```", 4)[1] == COURSES
+
+
+def test_cut_off_stream_keeps_finished_courses():
+    text = json.dumps(COURSES)
+    cut = text.index('"Third"')
+    parser, out = feed_all(text[:cut], 6)
+    assert out == COURSES[:2]
+    assert not parser.done
+
+
+def test_cut_off_inside_a_string_with_braces():
+    text = json.dumps(COURSES)
+    cut = text.index("no change }") + len("no change }")
+    parser, out = feed_all(text[:cut], 2)
+    assert out == [] and not parser.done
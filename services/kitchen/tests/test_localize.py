@@ -0,0 +1,20 @@
+from src.ingest.localize import _parse_translations
+
+
+ENTRY = {"id": 0, "title": "Titre", "summary": "Résumé"}
+
+
+def test_parse_translations_bare_list():
+    assert _parse_translations([ENTRY], 1) == [{"title": "Titre", "summary": "Résumé"}]
+
+
+def test_parse_translations_wrapped_object():
+    # OpenAI json_object mode can't return a top-level list
+    assert _parse_translations({"translations": [ENTRY]}, 1) == [{"title": "Titre", "summary": "Résumé"}]
+    assert _parse_translations({"stories": [ENTRY]}, 1) == [{"title": "Titre", "summary": "Résumé"}]
+
+
+def test_parse_translations_single_object_and_gaps():
+    assert _parse_translations(ENTRY, 2) == [{"title": "Titre", "summary": "Résumé"}, None]
+    assert _parse_translations({"translations": [{"id": 5, "title": "x", "summary": "y"}]}, 1) == [None]
+    assert _parse_translations("nope", 1) == [None]